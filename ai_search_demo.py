@@ -5,144 +5,151 @@ This script simulates an AI model using the search API to find resources
 based on user queries and incorporate them into its responses.
 """
 
-import requests
 import json
-import re
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError
+
+from resource_client import ResourceClient
+from intent_matcher import IntentMatcher
+from context_packer import FIELDS, pack_resources
 
 # Configuration
 API_BASE_URL = "http://localhost:8082/api"
 
+# Term searches run at most this many at a time...
+MAX_CONCURRENT_SEARCHES = 4
+
+# ...and the answer is built from whatever arrived within this many seconds
+SEARCH_DEADLINE = 5.0
+
+# Resources shown in a response
+RESOURCES_SHOWN = 3
+
+# Estimated tokens the resources may take up in a response
+CONTEXT_BUDGET = 800
+
+# Shared by every call, so searches reuse pooled keep-alive connections
+_client = None
+
+def get_client():
+    """Get the demo's API client."""
+    global _client
+    if _client is None:
+        _client = ResourceClient(API_BASE_URL)
+    return _client
+
+# Compiled once, on first use
+_intent_matcher = None
+
+def get_intent_matcher():
+    """Get the matcher for the service category taxonomy."""
+    global _intent_matcher
+    if _intent_matcher is None:
+        _intent_matcher = IntentMatcher.from_file()
+    return _intent_matcher
+
 def search_resources(query, limit=5):
     """Search for resources using the API."""
-    try:
-        response = requests.get(f"{API_BASE_URL}/search", params={
-            "q": query,
-            "limit": limit
-        })
-        
-        if response.status_code == 200:
-            return response.json()
-        else:
-            print(f"Error: API returned status code {response.status_code}")
-            return None
-    except Exception as e:
-        print(f"Error searching resources: {str(e)}")
-        return None
+    return get_client().search(query, limit=limit)
 
 def get_resource(resource_id):
     """Get a resource by ID."""
-    try:
-        response = requests.get(f"{API_BASE_URL}/resource/{resource_id}")
-        
-        if response.status_code == 200:
-            return response.json()
-        else:
-            print(f"Error: API returned status code {response.status_code}")
-            return None
-    except Exception as e:
-        print(f"Error getting resource: {str(e)}")
-        return None
+    return get_client().get_resource(resource_id)
 
 def format_resource_for_ai(resource):
     """Format a resource for inclusion in an AI response."""
     if not resource:
         return ""
-    
-    formatted = f"Name: {resource['name']}\n"
-    
-    if resource.get('description'):
-        formatted += f"Description: {resource['description']}\n"
-    
-    if resource.get('phone'):
-        formatted += f"Phone: {resource['phone']}\n"
-    
-    if resource.get('email'):
-        formatted += f"Email: {resource['email']}\n"
-    
-    if resource.get('url'):
-        formatted += f"Website: {resource['url']}\n"
-    
-    if resource.get('address'):
-        formatted += f"Address: {resource['address']}\n"
-    
-    if resource.get('eligibility_criteria'):
-        formatted += f"Eligibility: {resource['eligibility_criteria']}\n"
-    
-    if resource.get('application_process'):
-        formatted += f"Application Process: {resource['application_process']}\n"
-    
-    if resource.get('documents_required'):
-        formatted += f"Documents Required: {resource['documents_required']}\n"
-    
-    if resource.get('cost'):
-        formatted += f"Cost: {resource['cost']}\n"
-    
-    if resource.get('hours_of_operation'):
-        formatted += f"Hours: {resource['hours_of_operation']}\n"
-    
-    if resource.get('languages_supported'):
-        formatted += f"Languages: {resource['languages_supported']}\n"
-    
-    return formatted
+
+    return ''.join(f"{label}: {resource[key]}\n" for key, label, _ in FIELDS if resource.get(key))
+
+def fan_out_search(search_terms, limit=5, max_concurrency=MAX_CONCURRENT_SEARCHES,
+                   deadline=SEARCH_DEADLINE, enough=RESOURCES_SHOWN):
+    """
+    Search all terms concurrently and merge the results as they arrive.
+
+    Total latency is that of the slowest search instead of the sum of all
+    of them, and never more than deadline seconds. Resources are returned
+    best first: by their rank within their term's results, then in term
+    order, so every term gets its top result in before any term's second.
+
+    The remaining searches are abandoned once the first enough resources
+    can no longer change: when they all rank ahead of the top result of
+    every term still being searched. The resources shown are then the
+    same as if every search had finished, whatever order they finished in.
+    """
+    started = time.perf_counter()
+    best = {}
+    pending = set(range(len(search_terms)))
+
+    executor = ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, len(search_terms))))
+    futures = {}
+    for index, term in enumerate(search_terms):
+        print(f"Searching for resources related to: {term}")
+        futures[executor.submit(search_resources, term, limit)] = index
+    try:
+        for future in as_completed(futures, timeout=deadline):
+            index = futures[future]
+            pending.discard(index)
+            try:
+                result = future.result()
+            except Exception as e:
+                print(f"Error searching for {search_terms[index]}: {str(e)}")
+                result = None
+
+            if result and result.get('success'):
+                for rank, resource in enumerate(result.get('resources', [])):
+                    key = (rank, index)
+                    if resource['id'] not in best or key < best[resource['id']][0]:
+                        best[resource['id']] = (key, resource)
+
+            # A pending term's top result would rank (0, its index)
+            if pending and len(best) >= enough:
+                first_pending = (0, min(pending))
+                top_keys = sorted(key for key, _ in best.values())[:enough]
+                if top_keys[-1] < first_pending:
+                    print(f"Top {enough} resources settled; skipping {len(pending)} searches")
+                    break
+    except TimeoutError:
+        print(f"Search deadline of {deadline:.1f}s passed; answering with the results so far")
+    finally:
+        # Don't wait for searches that are still running or queued
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    print(f"Collected {len(best)} resources in {time.perf_counter() - started:.2f}s")
+    return [resource for _, resource in sorted(best.values(), key=lambda item: item[0])]
 
 def simulate_ai_response(user_query):
     """Simulate an AI response that incorporates resource search results."""
-    # Extract potential search terms from the user query
-    # This is a simple example - a real AI would use more sophisticated NLP
-    search_terms = []
-    
-    # Look for food-related terms
-    if re.search(r'\b(food|meal|hungry|eat|nutrition)\b', user_query, re.IGNORECASE):
-        search_terms.append("food")
-    
-    # Look for housing-related terms
-    if re.search(r'\b(housing|shelter|homeless|rent|apartment)\b', user_query, re.IGNORECASE):
-        search_terms.append("housing")
-    
-    # Look for medical-related terms
-    if re.search(r'\b(medical|doctor|health|clinic|hospital)\b', user_query, re.IGNORECASE):
-        search_terms.append("medical")
-    
-    # Look for financial-related terms
-    if re.search(r'\b(money|financial|cash|assistance|aid)\b', user_query, re.IGNORECASE):
-        search_terms.append("financial assistance")
-    
+    # Extract search terms from the service categories the query mentions,
+    # matched against every trigger phrase of intents.json in one pass
+    search_terms = get_intent_matcher().search_terms(user_query)
+
     # If no specific terms were found, use the whole query
     if not search_terms:
         search_terms = [user_query]
     
-    # Search for resources using the extracted terms
-    all_resources = []
-    for term in search_terms:
-        print(f"Searching for resources related to: {term}")
-        result = search_resources(term)
-        
-        if result and result.get('success') and result.get('resources'):
-            all_resources.extend(result.get('resources'))
-    
-    # Deduplicate resources
-    seen_ids = set()
-    unique_resources = []
-    for resource in all_resources:
-        if resource['id'] not in seen_ids:
-            seen_ids.add(resource['id'])
-            unique_resources.append(resource)
-    
-    # Generate the AI response
-    response = f"I found some resources that might help with your query about '{user_query}':\n\n"
-    
+    # Search for resources using the extracted terms, all at once
+    unique_resources = fan_out_search(search_terms)
+
+    # Generate the AI response, with the resources packed into the context budget
+    parts = [f"I found some resources that might help with your query about '{user_query}':\n\n"]
+
     if unique_resources:
-        for i, resource in enumerate(unique_resources[:3], 1):
-            response += f"Resource {i}:\n"
-            response += format_resource_for_ai(resource)
-            response += "\n"
-        
-        if len(unique_resources) > 3:
-            response += f"I found {len(unique_resources)} resources in total. These are just the top 3 most relevant ones.\n"
+        packed = pack_resources(unique_resources, CONTEXT_BUDGET, max_resources=RESOURCES_SHOWN)
+        print(f"Context: {packed.used}/{packed.budget} {packed.unit} for {packed.resources} resources "
+              f"({packed.truncated} fields truncated, {packed.omitted} left out)")
+        parts.append(packed.text)
+
+        if len(unique_resources) > packed.resources:
+            # Searches may stop early, so this is how many were retrieved,
+            # not how many match
+            parts.append(f"\nI retrieved {len(unique_resources)} resources. "
+                         f"These are just the top {packed.resources} most relevant ones.\n")
     else:
-        response += "I couldn't find any specific resources matching your query. Please try a different search term or contact Kern County services directly for assistance."
-    
-    return response
+        parts.append("I couldn't find any specific resources matching your query. Please try a different search term or contact Kern County services directly for assistance.")
+
+    return ''.join(parts)
 
 def main():
     """Main function to demonstrate the AI search capability."""
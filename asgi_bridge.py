@@ -0,0 +1,240 @@
+"""
+Serve a WSGI application over ASGI with a bounded thread pool.
+
+Under gunicorn's sync workers every request holds a thread from the moment
+it arrives until the last byte reaches the client, so a handful of slow
+clients or long streaming responses exhaust workers x threads. AsgiBridge
+keeps the connections on the event loop instead and only borrows a thread
+while application code runs:
+1. The request body is read on the event loop before the app is called
+2. The WSGI app runs in a thread pool of max_workers threads
+3. Streaming responses are pulled from the app in the pool, up to
+   STREAM_BATCH_BYTES at a time, and sent from the event loop. The thread
+   is released while the client receives, and awaiting send() applies the
+   server's flow control, so a slow client only slows its own stream.
+4. Requests beyond max_requests in progress are answered with 503 right
+   away instead of queueing without bound
+5. A client that disconnects stops its request: a partial body never
+   reaches the app, and a streaming response is closed instead of being
+   pulled to the end
+
+Each request runs all its application calls in one contextvars context,
+so Flask's request context survives a streaming response being resumed
+on a different thread.
+"""
+
+import asyncio
+import contextvars
+import io
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+# Application threads per worker process
+DEFAULT_MAX_WORKERS = 16
+
+# Requests in progress, including streaming ones, before new ones get a 503
+DEFAULT_MAX_REQUESTS = 512
+
+# Largest request body accepted
+MAX_BODY_BYTES = 1024 * 1024
+
+# A streaming response is pulled from the app in batches of about this size
+STREAM_BATCH_BYTES = 16 * 1024
+
+_DONE = object()
+
+# _read_body result when the client went away before sending the whole body
+_DISCONNECTED = object()
+
+
+def build_environ(scope, body):
+    """Build the WSGI environ for an ASGI HTTP scope and its request body."""
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': str(server[0]),
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': str(client[0]),
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False
+    }
+
+    for name, value in scope.get('headers', []):
+        name = name.decode('latin-1').upper().replace('-', '_')
+        value = value.decode('latin-1')
+        if name == 'CONTENT_TYPE':
+            environ['CONTENT_TYPE'] = value
+            continue
+        if name == 'CONTENT_LENGTH':
+            continue
+        key = 'HTTP_' + name
+        environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
+
+
+def next_batch(iterator, batch_bytes=STREAM_BATCH_BYTES):
+    """Pull chunks from a WSGI response until batch_bytes or the end."""
+    chunks = []
+    size = 0
+    for chunk in iterator:
+        if chunk:
+            chunks.append(chunk)
+            size += len(chunk)
+            if size >= batch_bytes:
+                return b''.join(chunks)
+    return b''.join(chunks) if chunks else _DONE
+
+
+class AsgiBridge:
+    """ASGI application that runs a WSGI application in a thread pool."""
+
+    def __init__(self, wsgi_app, max_workers=DEFAULT_MAX_WORKERS, max_requests=DEFAULT_MAX_REQUESTS,
+                 on_startup=None, on_shutdown=None):
+        self.wsgi_app = wsgi_app
+        self.max_workers = max_workers
+        self.max_requests = max_requests
+        self.on_startup = on_startup
+        self.on_shutdown = on_shutdown
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='asgi-wsgi')
+        self.in_progress = 0
+        self.rejected = 0
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+        elif scope['type'] == 'http':
+            await self._http(scope, receive, send)
+        else:
+            raise ValueError(f"Unsupported ASGI scope type '{scope['type']}'")
+
+    async def _lifespan(self, receive, send):
+        loop = asyncio.get_running_loop()
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                try:
+                    if self.on_startup:
+                        await loop.run_in_executor(self._executor, self.on_startup)
+                except Exception as e:
+                    await send({'type': 'lifespan.startup.failed', 'message': str(e)})
+                    return
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                if self.on_shutdown:
+                    await loop.run_in_executor(self._executor, self.on_shutdown)
+                self._executor.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def _http(self, scope, receive, send):
+        if self.in_progress >= self.max_requests:
+            self.rejected += 1
+            await self._simple_response(send, 503, b'Server busy, try again shortly', [(b'retry-after', b'1')])
+            return
+
+        self.in_progress += 1
+        try:
+            body = await self._read_body(receive)
+            if body is _DISCONNECTED:
+                # Nobody to answer, and a truncated body must not be processed
+                return
+            if body is None:
+                await self._simple_response(send, 413, b'Request body too large')
+                return
+            await self._run_wsgi(scope, body, receive, send)
+        finally:
+            self.in_progress -= 1
+
+    async def _read_body(self, receive):
+        """Read the request body; None if too large, _DISCONNECTED if cut off."""
+        chunks = []
+        size = 0
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                return _DISCONNECTED
+            chunk = message.get('body', b'')
+            size += len(chunk)
+            if size > MAX_BODY_BYTES:
+                return None
+            chunks.append(chunk)
+            if not message.get('more_body', False):
+                return b''.join(chunks)
+
+    async def _run_wsgi(self, scope, body, receive, send):
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        response = {}
+        disconnected = asyncio.Event()
+
+        async def watch_disconnect():
+            # After the body the only message left to receive is the disconnect
+            while (await receive())['type'] != 'http.disconnect':
+                pass
+            disconnected.set()
+
+        async def send_body(message):
+            try:
+                await send(message)
+            except OSError:
+                # The server couldn't write to the client any more
+                disconnected.set()
+
+        def start_response(status, headers, exc_info=None):
+            if exc_info and response.get('sent'):
+                raise exc_info[1].with_traceback(exc_info[2])
+            response['status'] = int(status.split(' ', 1)[0])
+            response['headers'] = [(name.lower().encode('latin-1'), value.encode('latin-1'))
+                                   for name, value in headers]
+            return lambda data: None
+
+        def call(fn, *args):
+            # Every call of this request shares one context; it is never
+            # entered by two threads at once since the calls are sequential
+            return loop.run_in_executor(self._executor, context.run, fn, *args)
+
+        watcher = asyncio.ensure_future(watch_disconnect())
+        iterable = await call(self.wsgi_app, build_environ(scope, body), start_response)
+        try:
+            iterator = iter(iterable)
+            batch = await call(next_batch, iterator)
+            response['sent'] = True
+            await send_body({'type': 'http.response.start', 'status': response['status'],
+                             'headers': response['headers']})
+            while batch is not _DONE:
+                await send_body({'type': 'http.response.body', 'body': batch, 'more_body': True})
+                if disconnected.is_set():
+                    # Stop pulling the stream for a client that is gone
+                    return
+                batch = await call(next_batch, iterator)
+            await send_body({'type': 'http.response.body', 'body': b'', 'more_body': False})
+        finally:
+            watcher.cancel()
+            if hasattr(iterable, 'close'):
+                await call(iterable.close)
+
+    async def _simple_response(self, send, status, body, headers=()):
+        await send({'type': 'http.response.start', 'status': status,
+                    'headers': [(b'content-type', b'text/plain; charset=utf-8'),
+                                (b'content-length', str(len(body)).encode())] + list(headers)})
+        await send({'type': 'http.response.body', 'body': body, 'more_body': False})
+
+    def stats(self):
+        """Requests in progress and rejected so far."""
+        return {
+            'max_workers': self.max_workers,
+            'max_requests': self.max_requests,
+            'in_progress': self.in_progress,
+            'rejected': self.rejected
+        }
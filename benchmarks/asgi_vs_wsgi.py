@@ -0,0 +1,153 @@
+"""
+Compare the WSGI and ASGI serving modes of the search API under high concurrency.
+
+Starts the API twice on a synthetic corpus:
+1. wsgi - gunicorn with gunicorn_config.py (2 workers x 4 threads), as deployed
+2. asgi - the same config with uvicorn workers serving fts_search_asgi:app
+
+and drives each with many concurrent search clients, plus optional slow
+clients that stream /api/changes and read it slowly. For each it reports
+completed searches per second, p50/p99 latency and failed requests
+(including 503s from the ASGI request limit).
+
+Requires gunicorn and uvicorn:
+    pip install gunicorn uvicorn
+
+Usage:
+    python benchmarks/asgi_vs_wsgi.py [--resources 20000] [--concurrency 256] [--slow-clients 16] [--seconds 10]
+"""
+
+import argparse
+import asyncio
+import importlib.util
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from contextlib import redirect_stdout
+from io import StringIO
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Add the repository root to the path so we can import the modules
+sys.path.insert(0, REPO_ROOT)
+
+from setup_fts_index import setup_fts_index
+from synthetic_corpus import create_corpus_db
+
+QUERIES = ['food', 'dental care', 'calfresh', 'rental OR utility', 'shelter', 'legal aid', 'medi*']
+
+SERVERS = {
+    'wsgi': ['-c', 'gunicorn_config.py', 'fts_search_api:app'],
+    'asgi': ['-c', 'gunicorn_config.py', '-k', 'uvicorn.workers.UvicornWorker', 'fts_search_asgi:app']
+}
+
+
+def start_server(mode, db_path, port):
+    env = dict(os.environ, PORT=str(port), KERN_RESOURCES_DB=db_path,
+               # No result cache or query log, so every search hits SQLite
+               KERN_RESOURCES_CACHE='', KERN_RESOURCES_QUERY_LOG='')
+    process = subprocess.Popen(['gunicorn'] + SERVERS[mode], cwd=REPO_ROOT, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/api/admin/metrics", timeout=1)
+            return process
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f"{mode} server did not start on port {port}")
+
+
+async def fetch(port, path, read_delay=0.0):
+    """GET path; returns the status code. read_delay slows down reading."""
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    try:
+        writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n".encode())
+        await writer.drain()
+        status_line = await reader.readline()
+        while True:
+            chunk = await reader.read(4096)
+            if not chunk:
+                break
+            if read_delay:
+                await asyncio.sleep(read_delay)
+        return int(status_line.split()[1]) if status_line else 0
+    finally:
+        writer.close()
+
+
+async def run_load(port, concurrency, slow_clients, seconds):
+    latencies = []
+    failures = 0
+    stop = time.perf_counter() + seconds
+
+    async def search_client():
+        nonlocal failures
+        rng = random.Random()
+        while time.perf_counter() < stop:
+            started = time.perf_counter()
+            try:
+                status = await fetch(port, f"/api/search?q={urllib.request.quote(rng.choice(QUERIES))}")
+            except OSError:
+                status = 0
+            if status == 200:
+                latencies.append(time.perf_counter() - started)
+            else:
+                failures += 1
+
+    async def slow_client():
+        while time.perf_counter() < stop:
+            try:
+                await fetch(port, '/api/changes?since=0&limit=5000', read_delay=0.05)
+            except OSError:
+                pass
+
+    await asyncio.gather(*([search_client() for _ in range(concurrency)]
+                           + [slow_client() for _ in range(slow_clients)]))
+    latencies.sort()
+    if not latencies:
+        return 0.0, None, None, failures
+    return (len(latencies) / seconds, latencies[len(latencies) // 2] * 1000,
+            latencies[max(int(len(latencies) * 0.99) - 1, 0)] * 1000, failures)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="WSGI vs ASGI serving benchmark")
+    parser.add_argument('--resources', type=int, default=20000)
+    parser.add_argument('--concurrency', type=int, default=256)
+    parser.add_argument('--slow-clients', type=int, default=16)
+    parser.add_argument('--seconds', type=float, default=10.0)
+    parser.add_argument('--port', type=int, default=8090)
+    args = parser.parse_args()
+
+    if shutil.which('gunicorn') is None or importlib.util.find_spec('uvicorn') is None:
+        print("Error: this benchmark needs gunicorn and uvicorn (pip install gunicorn uvicorn)")
+        sys.exit(1)
+
+    work_dir = tempfile.mkdtemp(prefix='asgi_vs_wsgi_')
+    try:
+        db_path = os.path.join(work_dir, 'corpus.db')
+        print(f"Generating {args.resources} synthetic resources...")
+        create_corpus_db(db_path, args.resources)
+        with redirect_stdout(StringIO()):
+            setup_fts_index(db_path)
+
+        print(f"{args.concurrency} search clients, {args.slow_clients} slow streaming clients, {args.seconds:.0f}s each")
+        print(f"{'mode':<6} {'searches/s':>11} {'p50 ms':>9} {'p99 ms':>9} {'failed':>8}")
+        for mode in SERVERS:
+            process = start_server(mode, db_path, args.port)
+            try:
+                rate, p50, p99, failures = asyncio.run(
+                    run_load(args.port, args.concurrency, args.slow_clients, args.seconds))
+            finally:
+                process.terminate()
+                process.wait()
+            print(f"{mode:<6} {rate:>11.0f} {p50 or 0:>9.1f} {p99 or 0:>9.1f} {failures:>8}")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
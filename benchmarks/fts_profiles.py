@@ -0,0 +1,154 @@
+"""
+Compare FTS5 index profiles on a synthetic corpus.
+
+For every profile in setup_fts_index.FTS_PROFILES this benchmark builds the
+index from scratch and reports:
+1. Build time
+2. Index size (FTS5 shadow tables) and database file size
+3. Query latency (median and 95th percentile) over a mix of queries
+4. Which query features the profile supports: phrases, NEAR, prefix
+   queries, snippets and bm25 ranking
+
+Usage:
+    python benchmarks/fts_profiles.py [--resources 20000] [--repeat 20] [--profiles default,compact]
+"""
+
+import argparse
+import io
+import os
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from contextlib import closing, redirect_stdout
+
+# Add the repository root to the path so we can import the modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from setup_fts_index import FTS_PROFILES, fts_index_size, setup_fts_index
+from synthetic_corpus import create_corpus_db
+
+QUERIES = ['food', 'dental care', 'calfresh', 'rental OR utility', 'bakersfield shelter',
+           'legal aid seniors', 'medi*']
+
+FEATURE_QUERIES = {
+    'phrase': ("SELECT rowid FROM resource_fts WHERE resource_fts MATCH ? LIMIT 1", '"food pantry"'),
+    'near': ("SELECT rowid FROM resource_fts WHERE resource_fts MATCH ? LIMIT 1", 'NEAR(food pantry, 5)'),
+    'prefix': ("SELECT rowid FROM resource_fts WHERE resource_fts MATCH ? LIMIT 1", 'pant*'),
+    'snippet': ("SELECT snippet(resource_fts, -1, '[', ']', '...', 8) FROM resource_fts "
+                "WHERE resource_fts MATCH ? LIMIT 1", 'food'),
+    'bm25': ("SELECT bm25(resource_fts) FROM resource_fts WHERE resource_fts MATCH ? "
+             "ORDER BY bm25(resource_fts) LIMIT 1", 'food')
+}
+
+SEARCH_SQL = """
+SELECT r.id, r.name, bm25(resource_fts) AS score
+FROM resource_fts
+JOIN resources r ON r.id = resource_fts.rowid
+WHERE resource_fts MATCH ?
+ORDER BY score
+LIMIT 10
+"""
+
+
+def probe_features(conn):
+    """Return {feature: True/False} for the index in conn."""
+    supported = {}
+    for feature, (sql, query) in FEATURE_QUERIES.items():
+        try:
+            row = conn.execute(sql, (query,)).fetchone()
+            # A contentless index answers snippet() with NULL
+            supported[feature] = row is not None and row[0] is not None
+        except sqlite3.Error:
+            supported[feature] = False
+    return supported
+
+
+def time_queries(conn, repeat):
+    """Median and 95th percentile latency in milliseconds over QUERIES."""
+    timings = []
+    for _ in range(repeat):
+        for query in QUERIES:
+            started = time.perf_counter()
+            try:
+                conn.execute(SEARCH_SQL, (query,)).fetchall()
+            except sqlite3.Error:
+                continue
+            timings.append((time.perf_counter() - started) * 1000)
+    if not timings:
+        return None, None
+    timings.sort()
+    return statistics.median(timings), timings[int(len(timings) * 0.95) - 1]
+
+
+def benchmark_profile(corpus_path, profile, work_dir, repeat):
+    db_path = os.path.join(work_dir, f"{profile}.db")
+    shutil.copyfile(corpus_path, db_path)
+
+    started = time.perf_counter()
+    with redirect_stdout(io.StringIO()):
+        ok = setup_fts_index(db_path, profile)
+    build_seconds = time.perf_counter() - started
+    if not ok:
+        return {'profile': profile, 'error': 'index build failed'}
+
+    with closing(sqlite3.connect(db_path)) as conn:
+        conn.execute("VACUUM")
+        index_bytes = fts_index_size(conn.cursor())
+        features = probe_features(conn)
+        p50, p95 = time_queries(conn, repeat)
+
+    return {
+        'profile': profile,
+        'build_seconds': build_seconds,
+        'index_bytes': index_bytes,
+        'file_bytes': os.path.getsize(db_path),
+        'p50_ms': p50,
+        'p95_ms': p95,
+        'features': features
+    }
+
+
+def print_results(results):
+    features = list(FEATURE_QUERIES)
+    print(f"{'profile':<12} {'build s':>8} {'index MiB':>10} {'file MiB':>9} {'p50 ms':>7} {'p95 ms':>7}  "
+          + ' '.join(f"{feature:>7}" for feature in features))
+    for result in results:
+        if 'error' in result:
+            print(f"{result['profile']:<12} {result['error']}")
+            continue
+        p50 = f"{result['p50_ms']:.2f}" if result['p50_ms'] is not None else 'n/a'
+        p95 = f"{result['p95_ms']:.2f}" if result['p95_ms'] is not None else 'n/a'
+        print(f"{result['profile']:<12} {result['build_seconds']:>8.2f} "
+              f"{result['index_bytes'] / 2 ** 20:>10.2f} {result['file_bytes'] / 2 ** 20:>9.2f} "
+              f"{p50:>7} {p95:>7}  "
+              + ' '.join(f"{'yes' if result['features'][feature] else 'no':>7}" for feature in features))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare FTS5 index profiles")
+    parser.add_argument('--resources', type=int, default=20000,
+                        help='Size of the synthetic corpus')
+    parser.add_argument('--repeat', type=int, default=20,
+                        help='Times the query mix is run per profile')
+    parser.add_argument('--profiles', default=','.join(FTS_PROFILES),
+                        help='Comma-separated profiles to compare')
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix='fts_profiles_')
+    try:
+        corpus_path = os.path.join(work_dir, 'corpus.db')
+        print(f"Generating {args.resources} synthetic resources...")
+        create_corpus_db(corpus_path, args.resources)
+
+        results = []
+        for profile in args.profiles.split(','):
+            print(f"Benchmarking profile '{profile}'...")
+            results.append(benchmark_profile(corpus_path, profile.strip(), work_dir, args.repeat))
+
+        print()
+        print_results(results)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
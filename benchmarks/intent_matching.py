@@ -0,0 +1,121 @@
+"""
+Benchmark intent extraction on long messages.
+
+Compares three ways of finding the service categories in a message:
+1. per-category - one case-insensitive \\b(...)\\b regex per category, as
+   ai_search_demo used to do; one pass over the message per category
+2. combined     - a single regex with one named group per category; its
+                  matches can't overlap, so a phrase inside a longer one of
+                  another category ("doctor" in "ride to the doctor") is lost
+3. automaton    - IntentMatcher's token-level Aho-Corasick automaton
+
+The taxonomy is intents.json, optionally padded with synthetic phrases to
+--phrases-per-category. For each message length it reports the average
+time per message, whether the per-category regexes and the automaton
+found the same categories, and how many the combined regex missed.
+
+Usage:
+    python benchmarks/intent_matching.py [--phrases-per-category 300] [--words 200 2000 20000] [--repeat 20]
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import time
+
+# Add the repository root to the path so we can import the modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from intent_matcher import IntentMatcher, DEFAULT_INTENTS_PATH
+
+FILLER = ('i', 'we', 'my', 'the', 'a', 'and', 'to', 'for', 'with', 'need', 'help', 'please', 'today',
+          'really', 'family', 'since', 'last', 'week', 'been', 'trying', 'call', 'nobody', 'answers',
+          'thank', 'you', 'so', 'much', 'county', 'bakersfield', 'delano', 'tomorrow', 'morning')
+
+SYLLABLES = ('ka', 'lo', 'mi', 'ren', 'ta', 'vo', 'shi', 'dun', 'pa', 'el', 'ro', 'qui')
+
+
+def padded_taxonomy(taxonomy, phrases_per_category, rng):
+    """Add made-up trigger phrases until each category has phrases_per_category."""
+    padded = {}
+    for category, spec in taxonomy.items():
+        phrases = list(spec['phrases'])
+        while len(phrases) < phrases_per_category:
+            words = [''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+                     for _ in range(rng.randint(1, 3))]
+            phrases.append(' '.join(words))
+        padded[category] = dict(spec, phrases=phrases)
+    return padded
+
+
+def make_message(taxonomy, words, rng):
+    """A message of about `words` words with a trigger phrase every ~50 words."""
+    all_phrases = [phrase for spec in taxonomy.values() for phrase in spec['phrases']]
+    parts = []
+    while len(parts) < words:
+        if rng.random() < 0.02:
+            parts.extend(rng.choice(all_phrases).split())
+        else:
+            parts.append(rng.choice(FILLER))
+    return ' '.join(parts)
+
+
+def alternation(phrases):
+    # Longest first, so a phrase is preferred over its own prefix
+    return '|'.join(re.escape(phrase) for phrase in sorted(phrases, key=len, reverse=True))
+
+
+def per_category_regexes(taxonomy):
+    regexes = {category: re.compile(rf"\b(?:{alternation(spec['phrases'])})\b", re.IGNORECASE)
+               for category, spec in taxonomy.items()}
+    return lambda text: {category for category, regex in regexes.items() if regex.search(text)}
+
+
+def combined_regex(taxonomy):
+    names = {f"c{index}": category for index, category in enumerate(taxonomy)}
+    regex = re.compile('|'.join(rf"(?P<{name}>\b(?:{alternation(taxonomy[category]['phrases'])})\b)"
+                                for name, category in names.items()), re.IGNORECASE)
+    return lambda text: {names[match.lastgroup] for match in regex.finditer(text)}
+
+
+def timed(fn, message, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = fn(message)
+    return (time.perf_counter() - started) / repeat * 1000, result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Intent extraction benchmark")
+    parser.add_argument('--phrases-per-category', type=int, default=300)
+    parser.add_argument('--words', type=int, nargs='+', default=[200, 2000, 20000])
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    with open(DEFAULT_INTENTS_PATH, encoding='utf-8') as f:
+        taxonomy = padded_taxonomy(json.load(f), args.phrases_per_category, rng)
+
+    started = time.perf_counter()
+    matcher = IntentMatcher(taxonomy)
+    build_ms = (time.perf_counter() - started) * 1000
+    methods = {
+        'per-category': per_category_regexes(taxonomy),
+        'combined': combined_regex(taxonomy),
+        'automaton': lambda text: {hit.category for hit in matcher.match(text)}
+    }
+    print(f"{len(taxonomy)} categories, {matcher.phrase_count} phrases; automaton built in {build_ms:.1f} ms")
+
+    print(f"{'words':>7} " + ' '.join(f"{name + ' ms':>16}" for name in methods) + "  agree  combined missed")
+    for words in args.words:
+        message = make_message(taxonomy, words, rng)
+        results = {name: timed(fn, message, args.repeat) for name, fn in methods.items()}
+        expected = results['automaton'][1]
+        agree = results['per-category'][1] == expected
+        missed = len(expected - results['combined'][1])
+        print(f"{words:>7} " + ' '.join(f"{ms:>16.3f}" for ms, _ in results.values())
+              + f"  {'yes' if agree else 'NO':>5}  {missed:>15}")
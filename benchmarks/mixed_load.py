@@ -0,0 +1,156 @@
+"""
+Measure search and edit throughput under mixed read/write load.
+
+Runs reader threads issuing FTS searches alongside writer threads updating
+resources, in three configurations:
+1. rollback - default rollback journal, each edit in its own transaction
+2. wal      - WAL mode with a busy timeout, each edit in its own transaction
+3. queue    - WAL mode with edits funneled through SerializedWriter
+
+For each it reports reads and writes per second, their p95 latency and how
+many operations failed with "database is locked".
+
+Usage:
+    python benchmarks/mixed_load.py [--resources 20000] [--readers 8] [--writers 4] [--seconds 5]
+"""
+
+import argparse
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from contextlib import redirect_stdout
+from io import StringIO
+
+# Add the repository root to the path so we can import the modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from db_connection import connect
+from search_queries import SEARCH_SQL
+from setup_fts_index import setup_fts_index
+from synthetic_corpus import create_corpus_db
+from write_queue import SerializedWriter
+
+QUERIES = ['food', 'dental care', 'calfresh', 'rental OR utility', 'shelter', 'legal aid', 'medi*']
+
+UPDATE_SQL = "UPDATE resources SET description = description || ' updated', updated_at = CURRENT_TIMESTAMP WHERE id = ?"
+
+
+class Counter:
+    """Latencies and lock failures collected by the worker threads."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = []
+        self.locked = 0
+
+    def record(self, seconds):
+        with self.lock:
+            self.latencies.append(seconds)
+
+    def fail(self):
+        with self.lock:
+            self.locked += 1
+
+    def summary(self, seconds):
+        latencies = sorted(self.latencies)
+        p95 = latencies[int(len(latencies) * 0.95) - 1] * 1000 if latencies else None
+        return len(latencies) / seconds, p95, self.locked
+
+
+def run_config(db_path, config, resource_count, readers, writers, seconds):
+    wal = config != 'rollback'
+    # Switch the journal mode up front; it persists in the file
+    conn = sqlite3.connect(db_path)
+    conn.execute(f"PRAGMA journal_mode = {'WAL' if wal else 'DELETE'}")
+    conn.close()
+
+    reads = Counter()
+    writes = Counter()
+    stop = threading.Event()
+    writer = SerializedWriter(db_path) if config == 'queue' else None
+
+    def read_loop():
+        # A short timeout, like a search request that must not hang
+        conn = connect(db_path, busy_timeout_ms=100, wal=wal)
+        rng = random.Random()
+        while not stop.is_set():
+            started = time.perf_counter()
+            try:
+                conn.execute(SEARCH_SQL, (rng.choice(QUERIES), 10, 0)).fetchall()
+                reads.record(time.perf_counter() - started)
+            except sqlite3.OperationalError:
+                reads.fail()
+        conn.close()
+
+    def write_loop():
+        conn = None if writer else connect(db_path, busy_timeout_ms=1000, wal=wal)
+        rng = random.Random()
+        while not stop.is_set():
+            resource_id = rng.randint(1, resource_count)
+            started = time.perf_counter()
+            try:
+                if writer:
+                    writer.execute(UPDATE_SQL, (resource_id,))
+                else:
+                    conn.execute(UPDATE_SQL, (resource_id,))
+                    conn.commit()
+                writes.record(time.perf_counter() - started)
+            except sqlite3.OperationalError:
+                writes.fail()
+                if conn is not None:
+                    conn.rollback()
+            # Admin edits trickle in; they don't arrive in a tight loop
+            time.sleep(0.001)
+        if conn is not None:
+            conn.close()
+
+    threads = ([threading.Thread(target=read_loop) for _ in range(readers)]
+               + [threading.Thread(target=write_loop) for _ in range(writers)])
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    if writer:
+        writer.close()
+
+    return reads.summary(seconds), writes.summary(seconds)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mixed read/write load benchmark")
+    parser.add_argument('--resources', type=int, default=20000)
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--writers', type=int, default=4)
+    parser.add_argument('--seconds', type=float, default=5.0)
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix='mixed_load_')
+    try:
+        corpus_path = os.path.join(work_dir, 'corpus.db')
+        print(f"Generating {args.resources} synthetic resources...")
+        create_corpus_db(corpus_path, args.resources)
+        with redirect_stdout(StringIO()):
+            setup_fts_index(corpus_path)
+        # Start every configuration from the same rollback-journal file
+        conn = sqlite3.connect(corpus_path)
+        conn.execute("PRAGMA journal_mode = DELETE")
+        conn.close()
+
+        print(f"{'config':<10} {'reads/s':>9} {'read p95 ms':>12} {'read locked':>12} "
+              f"{'writes/s':>9} {'write p95 ms':>13} {'write locked':>13}")
+        for config in ('rollback', 'wal', 'queue'):
+            db_path = os.path.join(work_dir, f"{config}.db")
+            shutil.copyfile(corpus_path, db_path)
+            (read_rate, read_p95, read_locked), (write_rate, write_p95, write_locked) = run_config(
+                db_path, config, args.resources, args.readers, args.writers, args.seconds)
+            print(f"{config:<10} {read_rate:>9.0f} {read_p95 or 0:>12.2f} {read_locked:>12} "
+                  f"{write_rate:>9.0f} {write_p95 or 0:>13.2f} {write_locked:>13}")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
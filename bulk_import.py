@@ -0,0 +1,425 @@
+"""
+Bulk import resources from CSV or JSONL files.
+
+This script:
+1. Streams the input file, so memory use does not grow with its size
+2. Validates and normalizes rows in a pool of worker processes
+3. Upserts rows by a natural key (name and address by default) with
+   executemany in large transactions
+4. Optionally drops the FTS triggers during the load and rebuilds the
+   index once afterwards instead of once per row
+5. Reports throughput and writes rejected rows to a CSV file
+
+Rows whose natural key matches an existing resource update it; later rows
+in the input win over earlier rows with the same key. An update only sets
+the columns that have a value in the row, so a file with a few columns
+leaves the others as stored.
+"""
+
+import argparse
+import csv
+import json
+import os
+import re
+import sqlite3
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from setup_fts_index import (
+    FTS_TABLE, FTS_TRIGGERS, create_fts_triggers, drop_triggers, fts_table_options, table_exists
+)
+from db_connection import connect
+from index_hours import reindex_hours
+from geocode_resources import DEFAULT_GAZETTEER, Gazetteer, geocode_rows
+
+# Columns that can be imported, in insert order
+IMPORT_COLUMNS = [
+    'name',
+    'description',
+    'url',
+    'phone',
+    'email',
+    'address',
+    'eligibility_criteria',
+    'application_process',
+    'documents_required',
+    'cost',
+    'hours_of_operation',
+    'languages_supported',
+    'is_active',
+    'is_verified'
+]
+
+DEFAULT_KEY = ('name', 'address')
+
+EMAIL_RE = re.compile(r'^[^@\s]+@[^@\s]+\.[^@\s]+$')
+URL_RE = re.compile(r'^https?://\S+$', re.IGNORECASE)
+WHITESPACE_RE = re.compile(r'\s+')
+
+TRUE_VALUES = {'1', 'true', 'yes', 'y', 't'}
+FALSE_VALUES = {'0', 'false', 'no', 'n', 'f', ''}
+
+
+class RowError(ValueError):
+    """Raised when an input row cannot be imported."""
+
+
+def normalize_phone(value):
+    """Format 10-digit US numbers as (661) 555-1234; keep anything else as given."""
+    digits = re.sub(r'\D', '', value)
+    if len(digits) == 11 and digits.startswith('1'):
+        digits = digits[1:]
+    if len(digits) == 10:
+        return f"({digits[:3]}) {digits[3:6]}-{digits[6:]}"
+    return value
+
+
+def normalize_values(raw, columns=IMPORT_COLUMNS):
+    """
+    Validate and normalize the given columns of raw. Columns without a value
+    come back as None; no defaults are applied.
+
+    Raises RowError when a value is invalid.
+    """
+    row = {}
+    for column in columns:
+        value = raw.get(column)
+        if value is None:
+            row[column] = None
+            continue
+        if isinstance(value, (dict, list)):
+            raise RowError(f"invalid {column}: expected a single value")
+        if not isinstance(value, str):
+            value = str(value)
+        value = WHITESPACE_RE.sub(' ', value).strip()
+        row[column] = value or None
+
+    if row.get('email'):
+        row['email'] = row['email'].lower()
+        if not EMAIL_RE.match(row['email']):
+            raise RowError(f"invalid email '{row['email']}'")
+
+    if row.get('url'):
+        if '://' not in row['url']:
+            row['url'] = 'https://' + row['url']
+        if not URL_RE.match(row['url']):
+            raise RowError(f"invalid url '{row['url']}'")
+
+    if row.get('phone'):
+        row['phone'] = normalize_phone(row['phone'])
+
+    for column in ('is_active', 'is_verified'):
+        if row.get(column) is None:
+            continue
+        value = row[column].lower()
+        if value in TRUE_VALUES:
+            row[column] = 1
+        elif value in FALSE_VALUES:
+            row[column] = 0
+        else:
+            raise RowError(f"invalid {column} '{row[column]}'")
+
+    return row
+
+
+def normalize_row(raw):
+    """
+    Validate and normalize one input row into a dictionary of IMPORT_COLUMNS,
+    with the defaults of a new resource for missing flags.
+
+    Raises RowError when the row cannot be imported.
+    """
+    row = normalize_values(raw)
+
+    if not row['name']:
+        raise RowError("missing name")
+
+    for column, default in (('is_active', True), ('is_verified', False)):
+        if row[column] is None:
+            row[column] = int(default)
+
+    return row
+
+
+def provided_columns(raw):
+    """
+    IMPORT_COLUMNS that have a value in a raw input row.
+
+    An update only writes these, so columns missing from the input file or
+    left blank keep what is stored.
+    """
+    return tuple(column for column in IMPORT_COLUMNS
+                 if raw.get(column) is not None and str(raw[column]).strip())
+
+
+def update_sql(columns):
+    """UPDATE statement setting columns of the resource with a given id."""
+    return f"""
+    UPDATE resources
+    SET {', '.join(f'{column} = ?' for column in columns)}, updated_at = CURRENT_TIMESTAMP
+    WHERE id = ?
+    """
+
+
+def natural_key(row, key_columns):
+    """Case- and whitespace-insensitive natural key of a row."""
+    return tuple(WHITESPACE_RE.sub(' ', row.get(column) or '').strip().lower() for column in key_columns)
+
+
+def _normalize_batch(batch):
+    """
+    Normalize a batch of (line, raw row) pairs in a worker process into
+    (line, row, provided columns) and rejected rows.
+    """
+    valid = []
+    rejected = []
+    for line, raw in batch:
+        try:
+            valid.append((line, normalize_row(raw), provided_columns(raw)))
+        except RowError as e:
+            rejected.append((line, str(e), raw))
+    return valid, rejected
+
+
+def read_rows(path, input_format=None):
+    """
+    Yield (line number, raw row dictionary) from a CSV or JSONL file.
+
+    Lines that are not valid JSON are yielded as None so they can be
+    reported as rejects.
+    """
+    input_format = input_format or ('jsonl' if path.endswith(('.jsonl', '.ndjson')) else 'csv')
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        if input_format == 'csv':
+            for line, raw in enumerate(csv.DictReader(f), start=2):
+                yield line, {key.strip().lower(): value for key, value in raw.items() if key}
+        else:
+            for line, text in enumerate(f, start=1):
+                if not text.strip():
+                    continue
+                try:
+                    raw = json.loads(text)
+                except json.JSONDecodeError:
+                    raw = None
+                yield line, raw if isinstance(raw, dict) else None
+
+
+def _batches(items, batch_size):
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def bulk_import(db_path, input_path, input_format=None, key_columns=DEFAULT_KEY, batch_size=5000,
+                processes=None, disable_triggers=False, rejects_path=None,
+                gazetteer_path=DEFAULT_GAZETTEER):
+    """
+    Import resources from input_path into db_path.
+
+    Returns a dictionary with row counts and throughput, or None if the
+    import failed.
+    """
+    print(f"Importing resources from {input_path} into {db_path}")
+
+    if not os.path.exists(db_path):
+        print(f"Error: Database file not found at {db_path}")
+        return None
+    if not os.path.exists(input_path):
+        print(f"Error: Input file not found at {input_path}")
+        return None
+
+    unknown = [column for column in key_columns if column not in IMPORT_COLUMNS]
+    if unknown:
+        print(f"Error: Unknown key columns: {', '.join(unknown)}")
+        return None
+
+    processes = processes or os.cpu_count() or 1
+    conn = connect(db_path)
+    started = time.perf_counter()
+    stats = {'read': 0, 'inserted': 0, 'updated': 0, 'rejected': 0, 'hours_unparsed': 0,
+             'ungeocoded': 0}
+    rejects = []
+    triggers_dropped = False
+
+    try:
+        cursor = conn.cursor()
+        has_index = table_exists(cursor, FTS_TABLE)
+        if disable_triggers and has_index:
+            if (fts_table_options(cursor) or {}).get('content') == '':
+                print("Error: A contentless index cannot be rebuilt after the load; keep the triggers enabled")
+                return None
+            drop_triggers(cursor, FTS_TRIGGERS)
+            conn.commit()
+            triggers_dropped = True
+            print("Dropped FTS triggers for the load")
+
+        # Geocode written addresses once geocode_resources.py has built the table
+        gazetteer = Gazetteer.load(gazetteer_path) if table_exists(cursor, 'resource_geo') else None
+
+        # Natural key -> id of every existing resource
+        key_sql = ', '.join(key_columns)
+        ids_by_key = {natural_key(dict(zip(key_columns, row[1:])), key_columns): row[0]
+                      for row in cursor.execute(f"SELECT id, {key_sql} FROM resources ORDER BY id")}
+        next_id = (cursor.execute("SELECT MAX(id) FROM resources").fetchone()[0] or 0) + 1
+        print(f"Loaded {len(ids_by_key)} existing resource keys")
+
+        placeholders = ', '.join('?' * (len(IMPORT_COLUMNS) + 1))
+        insert_sql = f"INSERT INTO resources (id, {', '.join(IMPORT_COLUMNS)}) VALUES ({placeholders})"
+
+        def store(valid, rejected):
+            nonlocal next_id
+            inserts = []
+            # Updates grouped by the columns they set, one statement per group
+            updates = {}
+            # Resources whose hours_of_operation or address this batch sets
+            hours_ids = []
+            address_ids = []
+            for line, row, columns in valid:
+                key = natural_key(row, key_columns)
+                resource_id = ids_by_key.get(key)
+                if resource_id is None:
+                    resource_id = next_id
+                    next_id += 1
+                    ids_by_key[key] = resource_id
+                    inserts.append([resource_id] + [row[column] for column in IMPORT_COLUMNS])
+                    hours_ids.append(resource_id)
+                    address_ids.append(resource_id)
+                else:
+                    updates.setdefault(columns, []).append([row[column] for column in columns] + [resource_id])
+                    if 'hours_of_operation' in columns:
+                        hours_ids.append(resource_id)
+                    if 'address' in columns:
+                        address_ids.append(resource_id)
+
+            # Inserts first, so an update of a row inserted by this batch finds it
+            conn.executemany(insert_sql, inserts)
+            for columns, values in updates.items():
+                conn.executemany(update_sql(columns), values)
+            stats['hours_unparsed'] += len(reindex_hours(conn, hours_ids))
+            if gazetteer is not None:
+                stats['ungeocoded'] += len(geocode_rows(conn, address_ids, gazetteer))
+            conn.commit()
+
+            stats['read'] += len(valid) + len(rejected)
+            stats['inserted'] += len(inserts)
+            stats['updated'] += sum(len(values) for values in updates.values())
+            stats['rejected'] += len(rejected)
+            rejects.extend(rejected)
+            _report_progress(stats, started)
+
+        # Unparseable lines are rejected before they reach the workers
+        parse_rejects = []
+
+        def parsed_rows():
+            for line, raw in read_rows(input_path, input_format):
+                if raw is None:
+                    parse_rejects.append((line, 'not a JSON object', None))
+                else:
+                    yield line, raw
+
+        batches = _batches(parsed_rows(), batch_size)
+        if processes == 1:
+            for batch in batches:
+                store(*_normalize_batch(batch))
+        else:
+            with ProcessPoolExecutor(max_workers=processes) as executor:
+                # Store batches in input order so later rows win, with a
+                # bounded number in flight
+                pending = deque()
+                for batch in batches:
+                    if len(pending) >= processes * 2:
+                        store(*pending.popleft().result())
+                    pending.append(executor.submit(_normalize_batch, batch))
+                while pending:
+                    store(*pending.popleft().result())
+
+        stats['read'] += len(parse_rejects)
+        stats['rejected'] += len(parse_rejects)
+        rejects.extend(parse_rejects)
+
+        elapsed = time.perf_counter() - started
+        stats['seconds'] = elapsed
+        stats['rows_per_sec'] = stats['read'] / elapsed if elapsed > 0 else 0.0
+        print(f"Imported {stats['inserted']} new and {stats['updated']} updated resources, "
+              f"rejected {stats['rejected']}, in {elapsed:.2f}s ({stats['rows_per_sec']:.1f} rows/sec)")
+        if stats['hours_unparsed']:
+            print(f"Could not parse hours for {stats['hours_unparsed']} resources; "
+                  "they are left out of open_at searches (see index_hours.py)")
+        if stats['ungeocoded']:
+            print(f"Could not geocode {stats['ungeocoded']} addresses; "
+                  "they are left out of near= searches (see geocode_resources.py)")
+        return stats
+
+    except Exception as e:
+        print(f"Error importing resources: {str(e)}")
+        conn.rollback()
+        return None
+    finally:
+        if triggers_dropped:
+            # Restore the index even after a failed load; batches already
+            # committed are in resources
+            print("Rebuilding FTS index and restoring triggers...")
+            rebuild_started = time.perf_counter()
+            try:
+                conn.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+                create_fts_triggers(conn.cursor())
+                conn.commit()
+                print(f"Rebuilt FTS index in {time.perf_counter() - rebuild_started:.2f}s")
+            except sqlite3.Error as e:
+                print(f"Error restoring the FTS index, run setup_fts_index.py: {str(e)}")
+
+        if rejects_path and rejects:
+            write_rejects(rejects_path, rejects)
+        for line, reason, _ in rejects[:20]:
+            print(f"  Rejected line {line}: {reason}")
+        conn.close()
+
+
+def write_rejects(path, rejects):
+    """Write rejected rows to a CSV file with their line and reason."""
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['line', 'reason', 'row'])
+        for line, reason, raw in sorted(rejects, key=lambda reject: reject[0]):
+            writer.writerow([line, reason, json.dumps(raw) if raw is not None else ''])
+    print(f"Wrote {len(rejects)} rejected rows to {path}")
+
+
+def _report_progress(stats, started):
+    elapsed = time.perf_counter() - started
+    rate = stats['read'] / elapsed if elapsed > 0 else 0.0
+    print(f"  {stats['read']} rows processed ({rate:.1f} rows/sec)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk import resources from CSV or JSONL")
+    parser.add_argument('input_path')
+    parser.add_argument('db_path', nargs='?', default='resources.db')
+    parser.add_argument('--format', choices=['csv', 'jsonl'], default=None,
+                        help='Input format (default: from the file extension)')
+    parser.add_argument('--key', default=','.join(DEFAULT_KEY),
+                        help='Comma-separated natural key columns')
+    parser.add_argument('--batch-size', type=int, default=5000,
+                        help='Rows per transaction')
+    parser.add_argument('--processes', type=int, default=None,
+                        help='Validation worker processes (default: CPU count)')
+    parser.add_argument('--no-triggers', action='store_true',
+                        help='Drop the FTS triggers during the load and rebuild the index once afterwards')
+    parser.add_argument('--rejects', default=None,
+                        help='CSV file to write rejected rows to')
+    parser.add_argument('--gazetteer', default=DEFAULT_GAZETTEER,
+                        help='Gazetteer CSV for geocoding imported addresses')
+    args = parser.parse_args()
+
+    key_columns = tuple(column.strip() for column in args.key.split(',') if column.strip())
+    if bulk_import(args.db_path, args.input_path, args.format, key_columns, args.batch_size,
+                   args.processes, args.no_triggers, args.rejects, args.gazetteer) is None:
+        print("Failed to import resources")
+        sys.exit(1)
@@ -0,0 +1,192 @@
+"""
+Change log of resources for incremental client sync.
+
+This script:
+1. Creates the resource_changes log table and the triggers that append to
+   it on every insert, update and delete of a resource
+2. Compacts the log: only the newest change of each resource is kept, since
+   clients fetch the current row anyway
+3. Expires changes older than the retention period
+
+Clients sync with GET /api/changes?since=<seq>. A client whose last seen
+sequence number is older than the expired part of the log may have missed
+deletions; it gets a "resync required" answer and must reload everything.
+
+Commands:
+    python change_feed.py [database_path] setup
+    python change_feed.py [database_path] compact [--retain-days 30]
+    python change_feed.py [database_path] status
+"""
+
+import argparse
+import os
+import sys
+
+from db_connection import connect
+from search_queries import RESOURCE_COLUMNS
+
+CHANGE_LOG_TABLE = 'resource_changes'
+
+# Sequence numbers at or below the horizon have been expired from the log
+CHANGE_STATE_TABLE = 'resource_changes_state'
+
+CHANGE_TRIGGERS = ['resources_ci', 'resources_cu', 'resources_cd']
+
+DEFAULT_RETAIN_DAYS = 30
+
+CHANGES_SQL = f"""
+SELECT c.seq, c.op, c.changed_at, c.resource_id, {RESOURCE_COLUMNS}
+FROM {CHANGE_LOG_TABLE} c
+LEFT JOIN resources r ON r.id = c.resource_id
+WHERE c.seq > ?
+ORDER BY c.seq
+LIMIT ?
+"""
+
+
+def create_change_log(cursor):
+    """Create the change log table and its triggers if they don't exist."""
+    # AUTOINCREMENT: sequence numbers must never be reused, even after the
+    # newest entries are compacted away
+    cursor.execute(f"""
+    CREATE TABLE IF NOT EXISTS {CHANGE_LOG_TABLE} (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        resource_id INTEGER NOT NULL,
+        op TEXT NOT NULL CHECK (op IN ('insert', 'update', 'delete')),
+        changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """)
+    cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{CHANGE_LOG_TABLE}_resource "
+                   f"ON {CHANGE_LOG_TABLE}(resource_id, seq)")
+    cursor.execute(f"""
+    CREATE TABLE IF NOT EXISTS {CHANGE_STATE_TABLE} (
+        key TEXT PRIMARY KEY,
+        value INTEGER NOT NULL
+    )
+    """)
+
+    cursor.execute(f"""
+    CREATE TRIGGER IF NOT EXISTS resources_ci AFTER INSERT ON resources BEGIN
+        INSERT INTO {CHANGE_LOG_TABLE}(resource_id, op) VALUES (new.id, 'insert');
+    END;
+    """)
+    cursor.execute(f"""
+    CREATE TRIGGER IF NOT EXISTS resources_cu AFTER UPDATE ON resources BEGIN
+        INSERT INTO {CHANGE_LOG_TABLE}(resource_id, op) VALUES (new.id, 'update');
+    END;
+    """)
+    cursor.execute(f"""
+    CREATE TRIGGER IF NOT EXISTS resources_cd AFTER DELETE ON resources BEGIN
+        INSERT INTO {CHANGE_LOG_TABLE}(resource_id, op) VALUES (old.id, 'delete');
+    END;
+    """)
+
+
+def get_horizon(cursor):
+    """Highest expired sequence number; clients behind it must resync."""
+    cursor.execute(f"SELECT value FROM {CHANGE_STATE_TABLE} WHERE key = 'horizon'")
+    row = cursor.fetchone()
+    return row[0] if row else 0
+
+
+def latest_seq(cursor):
+    """Newest sequence number handed out so far."""
+    cursor.execute(f"SELECT seq FROM sqlite_sequence WHERE name = '{CHANGE_LOG_TABLE}'")
+    row = cursor.fetchone()
+    return row[0] if row else 0
+
+
+def iter_changes(cursor, since, limit):
+    """Yield change log rows after since, oldest first, joined to the current resource."""
+    cursor.execute(CHANGES_SQL, (since, limit))
+    for row in cursor:
+        yield row
+
+
+def compact_changes(db_path='resources.db', retain_days=DEFAULT_RETAIN_DAYS):
+    """
+    Compact and expire the change log.
+
+    Returns a dictionary with the number of entries collapsed and expired
+    and the new horizon, or None on failure.
+    """
+    print(f"Compacting change log for database at {db_path}")
+
+    if not os.path.exists(db_path):
+        print(f"Error: Database file not found at {db_path}")
+        return None
+
+    conn = connect(db_path, isolation_level=None)
+    cursor = conn.cursor()
+    try:
+        create_change_log(cursor)
+        cursor.execute("BEGIN IMMEDIATE")
+
+        # A client syncing from any point only needs each resource's newest
+        # change, since the feed returns the resource as it is now
+        cursor.execute(f"""
+        DELETE FROM {CHANGE_LOG_TABLE}
+        WHERE seq NOT IN (SELECT MAX(seq) FROM {CHANGE_LOG_TABLE} GROUP BY resource_id)
+        """)
+        collapsed = cursor.rowcount
+
+        # Past the retention period entries are dropped entirely; a client
+        # that has not synced since then could miss a deletion
+        cursor.execute(f"""
+        SELECT MAX(seq) FROM {CHANGE_LOG_TABLE}
+        WHERE changed_at < datetime('now', ?)
+        """, (f"-{retain_days} days",))
+        expired_seq = cursor.fetchone()[0]
+        expired = 0
+        horizon = get_horizon(cursor)
+        if expired_seq is not None:
+            cursor.execute(f"DELETE FROM {CHANGE_LOG_TABLE} WHERE seq <= ?", (expired_seq,))
+            expired = cursor.rowcount
+            horizon = max(horizon, expired_seq)
+            cursor.execute(f"INSERT OR REPLACE INTO {CHANGE_STATE_TABLE} (key, value) VALUES ('horizon', ?)",
+                           (horizon,))
+
+        cursor.execute("COMMIT")
+        print(f"Collapsed {collapsed} superseded changes, expired {expired} changes older than "
+              f"{retain_days} days; clients before sequence {horizon} must resync")
+        return {'collapsed': collapsed, 'expired': expired, 'horizon': horizon}
+
+    except Exception as e:
+        print(f"Error compacting change log: {str(e)}")
+        if conn.in_transaction:
+            cursor.execute("ROLLBACK")
+        return None
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manage the resource change log")
+    parser.add_argument('db_path', nargs='?', default='resources.db')
+    parser.add_argument('command', choices=['setup', 'compact', 'status'])
+    parser.add_argument('--retain-days', type=float, default=DEFAULT_RETAIN_DAYS,
+                        help='Expire changes older than this many days')
+    args = parser.parse_args()
+
+    if args.command == 'compact':
+        if compact_changes(args.db_path, args.retain_days) is None:
+            sys.exit(1)
+        sys.exit(0)
+
+    if not os.path.exists(args.db_path):
+        print(f"Error: Database file not found at {args.db_path}")
+        sys.exit(1)
+
+    conn = connect(args.db_path)
+    try:
+        cursor = conn.cursor()
+        create_change_log(cursor)
+        conn.commit()
+        if args.command == 'setup':
+            print("Change log table and triggers are in place")
+        cursor.execute(f"SELECT COUNT(*), MIN(seq) FROM {CHANGE_LOG_TABLE}")
+        count, oldest = cursor.fetchone()
+        print(f"Change log: {count} entries, oldest sequence {oldest}, latest {latest_seq(cursor)}, "
+              f"horizon {get_horizon(cursor)}")
+    finally:
+        conn.close()
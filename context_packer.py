@@ -0,0 +1,145 @@
+"""
+Token-budgeted packing of search results into an AI model's context.
+
+Resources are added in rank order until the budget is spent. Within a
+resource, fields are added most useful first (how to reach the service
+before how to apply), long text fields are cut to a per-field limit at a
+word boundary, and a field that doesn't fit whole is cut to the space
+left or skipped in favor of shorter fields after it.
+
+The budget is in tokens by default, estimated at CHARS_PER_TOKEN
+characters per token, or in characters with unit='chars'. Pass count= to
+measure with the model's own tokenizer instead:
+
+    packed = pack_resources(resources, 800, count=lambda text: len(tokenizer.encode(text)))
+    print(packed.text)
+    print(f"{packed.used}/{packed.budget} tokens, {packed.resources} resources")
+"""
+
+import math
+from collections import namedtuple
+
+# Rough characters per token of English text for common LLM tokenizers
+CHARS_PER_TOKEN = 4
+
+# (resource key, label, longest value in characters), most useful first.
+# None means the value is never cut to a per-field limit
+FIELDS = [
+    ('name', 'Name', None),
+    ('phone', 'Phone', None),
+    ('address', 'Address', None),
+    ('hours_of_operation', 'Hours', 200),
+    ('description', 'Description', 400),
+    ('eligibility_criteria', 'Eligibility', 300),
+    ('cost', 'Cost', 100),
+    ('url', 'Website', None),
+    ('email', 'Email', None),
+    ('application_process', 'Application Process', 300),
+    ('documents_required', 'Documents Required', 200),
+    ('languages_supported', 'Languages', 100),
+]
+
+# A field cut shorter than this many characters to fit is left out instead
+MIN_TRUNCATED_CHARS = 40
+
+ELLIPSIS = '...'
+
+# Packed context and how it used the budget. resources is the number of
+# resources included; truncated and omitted count fields cut short and
+# fields left out for lack of space
+PackedContext = namedtuple('PackedContext', ['text', 'used', 'budget', 'unit', 'resources',
+                                             'truncated', 'omitted'])
+
+
+def estimate_tokens(text):
+    """Estimate the number of tokens in text."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def truncate(text, max_chars):
+    """Cut text to at most max_chars characters at a word boundary."""
+    if len(text) <= max_chars:
+        return text
+    cut = text[:max(max_chars - len(ELLIPSIS), 0)]
+    if ' ' in cut:
+        cut = cut[:cut.rindex(' ')]
+    return cut.rstrip(' ,;:.') + ELLIPSIS
+
+
+def fit(label, value, remaining, count):
+    """
+    Return the longest line "label: value..." that costs at most remaining,
+    with value cut at a word boundary, or None if no cut of at least
+    MIN_TRUNCATED_CHARS characters fits.
+    """
+    words = value.split(' ')
+    best = None
+    # Binary search for the most words whose line fits; the cost of a line
+    # only grows with its length
+    low, high = 1, len(words) - 1
+    while low <= high:
+        middle = (low + high) // 2
+        line = f"{label}: {' '.join(words[:middle]).rstrip(' ,;:.')}{ELLIPSIS}\n"
+        if count(line) <= remaining:
+            best = line
+            low = middle + 1
+        else:
+            high = middle - 1
+    if best is None or len(best) - len(label) - len(': \n') < MIN_TRUNCATED_CHARS:
+        return None
+    return best
+
+
+def pack_resources(resources, budget, unit='tokens', count=None, fields=FIELDS, max_resources=None):
+    """
+    Pack ranked resources into at most budget tokens (or characters).
+
+    Returns a PackedContext whose text lists each included resource as a
+    "Resource N:" block of "Label: value" lines.
+    """
+    if count is None:
+        count = len if unit == 'chars' else estimate_tokens
+
+    parts = []
+    used = 0
+    included = 0
+    truncated = 0
+    omitted = 0
+    for resource in resources:
+        if max_resources is not None and included >= max_resources:
+            break
+
+        # The heading and the name go in together or not at all; resources
+        # after the first are set off by a blank line
+        separator = '\n' if included else ''
+        heading = f"{separator}Resource {included + 1}:\n"
+        name_line = f"Name: {resource.get('name') or 'Unnamed resource'}\n"
+        cost = count(heading) + count(name_line)
+        if used + cost > budget:
+            break
+        block = [heading, name_line]
+        used += cost
+        included += 1
+
+        for key, label, max_chars in fields:
+            value = resource.get(key)
+            if key == 'name' or not value:
+                continue
+            value = ' '.join(str(value).split())
+            line = f"{label}: {truncate(value, max_chars) if max_chars else value}\n"
+            was_cut = max_chars is not None and len(value) > max_chars
+            cost = count(line)
+            if used + cost > budget:
+                line = fit(label, value, budget - used, count)
+                if line is None:
+                    omitted += 1
+                    continue
+                was_cut = True
+                cost = count(line)
+            block.append(line)
+            used += cost
+            truncated += was_cut
+
+        parts.append(''.join(block))
+
+    return PackedContext(''.join(parts), used, budget, unit, included, truncated, omitted)
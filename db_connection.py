@@ -0,0 +1,67 @@
+"""
+SQLite connection settings shared by the search service and the tooling.
+
+With the default rollback journal a writer locks readers out while it
+commits, so admin edits during live search traffic fail with "database is
+locked". In WAL mode readers keep reading the last committed state while a
+single writer appends to the write-ahead log. A busy timeout makes writers
+wait for each other instead of failing immediately.
+"""
+
+import sqlite3
+from pathlib import Path
+
+# How long a connection waits for a lock before raising "database is locked"
+BUSY_TIMEOUT_MS = 5000
+
+# Checkpoint the WAL back into the database every this many pages...
+WAL_AUTOCHECKPOINT_PAGES = 1000
+
+# ...and truncate the WAL file to at most this size after a checkpoint
+JOURNAL_SIZE_LIMIT = 64 * 1024 * 1024
+
+
+def configure_connection(conn, busy_timeout_ms=BUSY_TIMEOUT_MS, wal=True):
+    """Apply the busy timeout and, unless wal is False, WAL mode to conn."""
+    conn.execute(f"PRAGMA busy_timeout = {int(busy_timeout_ms)}")
+    if wal:
+        # journal_mode=WAL is persistent; on an existing WAL database this
+        # is only a read
+        mode = conn.execute("PRAGMA journal_mode = WAL").fetchone()[0]
+        if mode.lower() == 'wal':
+            # NORMAL is durable against application crashes in WAL mode and
+            # skips an fsync per transaction
+            conn.execute("PRAGMA synchronous = NORMAL")
+            conn.execute(f"PRAGMA wal_autocheckpoint = {WAL_AUTOCHECKPOINT_PAGES}")
+            conn.execute(f"PRAGMA journal_size_limit = {JOURNAL_SIZE_LIMIT}")
+    return conn
+
+
+def connect(db_path, busy_timeout_ms=BUSY_TIMEOUT_MS, wal=True, **kwargs):
+    """Open a connection to db_path with the shared settings applied."""
+    conn = sqlite3.connect(db_path, timeout=busy_timeout_ms / 1000, **kwargs)
+    return configure_connection(conn, busy_timeout_ms, wal)
+
+
+def connect_immutable(db_path, **kwargs):
+    """
+    Open db_path read-only with immutable=1.
+
+    SQLite then takes no locks and never checks the file for changes, so
+    this is only safe for files nothing writes to, such as a snapshot from
+    export_snapshot.py.
+    """
+    uri = Path(db_path).resolve().as_uri() + '?immutable=1'
+    return sqlite3.connect(uri, uri=True, **kwargs)
+
+
+def checkpoint(conn, mode='PASSIVE'):
+    """
+    Checkpoint the WAL; returns (busy, wal pages, pages checkpointed).
+
+    PASSIVE never waits for readers; TRUNCATE waits and then empties the
+    WAL file.
+    """
+    if mode not in ('PASSIVE', 'FULL', 'RESTART', 'TRUNCATE'):
+        raise ValueError(f"Invalid checkpoint mode '{mode}'")
+    return tuple(conn.execute(f"PRAGMA wal_checkpoint({mode})").fetchone())
@@ -0,0 +1,290 @@
+"""
+Export a compact, read-only snapshot of the resource directory.
+
+Kiosks and offline laptops only ever search the directory, often from slow
+disks. This script:
+1. Copies the database with VACUUM INTO, a consistent copy taken without
+   blocking writers on the live database
+2. Drops everything search does not read: triggers, the change log, build
+   state, and the columns of each table that no query selects
+3. Rebuilds the FTS index with the snapshot profile and merges it into a
+   single segment, so a query reads one b-tree per term
+4. Writes the result with a larger page size through a second VACUUM INTO,
+   which also packs the pages freed by step 2
+5. Writes a manifest with row counts, the index options and a SHA-256
+   checksum of the snapshot next to it
+
+The search API opens a snapshot without any locking when SQLITE_IMMUTABLE
+is set; see README_fts_search_api.md.
+
+Usage:
+    python export_snapshot.py [database_path] snapshot.db [--profile prefix] [--page-size 8192]
+    python export_snapshot.py snapshot.db --verify
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+from datetime import datetime, timezone
+
+from db_connection import connect
+from search_queries import RESOURCE_COLUMNS
+from setup_fts_index import (FTS_TABLE, FTS_COLUMNS, fts_column_list, fts_profile_options,
+                             create_fts_table)
+
+# Tables the search API reads and the columns it reads from each; None
+# keeps every column. Virtual tables (resource_geo) are always copied whole.
+SNAPSHOT_TABLES = {
+    'resources': [column.strip()[len('r.'):] for column in RESOURCE_COLUMNS.split(',')],
+    'categories': ['id', 'name', 'description'],
+    'resource_categories': None,
+    'resource_hours': None,
+    'resource_geo': None,
+    'resource_embeddings': ['resource_id', 'model_version', 'dimension', 'vector']
+}
+
+# The snapshot is never written, so the larger prefix index costs nothing
+# at runtime and makes "foo*" queries read far fewer pages. It keeps full
+# detail, so bm25 and the phrases from synonym expansion still work.
+SNAPSHOT_PROFILE = 'prefix'
+
+# Larger pages mean fewer reads per b-tree lookup on slow disks
+SNAPSHOT_PAGE_SIZE = 8192
+
+MANIFEST_VERSION = 1
+
+def manifest_path(snapshot_path):
+    """Path of the manifest written next to a snapshot."""
+    return snapshot_path + '.manifest.json'
+
+def file_sha256(path):
+    """Hex SHA-256 of a file."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def drop_unused_tables(cursor, keep):
+    """Drop every table, view and trigger that is not in keep."""
+    cursor.execute("SELECT type, name FROM sqlite_master WHERE type IN ('trigger', 'view')")
+    for kind, name in cursor.fetchall():
+        cursor.execute(f"DROP {kind.upper()} {name}")
+
+    # Virtual tables first: dropping one also drops its shadow tables
+    cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND sql LIKE 'CREATE VIRTUAL TABLE%'")
+    virtual_tables = [name for name, in cursor.fetchall()]
+    for name in virtual_tables:
+        if name not in keep:
+            cursor.execute(f"DROP TABLE {name}")
+
+    kept_virtual = [name for name in virtual_tables if name in keep]
+    cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'")
+    for name, in cursor.fetchall():
+        if name in keep or any(name.startswith(table + '_') for table in kept_virtual):
+            continue
+        cursor.execute(f"DROP TABLE {name}")
+
+def keep_columns(cursor, table, columns):
+    """
+    Rebuild table with only the given columns, keeping types, NOT NULL
+    constraints and the primary key (when all its columns are kept).
+    """
+    cursor.execute(f"PRAGMA table_info({table})")
+    info = cursor.fetchall()
+    kept = [row for row in info if row[1] in columns]
+    if len(kept) == len(info):
+        return
+
+    primary_key = [row[1] for row in sorted(info, key=lambda row: row[5]) if row[5]]
+    if not set(primary_key) <= set(columns):
+        primary_key = []
+    # An INTEGER PRIMARY KEY is the rowid, which the FTS index is keyed on
+    rowid_alias = primary_key[0] if len(primary_key) == 1 and any(
+        row[1] == primary_key[0] and row[2].upper() == 'INTEGER' for row in kept) else None
+
+    definitions = []
+    for _, name, column_type, notnull, _, _ in kept:
+        definition = f"{name} {column_type}".strip()
+        if name == rowid_alias:
+            definition += ' PRIMARY KEY'
+        elif notnull:
+            definition += ' NOT NULL'
+        definitions.append(definition)
+    if primary_key and not rowid_alias:
+        definitions.append(f"PRIMARY KEY ({', '.join(primary_key)})")
+
+    column_list = ', '.join(row[1] for row in kept)
+    cursor.execute(f"CREATE TABLE {table}_snapshot ({', '.join(definitions)})")
+    cursor.execute(f"INSERT INTO {table}_snapshot ({column_list}) SELECT {column_list} FROM {table}")
+    cursor.execute(f"DROP TABLE {table}")
+    cursor.execute(f"ALTER TABLE {table}_snapshot RENAME TO {table}")
+
+def build_snapshot_index(cursor, profile):
+    """Create the FTS index with profile, fill it and merge it into one segment."""
+    create_fts_table(cursor, FTS_TABLE, profile)
+    cursor.execute(f"""
+    INSERT INTO {FTS_TABLE}(rowid, {fts_column_list()})
+    SELECT id, {fts_column_list()} FROM resources
+    """)
+    cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')")
+
+def table_counts(cursor):
+    """Row count of every snapshot table present in the database."""
+    counts = {}
+    for table in list(SNAPSHOT_TABLES) + [FTS_TABLE]:
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,))
+        if cursor.fetchone():
+            counts[table] = cursor.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+    return counts
+
+def export_snapshot(db_path='resources.db', output_path='snapshot.db', profile=SNAPSHOT_PROFILE,
+                    page_size=SNAPSHOT_PAGE_SIZE, embeddings=True):
+    """
+    Export a read-only snapshot of db_path to output_path.
+
+    Returns the manifest dictionary, or None on failure. An existing
+    snapshot at output_path is only replaced once the new one checks out.
+    """
+    print(f"Exporting snapshot of {db_path} to {output_path}")
+
+    if not os.path.exists(db_path):
+        print(f"Error: Database file not found at {db_path}")
+        return None
+
+    if page_size < 512 or page_size > 65536 or page_size & (page_size - 1):
+        print(f"Error: Page size must be a power of two between 512 and 65536, got {page_size}")
+        return None
+
+    try:
+        options = fts_profile_options(profile)
+    except ValueError as e:
+        print(f"Error: {str(e)}")
+        return None
+
+    keep = dict(SNAPSHOT_TABLES)
+    if not embeddings:
+        del keep['resource_embeddings']
+
+    staging_path = output_path + '.staging'
+    new_path = output_path + '.new'
+    for path in (staging_path, new_path):
+        if os.path.exists(path):
+            os.remove(path)
+
+    conn = None
+    try:
+        # 1. Consistent copy of the live database
+        conn = connect(db_path)
+        conn.execute("VACUUM INTO ?", (staging_path,))
+        conn.close()
+
+        # 2-3. Trim the copy and rebuild its index; the staging file is
+        # thrown away on failure, so it needs no journal
+        conn = sqlite3.connect(staging_path, isolation_level=None)
+        cursor = conn.cursor()
+        cursor.execute("PRAGMA journal_mode = OFF")
+        cursor.execute("PRAGMA synchronous = OFF")
+        cursor.execute("BEGIN")
+        cursor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+        drop_unused_tables(cursor, keep)
+        for table, columns in keep.items():
+            cursor.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (table,))
+            row = cursor.fetchone()
+            if row and columns is not None and not row[0].upper().startswith('CREATE VIRTUAL'):
+                keep_columns(cursor, table, columns)
+        build_snapshot_index(cursor, profile)
+        cursor.execute("COMMIT")
+        cursor.execute("ANALYZE")
+
+        # 4. Compact into the final file with the tuned page size
+        cursor.execute(f"PRAGMA page_size = {int(page_size)}")
+        cursor.execute("VACUUM INTO ?", (new_path,))
+        conn.close()
+
+        conn = sqlite3.connect(new_path)
+        cursor = conn.cursor()
+        integrity = cursor.execute("PRAGMA integrity_check").fetchone()[0]
+        if integrity != 'ok':
+            raise sqlite3.DatabaseError(f"Snapshot failed the integrity check: {integrity}")
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('integrity-check')")
+        counts = table_counts(cursor)
+        actual_page_size = cursor.execute("PRAGMA page_size").fetchone()[0]
+        conn.close()
+        conn = None
+
+        # 5. Manifest
+        os.replace(new_path, output_path)
+        manifest = {
+            'version': MANIFEST_VERSION,
+            'created_at': datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'),
+            'source': os.path.basename(db_path),
+            'file': os.path.basename(output_path),
+            'bytes': os.path.getsize(output_path),
+            'sha256': file_sha256(output_path),
+            'sqlite_version': sqlite3.sqlite_version,
+            'page_size': actual_page_size,
+            'fts_profile': profile if isinstance(profile, str) else 'custom',
+            'fts_options': options,
+            'fts_columns': FTS_COLUMNS,
+            'tables': counts
+        }
+        with open(manifest_path(output_path), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+
+        print(f"Snapshot written: {counts.get('resources', 0)} resources, "
+              f"{manifest['bytes'] / 1024:.1f} KiB, page size {actual_page_size}")
+        print(f"Manifest written to {manifest_path(output_path)}")
+        return manifest
+
+    except Exception as e:
+        print(f"Error exporting snapshot: {str(e)}")
+        return None
+    finally:
+        if conn is not None:
+            conn.close()
+        for path in (staging_path, new_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+def verify_snapshot(snapshot_path):
+    """Check a snapshot against the checksum in its manifest."""
+    path = manifest_path(snapshot_path)
+    if not os.path.exists(snapshot_path) or not os.path.exists(path):
+        print(f"Error: Snapshot or manifest not found for {snapshot_path}")
+        return False
+
+    with open(path, encoding='utf-8') as f:
+        manifest = json.load(f)
+
+    checksum = file_sha256(snapshot_path)
+    if checksum != manifest.get('sha256'):
+        print(f"Error: Checksum mismatch for {snapshot_path}; expected {manifest.get('sha256')}, got {checksum}")
+        return False
+
+    print(f"Snapshot {snapshot_path} matches its manifest ({manifest['tables'].get('resources', 0)} resources, "
+          f"created {manifest['created_at']})")
+    return True
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export a compact read-only snapshot for offline search")
+    parser.add_argument('db_path', nargs='?', default='resources.db')
+    parser.add_argument('output', help='Snapshot file to write, or to check with --verify')
+    parser.add_argument('--profile', default=SNAPSHOT_PROFILE,
+                        help=f"FTS index profile (default: {SNAPSHOT_PROFILE})")
+    parser.add_argument('--page-size', type=int, default=SNAPSHOT_PAGE_SIZE)
+    parser.add_argument('--no-embeddings', action='store_true',
+                        help='Leave out the precomputed embeddings used by hybrid search')
+    parser.add_argument('--verify', action='store_true',
+                        help='Check an existing snapshot against its manifest')
+    args = parser.parse_args()
+
+    if args.verify:
+        sys.exit(0 if verify_snapshot(args.output) else 1)
+
+    manifest = export_snapshot(args.db_path, args.output, args.profile, args.page_size,
+                               embeddings=not args.no_embeddings)
+    sys.exit(0 if manifest else 1)
@@ -0,0 +1,165 @@
+"""
+Federated FTS5 search across multiple resource databases.
+
+Each region keeps its own resources.db. FederatedSearch registers those
+database files as shards, runs the MATCH against every shard concurrently in
+a thread pool and merges the hits by bm25 score. A slow or broken shard is
+reported in the response instead of failing the whole search.
+"""
+
+import heapq
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from db_connection import connect
+from search_queries import search_fts
+
+# SQLite virtual machine steps between checks whether a shard was given up on
+CANCEL_CHECK_STEPS = 1000
+
+
+def parse_shard_spec(spec):
+    """Parse a "name=path,name=path" shard list into a dictionary."""
+    shards = {}
+    for entry in spec.split(','):
+        entry = entry.strip()
+        if not entry:
+            continue
+        if '=' in entry:
+            name, path = entry.split('=', 1)
+        else:
+            path = entry
+            name = os.path.splitext(os.path.basename(path))[0]
+        shards[name.strip()] = path.strip()
+    return shards
+
+
+class FederatedSearch:
+    """Search several resources.db files at once and merge the results."""
+
+    def __init__(self, shards=None, max_workers=8, timeout=5.0):
+        self.timeout = timeout
+        self.max_workers = max_workers
+        self._shards = {}
+        self._executor = None
+        self._lock = threading.Lock()
+        for name, db_path in (shards or {}).items():
+            self.register(name, db_path)
+
+    @property
+    def shards(self):
+        """Registered shards as a name -> database path dictionary."""
+        return dict(self._shards)
+
+    def register(self, name, db_path):
+        """Register a database file as a shard."""
+        self._shards[name] = db_path
+
+    def unregister(self, name):
+        """Remove a shard."""
+        self._shards.pop(name, None)
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix='federated-search'
+                )
+            return self._executor
+
+    def close(self):
+        """Shut down the worker threads."""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+
+    def _search_shard(self, name, db_path, query, depth, cancelled, open_at=None):
+        """Run the MATCH against one shard and tag every hit with its source."""
+        started = time.perf_counter()
+        if cancelled.is_set():
+            raise TimeoutError("Search was given up before this shard started")
+        if not os.path.exists(db_path):
+            raise FileNotFoundError(f"Database file not found: {db_path}")
+
+        # Each shard gets its own connection; sqlite3 connections are not
+        # shared between threads. The shared settings add a busy timeout,
+        # so a shard being written to waits instead of failing right away
+        conn = connect(db_path)
+        conn.row_factory = sqlite3.Row
+        # The handler aborts the query once the search gives up on the
+        # shard, however late the query started
+        conn.set_progress_handler(cancelled.is_set, CANCEL_CHECK_STEPS)
+        try:
+            hits, total = search_fts(conn, query, depth, 0, open_at)
+            for resource in hits:
+                resource['source'] = name
+        finally:
+            conn.close()
+
+        return hits, total, (time.perf_counter() - started) * 1000
+
+    def search(self, query, limit=10, offset=0, open_at=None):
+        """
+        Search every shard and merge the hits into one ranked page, limited
+        to resources open at the (day, minute) open_at if given.
+
+        Returns a dictionary with the merged resources, the total match count
+        over the shards that answered, and a per-shard report of latency,
+        hit count and any error.
+        """
+        depth = limit + offset
+        cancelled = threading.Event()
+        executor = self._get_executor()
+        futures = {
+            executor.submit(self._search_shard, name, db_path, query, depth, cancelled,
+                            open_at): name
+            for name, db_path in self._shards.items()
+        }
+
+        done, not_done = wait(futures, timeout=self.timeout)
+        if not_done:
+            # Abort the running queries and drop the queued ones, so the
+            # threads are freed up quickly
+            cancelled.set()
+            for future in not_done:
+                future.cancel()
+
+        shard_reports = []
+        shard_hits = []
+        total = 0
+        for future, name in futures.items():
+            report = {'source': name, 'success': False}
+            if future in not_done:
+                report['error'] = f'Timed out after {self.timeout}s'
+            elif future.exception() is not None:
+                report['error'] = str(future.exception())
+            else:
+                hits, count, latency_ms = future.result()
+                shard_hits.append(hits)
+                total += count
+                report.update({
+                    'success': True,
+                    'latency_ms': round(latency_ms, 2),
+                    'hits': len(hits),
+                    'total': count
+                })
+            shard_reports.append(report)
+
+        # bm25 scores are lower-is-better, so the global top-k are the
+        # smallest scores across all shards
+        top = heapq.nsmallest(
+            depth,
+            (hit for hits in shard_hits for hit in hits),
+            key=lambda hit: hit['score']
+        )
+
+        return {
+            'resources': top[offset:],
+            'total': total,
+            'shards': shard_reports
+        }
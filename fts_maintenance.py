@@ -0,0 +1,375 @@
+"""
+Keep the FTS5 index in step with resources and in good shape.
+
+This script:
+1. Detects drift between resources and resource_fts: rows missing from the
+   index, index rows whose resource is gone, and resources updated since
+   the last sync
+2. Resyncs only the drifted rows, falling back to a full 'rebuild' when
+   too many rows drifted
+3. Runs the FTS5 'merge', 'optimize' and 'automerge' commands to undo the
+   fragmentation left by heavy update churn
+4. Prints segment and index size statistics
+
+Commands:
+    python fts_maintenance.py [database_path] check
+    python fts_maintenance.py [database_path] sync
+    python fts_maintenance.py [database_path] merge [--pages 500]
+    python fts_maintenance.py [database_path] optimize
+    python fts_maintenance.py [database_path] automerge [--level 4]
+    python fts_maintenance.py [database_path] stats
+    python fts_maintenance.py [database_path] maintain [--interval 3600]
+
+'maintain' runs a sync, then a merge, then an optimize when the index has
+too many segments. With --interval it repeats forever, for running as a
+scheduled service.
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import time
+
+from setup_fts_index import (
+    FTS_TABLE, FTS_COLUMNS, fts_column_list, fts_index_size, fts_table_options, indexed_row_count, table_exists
+)
+from db_connection import connect
+
+SYNC_STATE_TABLE = 'fts_sync_state'
+
+# Above this many drifted rows a full 'rebuild' is cheaper than row fixes
+MAX_ROW_RESYNC = 1000
+
+# 'maintain' runs a full optimize once the index has more segments than this
+OPTIMIZE_SEGMENT_THRESHOLD = 16
+
+
+def create_sync_state_table(conn):
+    """Create the table holding the sync watermark."""
+    conn.execute(f"""
+    CREATE TABLE IF NOT EXISTS {SYNC_STATE_TABLE} (
+        key TEXT PRIMARY KEY,
+        value TEXT
+    )
+    """)
+
+
+def get_sync_watermark(conn):
+    """Return the updated_at value the index was last synced up to, or None."""
+    row = conn.execute(f"SELECT value FROM {SYNC_STATE_TABLE} WHERE key = 'last_updated_at'").fetchone()
+    return row[0] if row else None
+
+
+def set_sync_watermark(conn, value):
+    conn.execute(f"INSERT OR REPLACE INTO {SYNC_STATE_TABLE} (key, value) VALUES ('last_updated_at', ?)",
+                 (value,))
+
+
+def detect_drift(conn):
+    """
+    Compare resources with the index.
+
+    Returns a dictionary with the ids of resources missing from the index,
+    index rows without a resource ('orphaned'), and resources updated since
+    the last sync ('changed'), plus the newest updated_at seen.
+    """
+    create_sync_state_table(conn)
+    if not table_exists(conn.cursor(), f"{FTS_TABLE}_docsize"):
+        raise RuntimeError("Drift detection needs an index built with columnsize=1")
+
+    missing = [row[0] for row in conn.execute(f"""
+    SELECT id FROM resources
+    WHERE id NOT IN (SELECT id FROM {FTS_TABLE}_docsize)
+    ORDER BY id
+    """)]
+    orphaned = [row[0] for row in conn.execute(f"""
+    SELECT id FROM {FTS_TABLE}_docsize
+    WHERE id NOT IN (SELECT id FROM resources)
+    ORDER BY id
+    """)]
+
+    watermark = get_sync_watermark(conn)
+    changed = []
+    if watermark is not None:
+        missing_ids = set(missing)
+        changed = [row[0] for row in conn.execute(
+            "SELECT id FROM resources WHERE updated_at > ? ORDER BY id", (watermark,)
+        ) if row[0] not in missing_ids]
+
+    latest = conn.execute("SELECT MAX(updated_at) FROM resources").fetchone()[0]
+    return {
+        'missing': missing,
+        'orphaned': orphaned,
+        'changed': changed,
+        'watermark': watermark,
+        'latest_updated_at': latest
+    }
+
+
+def indexed_text(conn, rowids):
+    """
+    Reconstruct the indexed text of the given index rows.
+
+    An external content index does not keep the text it indexed, and the
+    FTS5 'delete' command needs exactly that text. The tokens are recovered
+    from the index itself through an fts5vocab 'instance' table and joined
+    back together in position order, which tokenizes to the same entries.
+    Returns {rowid: [text per column]}.
+    """
+    if not rowids:
+        return {}
+
+    conn.execute(f"CREATE VIRTUAL TABLE IF NOT EXISTS temp.{FTS_TABLE}_instance "
+                 f"USING fts5vocab(main, {FTS_TABLE}, instance)")
+
+    tokens = {rowid: {column: [] for column in FTS_COLUMNS} for rowid in rowids}
+    placeholders = ','.join('?' * len(rowids))
+    for term, doc, column, offset in conn.execute(f"""
+    SELECT term, doc, col, offset FROM temp.{FTS_TABLE}_instance
+    WHERE doc IN ({placeholders})
+    """, list(rowids)):
+        tokens[doc][column].append((offset, term))
+
+    return {
+        rowid: [' '.join(term for _, term in sorted(columns[column])) for column in FTS_COLUMNS]
+        for rowid, columns in tokens.items()
+    }
+
+
+def sync_index(db_path='resources.db', max_row_resync=MAX_ROW_RESYNC):
+    """
+    Resync the rows of the index that drifted from resources.
+
+    Returns a dictionary describing what was fixed, or None on failure.
+    """
+    print(f"Syncing FTS5 index for database at {db_path}")
+
+    if not os.path.exists(db_path):
+        print(f"Error: Database file not found at {db_path}")
+        return None
+
+    conn = connect(db_path, isolation_level=None)
+    try:
+        if not table_exists(conn.cursor(), FTS_TABLE):
+            print(f"Error: {FTS_TABLE} does not exist; run setup_fts_index.py first")
+            return None
+
+        conn.execute("BEGIN IMMEDIATE")
+        drift = detect_drift(conn)
+        stale = sorted(set(drift['orphaned']) | set(drift['changed']))
+        to_index = sorted(set(drift['missing']) | set(drift['changed']))
+        drifted = len(set(stale) | set(to_index))
+
+        # Recovering the indexed text needs token positions (detail=full)
+        options = fts_table_options(conn.cursor())
+        can_resync_rows = options.get('detail', 'full') == 'full'
+        needs_rebuild = drifted > max_row_resync or (stale and not can_resync_rows)
+        if needs_rebuild and options.get('content') == '':
+            raise RuntimeError("A contentless index cannot be rebuilt in place; recreate it with setup_fts_index.py")
+
+        if needs_rebuild:
+            print(f"{drifted} rows drifted; rebuilding the whole index")
+            conn.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+            mode = 'rebuild'
+        else:
+            # Remove the stale entries using the text they were indexed with
+            for rowid, values in indexed_text(conn, stale).items():
+                conn.execute(f"""
+                INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {fts_column_list()})
+                VALUES ('delete', ?, {','.join('?' * len(FTS_COLUMNS))})
+                """, [rowid] + values)
+
+            if to_index:
+                placeholders = ','.join('?' * len(to_index))
+                conn.execute(f"""
+                INSERT INTO {FTS_TABLE}(rowid, {fts_column_list()})
+                SELECT id, {fts_column_list()} FROM resources
+                WHERE id IN ({placeholders})
+                """, to_index)
+            mode = 'rows'
+
+        if drift['latest_updated_at'] is not None:
+            set_sync_watermark(conn, drift['latest_updated_at'])
+        conn.execute("COMMIT")
+
+        result = {
+            'mode': mode,
+            'missing': len(drift['missing']),
+            'orphaned': len(drift['orphaned']),
+            'changed': len(drift['changed'])
+        }
+        print(f"Sync ({mode}): {result['missing']} missing, {result['orphaned']} orphaned, "
+              f"{result['changed']} changed")
+        return result
+
+    except Exception as e:
+        print(f"Error syncing FTS5 index: {str(e)}")
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        return None
+    finally:
+        conn.close()
+
+
+def merge_index(conn, pages=500):
+    """
+    Merge index segments incrementally, pages at a time.
+
+    Repeats the 'merge' command until it has nothing left to do. Returns
+    the number of merge steps run.
+    """
+    steps = 0
+    while True:
+        before = conn.total_changes
+        conn.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rank) VALUES ('merge', ?)", (pages,))
+        steps += 1
+        # The FTS5 documentation's test for "no more work": fewer than 2 changes
+        if conn.total_changes - before < 2:
+            return steps
+
+
+def optimize_index(conn):
+    """Merge the whole index into a single segment."""
+    conn.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')")
+
+
+def set_automerge(conn, level):
+    """Set how many same-level segments FTS5 lets accumulate before merging them."""
+    conn.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rank) VALUES ('automerge', ?)", (level,))
+
+
+def index_stats(conn):
+    """Segment and size statistics for the index."""
+    cursor = conn.cursor()
+    segments = [
+        {'segment': segid, 'terms': terms, 'pages': pages}
+        for segid, terms, pages in cursor.execute(f"""
+        SELECT segid, COUNT(*), MAX(pgno) FROM {FTS_TABLE}_idx
+        GROUP BY segid ORDER BY segid
+        """)
+    ]
+    config = dict(cursor.execute(f"SELECT k, v FROM {FTS_TABLE}_config"))
+
+    table_bytes = {}
+    try:
+        for name, size in cursor.execute("""
+        SELECT name, SUM(pgsize) FROM dbstat
+        WHERE name = ? OR name LIKE ?
+        GROUP BY name
+        """, (FTS_TABLE, f"{FTS_TABLE}_%")):
+            table_bytes[name] = size
+    except sqlite3.OperationalError:
+        # dbstat is an optional SQLite extension
+        pass
+
+    return {
+        'rows': indexed_row_count(cursor),
+        'segments': len(segments),
+        'segment_detail': segments,
+        'index_bytes': fts_index_size(cursor),
+        'table_bytes': table_bytes,
+        'automerge': config.get('automerge'),
+        'crisismerge': config.get('crisismerge')
+    }
+
+
+def print_stats(stats):
+    print(f"Indexed rows: {stats['rows']}")
+    print(f"Segments: {stats['segments']}")
+    for segment in stats['segment_detail']:
+        print(f"  Segment {segment['segment']}: {segment['terms']} leaf entries, {segment['pages']} pages")
+    print(f"Index data: {stats['index_bytes'] / 1024:.1f} KiB")
+    for name, size in sorted(stats['table_bytes'].items()):
+        print(f"  {name}: {size / 1024:.1f} KiB on disk")
+    if stats['automerge'] is not None:
+        print(f"automerge: {stats['automerge']}")
+
+
+def run_command(db_path, command, pages=500, level=4):
+    """Run one maintenance command. Returns True on success."""
+    if command == 'sync':
+        return sync_index(db_path) is not None
+
+    if not os.path.exists(db_path):
+        print(f"Error: Database file not found at {db_path}")
+        return False
+
+    conn = connect(db_path)
+    try:
+        if not table_exists(conn.cursor(), FTS_TABLE):
+            print(f"Error: {FTS_TABLE} does not exist; run setup_fts_index.py first")
+            return False
+
+        if command == 'check':
+            drift = detect_drift(conn)
+            conn.commit()
+            print(f"Missing from index: {len(drift['missing'])}")
+            print(f"Orphaned in index: {len(drift['orphaned'])}")
+            if drift['watermark'] is None:
+                print("Changed since last sync: unknown (no sync has run yet)")
+            else:
+                print(f"Changed since {drift['watermark']}: {len(drift['changed'])}")
+
+        elif command == 'stats':
+            print_stats(index_stats(conn))
+
+        elif command == 'merge':
+            started = time.perf_counter()
+            steps = merge_index(conn, pages)
+            conn.commit()
+            print(f"Ran {steps} merge steps in {time.perf_counter() - started:.2f}s")
+
+        elif command == 'optimize':
+            started = time.perf_counter()
+            optimize_index(conn)
+            conn.commit()
+            print(f"Optimized index in {time.perf_counter() - started:.2f}s")
+
+        elif command == 'automerge':
+            set_automerge(conn, level)
+            conn.commit()
+            print(f"Set automerge to {level}")
+
+        elif command == 'maintain':
+            conn.close()
+            if sync_index(db_path) is None:
+                return False
+            conn = connect(db_path)
+            merge_index(conn, pages)
+            conn.commit()
+            stats = index_stats(conn)
+            if stats['segments'] > OPTIMIZE_SEGMENT_THRESHOLD:
+                print(f"{stats['segments']} segments; optimizing")
+                optimize_index(conn)
+                conn.commit()
+                stats = index_stats(conn)
+            print_stats(stats)
+
+        return True
+
+    except Exception as e:
+        print(f"Error running {command}: {str(e)}")
+        conn.rollback()
+        return False
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Maintain the resources FTS5 index")
+    parser.add_argument('db_path', nargs='?', default='resources.db')
+    parser.add_argument('command', choices=['check', 'sync', 'merge', 'optimize', 'automerge', 'stats', 'maintain'])
+    parser.add_argument('--pages', type=int, default=500,
+                        help='Pages written per merge step')
+    parser.add_argument('--level', type=int, default=4,
+                        help='automerge setting; 0 disables automatic merging')
+    parser.add_argument('--interval', type=float, default=None,
+                        help='Repeat the command every this many seconds')
+    args = parser.parse_args()
+
+    while True:
+        ok = run_command(args.db_path, args.command, args.pages, args.level)
+        if args.interval is None:
+            sys.exit(0 if ok else 1)
+        time.sleep(args.interval)
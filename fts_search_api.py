@@ -9,199 +9,461 @@ import sqlite3
 import os
 import json
 import sys
-from flask import Flask, request, jsonify
+import time
+import atexit
+import threading
+import hmac
+from datetime import datetime
+from zoneinfo import ZoneInfo
+from flask import Flask, Response, request, jsonify, stream_with_context
+from werkzeug.datastructures import MultiDict
+
+from search_queries import search_fts, fetch_resources, open_resource_ids, row_to_resource
+from federated_search import FederatedSearch, parse_shard_spec
+from hybrid_search import VectorIndexCache, reciprocal_rank_fusion
+from query_synonyms import SynonymExpander
+from request_coalescing import SingleFlight
+from shared_cache import SharedResultCache, data_version
+from geo_search import parse_point, search_near
+from hours_parser import HoursParseError, parse_open_at
+from index_hours import reindex_hours
+from geocode_resources import DEFAULT_GAZETTEER, Gazetteer, geocode_rows
+from kern_resources.core.embeddings import EmbeddingsHandler
+from setup_fts_index import fts_table_options, setup_fts_index
+from db_connection import connect, connect_immutable
+from write_queue import SerializedWriter
+from bulk_import import IMPORT_COLUMNS, RowError, normalize_values
+from change_feed import CHANGE_LOG_TABLE, get_horizon, iter_changes, latest_seq
+from similar_resources import TermVectorCache, search_similar
+from query_analytics import QueryLog, collapse_whitespace, read_history, summarize, top_queries
 
 app = Flask(__name__)
 
-def setup_fts_index(db_path):
-    """Set up FTS5 index for resources."""
-    print(f"Setting up FTS5 index for database at {db_path}")
+# Built lazily from FEDERATED_SHARDS / KERN_RESOURCES_SHARDS, once per worker
+_federated_search = None
 
-    # Connect to the database
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
+# Resource vectors for hybrid search, loaded once per worker
+_vector_indexes = VectorIndexCache()
+_embeddings_handler = None
 
-    try:
-        # Check if the resources table exists
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='resources'")
-        if not cursor.fetchone():
-            print("Error: Resources table does not exist")
-            return False
+# How many candidates each ranking contributes to the hybrid fusion
+HYBRID_CANDIDATES = 50
 
-        # Count resources
-        cursor.execute("SELECT COUNT(*) FROM resources")
-        resource_count = cursor.fetchone()[0]
-        print(f"Found {resource_count} resources in the database")
+# Search radius for near= queries when radius_km is not given
+DEFAULT_RADIUS_KM = 10.0
 
-        # Check if FTS5 is available
-        try:
-            cursor.execute("SELECT sqlite_version()")
-            version = cursor.fetchone()[0]
-            print(f"SQLite version: {version}")
-
-            # Create a test FTS5 table to check if FTS5 is available
-            cursor.execute("CREATE VIRTUAL TABLE temp.test_fts USING fts5(content)")
-            cursor.execute("DROP TABLE temp.test_fts")
-            print("FTS5 is available")
-        except sqlite3.OperationalError as e:
-            print(f"Error: FTS5 is not available - {str(e)}")
-            print("Please make sure your SQLite version supports FTS5")
-            return False
+# Time zone that open_now and resource hours are interpreted in
+HOURS_TIMEZONE = 'America/Los_Angeles'
 
-        # Check if the FTS5 table already exists
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='resource_fts'")
-        if cursor.fetchone():
-            print("FTS5 table already exists, dropping it to recreate")
-            cursor.execute("DROP TABLE resource_fts")
+# Synonym table, loaded once per worker and reloaded when the file changes
+DEFAULT_SYNONYMS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'synonyms.json')
+_synonym_expander = None
 
-        # Create the FTS5 virtual table
-        print("Creating FTS5 virtual table...")
-        cursor.execute("""
-        CREATE VIRTUAL TABLE resource_fts USING fts5(
-            name,
-            description,
-            eligibility_criteria,
-            application_process,
-            documents_required,
-            cost,
-            hours_of_operation,
-            languages_supported,
-            content='resources',
-            content_rowid='id'
-        )
-        """)
+# (path, Gazetteer) the admin update endpoint geocodes edited addresses with
+_gazetteer = None
 
-        # Populate the FTS5 table with existing data
-        print("Populating FTS5 table with existing data...")
-        cursor.execute("""
-        INSERT INTO resource_fts(rowid, name, description, eligibility_criteria,
-                                application_process, documents_required, cost,
-                                hours_of_operation, languages_supported)
-        SELECT id, name, description, eligibility_criteria,
-               application_process, documents_required, cost,
-               hours_of_operation, languages_supported
-        FROM resources
-        """)
-
-        # Check for existing triggers and drop them if they exist
-        print("Checking for existing triggers...")
-        for trigger_name in ['resources_ai', 'resources_au', 'resources_ad']:
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='trigger' AND name=?", (trigger_name,))
-            if cursor.fetchone():
-                print(f"Dropping existing trigger {trigger_name}...")
-                cursor.execute(f"DROP TRIGGER {trigger_name}")
-
-        # Create triggers to keep the FTS5 table in sync with the resources table
-        print("Creating triggers to keep the FTS5 table in sync...")
-
-        # Insert trigger
-        cursor.execute("""
-        CREATE TRIGGER resources_ai AFTER INSERT ON resources BEGIN
-            INSERT INTO resource_fts(rowid, name, description, eligibility_criteria,
-                                    application_process, documents_required, cost,
-                                    hours_of_operation, languages_supported)
-            VALUES (new.id, new.name, new.description, new.eligibility_criteria,
-                   new.application_process, new.documents_required, new.cost,
-                   new.hours_of_operation, new.languages_supported);
-        END;
-        """)
-
-        # Update trigger
-        cursor.execute("""
-        CREATE TRIGGER resources_au AFTER UPDATE ON resources BEGIN
-            UPDATE resource_fts
-            SET name = new.name,
-                description = new.description,
-                eligibility_criteria = new.eligibility_criteria,
-                application_process = new.application_process,
-                documents_required = new.documents_required,
-                cost = new.cost,
-                hours_of_operation = new.hours_of_operation,
-                languages_supported = new.languages_supported
-            WHERE rowid = old.id;
-        END;
-        """)
-
-        # Delete trigger
-        cursor.execute("""
-        CREATE TRIGGER resources_ad AFTER DELETE ON resources BEGIN
-            DELETE FROM resource_fts WHERE rowid = old.id;
-        END;
-        """)
+# Whether each database's index keeps token positions, stamped with its
+# data version
+_phrase_support = {}
 
-        # Commit changes
-        conn.commit()
+# Identical concurrent searches in this worker share one execution
+_search_flight = SingleFlight()
 
-        # Test the FTS5 index
-        print("\nTesting FTS5 index...")
-        cursor.execute("""
-        SELECT r.id, r.name, r.description
-        FROM resources r
-        JOIN resource_fts fts ON r.id = fts.rowid
-        WHERE resource_fts MATCH ?
-        LIMIT 5
-        """, ("food",))
-
-        results = cursor.fetchall()
-        print(f"Found {len(results)} resources matching 'food'")
-
-        if results:
-            print("\nSample results:")
-            for i, result in enumerate(results):
-                print(f"{i+1}. ID: {result[0]}, Name: {result[1]}")
-                if result[2]:
-                    print(f"   Description: {result[2][:100]}...")
-                else:
-                    print("   Description: None")
-                print()
-
-        print("FTS5 index setup completed successfully")
-        return True
+# Result cache shared by the workers on this host; enabled by SHARED_CACHE_PATH
+_shared_cache = None
 
-    except Exception as e:
-        print(f"Error setting up FTS5 index: {str(e)}")
-        conn.rollback()
-        return False
-    finally:
-        conn.close()
+# Admin edits are funneled through one writer thread per worker
+_writer = None
+_writer_lock = threading.Lock()
 
-def get_db_connection(db_path=None):
-    """Get a database connection."""
-    # Try different possible locations for the database
+# Distinctive terms of resources, for "more like this" lookups
+_term_vectors = TermVectorCache()
+
+# Sampled record of searches; history file set by QUERY_LOG_PATH
+_query_log = None
+
+# How many of the most frequent past queries a new worker runs before
+# taking traffic, and for how long at most
+WARM_QUERY_COUNT = 50
+WARM_MAX_SECONDS = 10.0
+
+def get_db_connection(db_path=None, **kwargs):
+    """Get a database connection; kwargs are passed to sqlite3.connect."""
     if db_path is None:
-        possible_paths = [
-            'resources.db',
-            'kern_resources_new/resources.db',
-            os.path.join('kern_resources_new', 'resources.db')
-        ]
-
-        for path in possible_paths:
-            if os.path.exists(path):
-                db_path = path
-                print(f"Using database at: {path}")
-                break
+        db_path = get_db_path()
 
     if not db_path or not os.path.exists(db_path):
         raise FileNotFoundError(f"Database file not found")
 
-    conn = sqlite3.connect(db_path)
+    if database_is_immutable():
+        conn = connect_immutable(db_path, **kwargs)
+    else:
+        # WAL lets searches keep reading while admin edits are committed
+        conn = connect(db_path, wal=app.config.get('SQLITE_WAL', True), **kwargs)
     conn.row_factory = sqlite3.Row
     return conn
 
+def database_is_immutable():
+    """Whether the database is a read-only snapshot opened without locking."""
+    immutable = app.config.get('SQLITE_IMMUTABLE')
+    if immutable is None:
+        immutable = os.environ.get('KERN_RESOURCES_IMMUTABLE', '') in ('1', 'true', 'yes')
+    return immutable
+
+def get_db_path():
+    """Find the database file, preferring DATABASE_PATH from the app config."""
+    db_path = app.config.get('DATABASE_PATH') or os.environ.get('KERN_RESOURCES_DB')
+    if db_path:
+        return db_path
+
+    # Try different possible locations for the database
+    possible_paths = [
+        'resources.db',
+        'kern_resources_new/resources.db',
+        os.path.join('kern_resources_new', 'resources.db')
+    ]
+
+    for path in possible_paths:
+        if os.path.exists(path):
+            print(f"Using database at: {path}")
+            return path
+
+    return None
+
+def get_federated_search():
+    """Get the worker's FederatedSearch, built from the configured shards."""
+    global _federated_search
+    if _federated_search is None:
+        shards = app.config.get('FEDERATED_SHARDS')
+        if shards is None:
+            shards = parse_shard_spec(os.environ.get('KERN_RESOURCES_SHARDS', ''))
+        _federated_search = FederatedSearch(
+            shards,
+            timeout=app.config.get('FEDERATED_TIMEOUT', 5.0)
+        )
+    return _federated_search
+
+def get_synonym_expander():
+    """Get the worker's SynonymExpander, or None if there is no synonym table."""
+    global _synonym_expander
+    path = (app.config.get('SYNONYMS_PATH') or os.environ.get('KERN_RESOURCES_SYNONYMS')
+            or DEFAULT_SYNONYMS_PATH)
+    if _synonym_expander is None or _synonym_expander.path != path:
+        if not os.path.exists(path):
+            return None
+        _synonym_expander = SynonymExpander(path)
+    return _synonym_expander
+
+def get_gazetteer():
+    """Get the worker's gazetteer, loaded from the app config on first use."""
+    global _gazetteer
+    path = (app.config.get('GAZETTEER_PATH') or os.environ.get('KERN_RESOURCES_GAZETTEER')
+            or DEFAULT_GAZETTEER)
+    if _gazetteer is None or _gazetteer[0] != path:
+        _gazetteer = (path, Gazetteer.load(path))
+    return _gazetteer[1]
+
+def index_supports_phrases(db_paths):
+    """
+    Whether the FTS5 index of every database keeps token positions.
+
+    Indexes built with detail=column or detail=none (the compact and
+    minimal profiles) reject phrase queries.
+    """
+    for db_path in db_paths:
+        if not db_path or not os.path.exists(db_path):
+            continue
+        version = data_version(db_path)
+        cached = _phrase_support.get(db_path)
+        if cached is None or cached[0] != version:
+            conn = get_db_connection(db_path)
+            try:
+                options = fts_table_options(conn.cursor()) or {}
+            finally:
+                conn.close()
+            cached = (version, options.get('detail', 'full') == 'full')
+            _phrase_support[db_path] = cached
+        if not cached[1]:
+            return False
+    return True
+
+def compile_query(query, expand=True, mode='fts'):
+    """Turn the user's query into the FTS5 expression that gets matched."""
+    expander = get_synonym_expander() if expand else None
+    if expander is None:
+        return query
+    if mode == 'federated':
+        db_paths = sorted(get_federated_search().shards.values())
+    else:
+        db_paths = [get_db_path()]
+    return expander.compile(query, phrases=index_supports_phrases(db_paths))
+
+def get_shared_cache():
+    """Get the host-wide result cache, or None if it is not configured."""
+    global _shared_cache
+    path = app.config.get('SHARED_CACHE_PATH') or os.environ.get('KERN_RESOURCES_CACHE')
+    if not path:
+        return None
+    if _shared_cache is None or _shared_cache.path != path:
+        max_bytes = app.config.get('SHARED_CACHE_MAX_BYTES', 64 * 1024 * 1024)
+        _shared_cache = SharedResultCache(path, max_bytes=max_bytes)
+    return _shared_cache
+
+def get_writer():
+    """Get the serialized writer for the current database."""
+    global _writer
+    db_path = get_db_path()
+    if not db_path or not os.path.exists(db_path):
+        raise FileNotFoundError("Database file not found")
+    # Two requests creating writers at once would mean two writer threads
+    with _writer_lock:
+        if _writer is None or _writer.db_path != db_path:
+            if _writer is not None:
+                _writer.close()
+            _writer = SerializedWriter(db_path)
+        return _writer
+
+def get_query_log():
+    """Get the worker's query log, created from the app config on first use."""
+    global _query_log
+    if _query_log is None:
+        path = app.config.get('QUERY_LOG_PATH') or os.environ.get('KERN_RESOURCES_QUERY_LOG')
+        sample_rate = app.config.get('QUERY_LOG_SAMPLE_RATE',
+                                     float(os.environ.get('KERN_RESOURCES_QUERY_SAMPLE', 1.0)))
+        _query_log = QueryLog(path, sample_rate=sample_rate,
+                              flush_interval=app.config.get('QUERY_LOG_FLUSH_INTERVAL', 60.0))
+        # Don't lose the last minute of queries when the worker exits
+        atexit.register(_query_log.flush)
+    return _query_log
+
+def get_embeddings_handler():
+    """Get the encoder used for hybrid search."""
+    global _embeddings_handler
+    handler = app.config.get('EMBEDDINGS_HANDLER')
+    if handler is not None:
+        return handler
+    if _embeddings_handler is None:
+        _embeddings_handler = EmbeddingsHandler()
+    return _embeddings_handler
+
+@app.after_request
+def add_etag(response):
+    """
+    Tag GET responses with an ETag and answer If-None-Match with 304.
+
+    Lets clients revalidate a cached resource or search without
+    downloading it again. Streamed and admin responses are left alone.
+    """
+    if (request.method == 'GET' and response.status_code == 200 and not response.is_streamed
+            and request.path.startswith('/api/') and not request.path.startswith('/api/admin/')):
+        response.add_etag()
+        response.make_conditional(request)
+    return response
+
 @app.route('/api/search', methods=['GET'])
 def search():
     """Search resources using FTS5."""
-    query = request.args.get('q', '')
-    limit = request.args.get('limit', 10, type=int)
-    offset = request.args.get('offset', 0, type=int)
+    params = search_params(request.args)
 
-    if not query:
+    if not params['query']:
         return jsonify({
             'success': False,
             'error': 'No query provided',
             'resources': []
         })
 
+    started = time.perf_counter()
+    result = run_search(params)
+    get_query_log().record(params['query'], (time.perf_counter() - started) * 1000,
+                           result.get('total') if result.get('success') else None, params['mode'])
+    return jsonify(result)
+
+@app.route('/api/admin/top-queries', methods=['GET'])
+def top_queries_view():
+    """
+    Summarize the most frequent searches.
+
+    Reads the host's query history file when one is configured, otherwise
+    this worker's in-memory buffer. The queries are raw user text, so this
+    needs the admin token.
+    """
+    denied = check_admin_token()
+    if denied is not None:
+        return denied
+
+    limit = request.args.get('limit', 20, type=int)
+    query_log = get_query_log()
+    query_log.flush()
+    if query_log.path:
+        entries = read_history(query_log.path)
+        source = 'history'
+    else:
+        entries = query_log.entries()
+        source = 'memory'
+
+    return jsonify({
+        'success': True,
+        'source': source,
+        'entries': len(entries),
+        'sample_rate': query_log.sample_rate,
+        'queries': summarize(entries, limit)
+    })
+
+def warm_caches(count=None, max_seconds=WARM_MAX_SECONDS):
+    """
+    Run the most frequent past queries to warm the caches.
+
+    Fills the shared result cache and pulls the pages those searches read
+    into the OS page cache, so the first users after a deploy don't pay
+    for a cold start. Returns the number of queries run.
+    """
+    query_log = get_query_log()
+    if not query_log.path:
+        return 0
+    if count is None:
+        count = int(app.config.get('WARM_QUERY_COUNT', os.environ.get('KERN_RESOURCES_WARM_QUERIES',
+                                                                      WARM_QUERY_COUNT)))
+
+    started = time.perf_counter()
+    warmed = 0
+    for query in top_queries(read_history(query_log.path), count):
+        if time.perf_counter() - started > max_seconds:
+            break
+        # Same parameters as a plain /api/search?q=..., so the cache
+        # entries match real requests
+        run_search(search_params(MultiDict({'q': query})))
+        warmed += 1
+
+    if warmed:
+        print(f"Warmed caches with {warmed} queries in {time.perf_counter() - started:.2f} seconds")
+    return warmed
+
+@app.route('/api/admin/metrics', methods=['GET'])
+def metrics():
+    """Report search service metrics for this worker."""
+    denied = check_admin_token()
+    if denied is not None:
+        return denied
+
+    cache = get_shared_cache()
+    return jsonify({
+        'success': True,
+        'pid': os.getpid(),
+        'coalescing': _search_flight.stats(),
+        'shared_cache': cache.stats() if cache else None,
+        'writes': _writer.stats() if _writer else None,
+        'term_vectors': _term_vectors.stats(),
+        'queries': get_query_log().stats()
+    })
+
+def search_params(args):
+    """Read the search parameters from the request arguments."""
+    return {
+        'query': args.get('q', ''),
+        'limit': args.get('limit', 10, type=int),
+        'offset': args.get('offset', 0, type=int),
+        'mode': args.get('mode', 'fts'),
+        'expand': args.get('expand', '1') != '0',
+        'near': args.get('near'),
+        'radius_km': args.get('radius_km', DEFAULT_RADIUS_KM, type=float),
+        'open_at': open_at_param(args)
+    }
+
+def open_at_param(args):
+    """
+    Read open_at, or turn open_now=1 into the current local time.
+
+    open_now is resolved here, to the minute, so searches keyed on it don't
+    share results across different times.
+    """
+    if args.get('open_now') in ('1', 'true'):
+        timezone = ZoneInfo(app.config.get('HOURS_TIMEZONE', HOURS_TIMEZONE))
+        return datetime.now(timezone).strftime('%Y-%m-%dT%H:%M')
+    return args.get('open_at')
+
+def search_key(params):
+    """Normalized key identifying searches that return the same result."""
+    normalized = dict(params, query=collapse_whitespace(params['query']))
+    return (get_db_path(),) + tuple(sorted(normalized.items()))
+
+def run_search(params):
+    """
+    Run a search, sharing the result with identical concurrent searches.
+
+    Results come from the host-wide shared cache when it holds an entry for
+    the current data version. Otherwise requests with the same normalized
+    key that arrive while the search is running wait for it instead of
+    querying the database again.
+    """
+    key = search_key(params)
+    cache = get_shared_cache()
+    if cache is None:
+        return _search_flight.do(key, lambda: execute_search(params))
+
+    # The compiled query is part of the key so a synonym table change
+    # doesn't serve results computed with the old expansions
+    match_query = compile_query(params['query'], params['expand'], params['mode'])
+    cache_key = cache.make_key(key + (match_query,))
+    version = search_data_version(params)
+    cached = cache.get(cache_key, version)
+    if cached is not None:
+        return cached
+
+    def execute_and_store():
+        result = execute_search(params)
+        if result.get('success'):
+            cache.set(cache_key, version, result)
+        return result
+
+    return _search_flight.do(key, execute_and_store)
+
+def search_data_version(params):
+    """Data version of every database a search reads from."""
+    if params['mode'] == 'federated':
+        return data_version(*sorted(get_federated_search().shards.values()))
+    return data_version(get_db_path())
+
+def execute_search(params):
+    """Run a search and return the response payload."""
+    query = params['query']
+    limit = params['limit']
+    offset = params['offset']
+    match_query = compile_query(query, params['expand'], params['mode'])
+
+    # Proximity ranking blends bm25 with distance, which the merged
+    # rankings of these modes can't do; say so instead of ignoring near=
+    if params['near'] and params['mode'] in ('federated', 'hybrid'):
+        return {
+            'success': False,
+            'error': f"near is not supported with mode={params['mode']}",
+            'resources': []
+        }
+
+    try:
+        open_at = parse_open_at(params['open_at']) if params['open_at'] else None
+    except HoursParseError as e:
+        return {
+            'success': False,
+            'error': str(e),
+            'resources': []
+        }
+
+    if params['mode'] == 'federated':
+        result = federated_search(query, match_query, limit, offset, open_at)
+    elif params['mode'] == 'hybrid':
+        result = hybrid_search(query, match_query, limit, offset, open_at)
+    else:
+        return fts_search(params, match_query, open_at)
+    if open_at and result.get('success'):
+        result['open_at'] = params['open_at']
+    return result
+
+def fts_search(params, match_query, open_at):
+    """Run the default FTS5 search, optionally near a point."""
+    query = params['query']
+    limit = params['limit']
+    offset = params['offset']
+
     try:
         # Connect to the database
         conn = get_db_connection()
@@ -210,86 +472,159 @@ def search():
         # Check if the FTS5 table exists
         cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='resource_fts'")
         if not cursor.fetchone():
-            print("FTS5 index not found. Creating it now...")
             conn.close()  # Close the current connection
+            if database_is_immutable():
+                return {
+                    'success': False,
+                    'error': 'FTS5 index not found in the read-only snapshot',
+                    'resources': []
+                }
+            print("FTS5 index not found. Creating it now...")
 
             # Get the database path
-            db_path = conn.path if hasattr(conn, 'path') else 'kern_resources_new/resources.db'
+            db_path = get_db_path() or 'kern_resources_new/resources.db'
 
             # Set up the FTS5 index
             if not setup_fts_index(db_path):
-                return jsonify({
+                return {
                     'success': False,
                     'error': 'Failed to create FTS5 index. Please check the logs.',
                     'resources': []
-                })
+                }
 
             # Reconnect to the database
             conn = get_db_connection(db_path)
             cursor = conn.cursor()
 
-        # Search using FTS5
-        cursor.execute("""
-        SELECT r.id, r.name, r.description, r.url, r.phone, r.email, r.address,
-               r.eligibility_criteria, r.application_process, r.documents_required,
-               r.cost, r.hours_of_operation, r.languages_supported, r.is_active,
-               r.is_verified
-        FROM resources r
-        JOIN resource_fts fts ON r.id = fts.rowid
-        WHERE resource_fts MATCH ?
-        LIMIT ? OFFSET ?
-        """, (query, limit, offset))
+        # Search using FTS5, restricted to the area around near= and to
+        # resources open at open_at if given
+        if params['near']:
+            lat, lon = parse_point(params['near'])
+            resources, total = search_near(conn, match_query, lat, lon, params['radius_km'],
+                                           limit, offset, open_at)
+        else:
+            resources, total = search_fts(conn, match_query, limit, offset, open_at)
 
-        # Convert results to a list of dictionaries
-        resources = []
-        for row in cursor.fetchall():
-            resource = {
-                'id': row['id'],
-                'name': row['name'],
-                'description': row['description'],
-                'url': row['url'],
-                'phone': row['phone'],
-                'email': row['email'],
-                'address': row['address'],
-                'eligibility_criteria': row['eligibility_criteria'],
-                'application_process': row['application_process'],
-                'documents_required': row['documents_required'],
-                'cost': row['cost'],
-                'hours_of_operation': row['hours_of_operation'],
-                'languages_supported': row['languages_supported'],
-                'is_active': bool(row['is_active']),
-                'is_verified': bool(row['is_verified'])
-            }
-            resources.append(resource)
+        # Close the connection
+        conn.close()
 
-        # Get total count
-        cursor.execute("""
-        SELECT COUNT(*) as count
-        FROM resources r
-        JOIN resource_fts fts ON r.id = fts.rowid
-        WHERE resource_fts MATCH ?
-        """, (query,))
+        result = {
+            'success': True,
+            'query': query,
+            'match_query': match_query,
+            'total': total,
+            'limit': limit,
+            'offset': offset,
+            'resources': resources
+        }
+        if params['near']:
+            result['near'] = {'latitude': lat, 'longitude': lon, 'radius_km': params['radius_km']}
+        if open_at:
+            result['open_at'] = params['open_at']
+        return result
 
-        total = cursor.fetchone()['count']
+    except Exception as e:
+        return {
+            'success': False,
+            'error': str(e),
+            'resources': []
+        }
 
-        # Close the connection
+def federated_search(query, match_query, limit, offset, open_at=None):
+    """
+    Search all registered shard databases and merge the results. open_at
+    is an optional (day, minute) the resources must be open at.
+    """
+    searcher = get_federated_search()
+    if not searcher.shards:
+        return {
+            'success': False,
+            'error': 'No federated shards configured',
+            'resources': []
+        }
+
+    result = searcher.search(match_query, limit, offset, open_at)
+    return {
+        'success': any(shard['success'] for shard in result['shards']),
+        'query': query,
+        'match_query': match_query,
+        'mode': 'federated',
+        'total': result['total'],
+        'limit': limit,
+        'offset': offset,
+        'resources': result['resources'],
+        'shards': result['shards']
+    }
+
+def hybrid_search(query, match_query, limit, offset, open_at=None):
+    """
+    Combine FTS5 and embedding rankings with reciprocal rank fusion. open_at
+    is an optional (day, minute) the resources must be open at.
+    """
+    try:
+        db_path = get_db_path()
+        conn = get_db_connection(db_path)
+        depth = max(limit + offset, HYBRID_CANDIDATES)
+
+        # Free-text queries are not always valid FTS5 syntax; the semantic
+        # ranking still applies when the MATCH fails
+        try:
+            lexical, _ = search_fts(conn, match_query, depth, 0, open_at)
+        except sqlite3.OperationalError as e:
+            print(f"Lexical search failed for hybrid query: {str(e)}")
+            lexical = []
+
+        handler = get_embeddings_handler()
+        index = _vector_indexes.get(db_path, handler, get_db_connection)
+        warning = None
+        if not len(index):
+            # Encoding the corpus here would stall the request; rank by
+            # FTS5 alone until the vectors are precomputed
+            warning = (f"No precomputed embeddings for model {handler.model_name}; "
+                       "results are ranked by FTS5 only. Run precompute_embeddings.py "
+                       "to enable semantic ranking.")
+            print(warning)
+            semantic = []
+        elif open_at:
+            # Rank the whole index, then keep the resources that are open
+            semantic = index.search(handler.encode_text(query), len(index))
+            open_ids = open_resource_ids(conn, [hit[0] for hit in semantic], open_at)
+            semantic = [hit for hit in semantic if hit[0] in open_ids][:depth]
+        else:
+            semantic = index.search(handler.encode_text(query), depth)
+
+        fused = reciprocal_rank_fusion([
+            [resource['id'] for resource in lexical],
+            [resource_id for resource_id, _ in semantic]
+        ])
+        page = fused[offset:offset + limit]
+        resources = fetch_resources(conn, [resource_id for resource_id, _ in page])
         conn.close()
 
-        return jsonify({
+        scores = dict(page)
+        for resource in resources:
+            resource['rrf_score'] = scores[resource['id']]
+
+        result = {
             'success': True,
             'query': query,
-            'total': total,
+            'match_query': match_query,
+            'mode': 'hybrid',
+            'total': len(fused),
             'limit': limit,
             'offset': offset,
             'resources': resources
-        })
+        }
+        if warning:
+            result['warning'] = warning
+        return result
 
     except Exception as e:
-        return jsonify({
+        return {
             'success': False,
             'error': str(e),
             'resources': []
-        })
+        }
 
 @app.route('/api/resource/<int:resource_id>', methods=['GET'])
 def get_resource(resource_id):
@@ -319,23 +654,7 @@ def get_resource(resource_id):
             })
 
         # Convert row to a dictionary
-        resource = {
-            'id': row['id'],
-            'name': row['name'],
-            'description': row['description'],
-            'url': row['url'],
-            'phone': row['phone'],
-            'email': row['email'],
-            'address': row['address'],
-            'eligibility_criteria': row['eligibility_criteria'],
-            'application_process': row['application_process'],
-            'documents_required': row['documents_required'],
-            'cost': row['cost'],
-            'hours_of_operation': row['hours_of_operation'],
-            'languages_supported': row['languages_supported'],
-            'is_active': bool(row['is_active']),
-            'is_verified': bool(row['is_verified'])
-        }
+        resource = row_to_resource(row)
 
         # Get categories for the resource
         cursor.execute("""
@@ -371,6 +690,252 @@ def get_resource(resource_id):
             'resource': None
         })
 
+@app.route('/api/resource/<int:resource_id>/similar', methods=['GET'])
+def similar_resources(resource_id):
+    """
+    Find resources similar to a resource.
+
+    The resource's most distinctive terms run as a weighted OR query; the
+    resource itself is left out of the results.
+    """
+    limit = request.args.get('limit', 10, type=int)
+    offset = request.args.get('offset', 0, type=int)
+
+    try:
+        db_path = get_db_path()
+        conn = get_db_connection(db_path)
+        try:
+            terms = _term_vectors.get(conn, db_path, resource_id)
+            if terms is None:
+                return jsonify({
+                    'success': False,
+                    'error': f'Resource with ID {resource_id} not found',
+                    'resources': []
+                })
+            resources, total = search_similar(conn, terms, resource_id, limit, offset)
+        finally:
+            conn.close()
+
+        return jsonify({
+            'success': True,
+            'resource_id': resource_id,
+            'terms': [term for term, _ in terms],
+            'total': total,
+            'limit': limit,
+            'offset': offset,
+            'resources': resources
+        })
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'resources': []
+        })
+
+def get_admin_token():
+    """Token admin requests must carry, or None when they are disabled."""
+    return app.config.get('ADMIN_TOKEN') or os.environ.get('KERN_RESOURCES_ADMIN_TOKEN')
+
+def check_admin_token():
+    """
+    Return an error response unless the request carries the admin token
+    as "Authorization: Bearer <token>", or None if it does.
+    """
+    token = get_admin_token()
+    if not token:
+        return jsonify({
+            'success': False,
+            'error': 'Admin endpoints are disabled; set KERN_RESOURCES_ADMIN_TOKEN to enable them'
+        }), 403
+
+    supplied = request.headers.get('Authorization', '')
+    if not hmac.compare_digest(supplied.encode('utf-8'), f"Bearer {token}".encode('utf-8')):
+        return jsonify({
+            'success': False,
+            'error': 'Missing or invalid admin token'
+        }), 401
+    return None
+
+@app.route('/api/admin/resource/<int:resource_id>', methods=['PUT'])
+def update_resource(resource_id):
+    """
+    Update fields of a resource.
+
+    Takes a JSON object of the fields to change, validated and normalized
+    like imported rows. Requires the admin token. The write is queued on
+    the worker's serialized writer, which commits waiting edits together.
+    """
+    denied = check_admin_token()
+    if denied is not None:
+        return denied
+
+    try:
+        if database_is_immutable():
+            return jsonify({
+                'success': False,
+                'error': 'The database is a read-only snapshot',
+                'resource': None
+            })
+
+        changes = request.get_json(silent=True)
+        if not isinstance(changes, dict) or not changes:
+            return jsonify({
+                'success': False,
+                'error': 'Expected a JSON object of fields to update',
+                'resource': None
+            })
+
+        unknown = sorted(set(changes) - set(IMPORT_COLUMNS))
+        if unknown:
+            return jsonify({
+                'success': False,
+                'error': f"Unknown fields: {', '.join(unknown)}",
+                'resource': None
+            })
+
+        columns = [column for column in IMPORT_COLUMNS if column in changes]
+        try:
+            values = normalize_values(changes, columns)
+            for column in ('name', 'is_active', 'is_verified'):
+                if column in values and values[column] is None:
+                    raise RowError(f"{column} cannot be empty")
+        except RowError as e:
+            return jsonify({
+                'success': False,
+                'error': f"Invalid update: {str(e)}",
+                'resource': None
+            })
+
+        gazetteer = get_gazetteer() if 'address' in columns else None
+
+        def write(conn):
+            cursor = conn.execute(f"""
+            UPDATE resources
+            SET {', '.join(f'{column} = ?' for column in columns)}, updated_at = CURRENT_TIMESTAMP
+            WHERE id = ?
+            """, [values[column] for column in columns] + [resource_id])
+            if cursor.rowcount == 0:
+                return None
+            # Keep the open_at and near= tables current, in the same transaction
+            warnings = []
+            if 'hours_of_operation' in columns:
+                for _, _, error in reindex_hours(conn, [resource_id]):
+                    warnings.append(f"Could not parse hours_of_operation ({error}); "
+                                    "the resource is left out of open_at searches")
+            if gazetteer is not None and geocode_rows(conn, [resource_id], gazetteer):
+                warnings.append("Could not geocode the address; "
+                                "the resource is left out of near= searches")
+            return warnings
+
+        warnings = get_writer().call(write).result(30)
+
+        if warnings is None:
+            return jsonify({
+                'success': False,
+                'error': f'Resource with ID {resource_id} not found',
+                'resource': None
+            })
+
+        response = get_resource(resource_id)
+        if warnings:
+            payload = response.get_json()
+            payload['warning'] = ' '.join(warnings)
+            return jsonify(payload)
+        return response
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'resource': None
+        })
+
+# Largest page of changes /api/changes returns at once
+MAX_CHANGES_LIMIT = 5000
+
+@app.route('/api/changes', methods=['GET'])
+def changes():
+    """
+    Stream the resource changes after a sequence number.
+
+    Each change carries the resource as it is now, or null once deleted.
+    Clients pass the returned next_since on their next call; when has_more
+    is set there are further changes to fetch right away.
+    """
+    try:
+        since = int(request.args.get('since', 0))
+        limit = min(max(int(request.args.get('limit', 500)), 1), MAX_CHANGES_LIMIT)
+    except ValueError:
+        return jsonify({
+            'success': False,
+            'error': 'since and limit must be integers',
+            'changes': []
+        })
+
+    try:
+        # The streamed body may be resumed on another thread (asgi_bridge),
+        # though never by two at once
+        conn = get_db_connection(check_same_thread=False)
+        cursor = conn.cursor()
+        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name=?", (CHANGE_LOG_TABLE,))
+        if not cursor.fetchone():
+            conn.close()
+            return jsonify({
+                'success': False,
+                'error': 'Change log is not set up; run change_feed.py setup',
+                'changes': []
+            })
+
+        horizon = get_horizon(cursor)
+        if since < horizon:
+            latest = latest_seq(cursor)
+            conn.close()
+            return jsonify({
+                'success': False,
+                'error': f'Changes before sequence {horizon} have expired; reload all resources',
+                'resync_required': True,
+                'latest_seq': latest,
+                'changes': []
+            }), 410
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'changes': []
+        })
+
+    def generate():
+        # One read transaction, so the page is a consistent snapshot
+        try:
+            cursor.execute("BEGIN")
+            latest = latest_seq(cursor)
+            yield '{"success": true, "since": %d, "changes": [' % since
+
+            next_since = since
+            count = 0
+            for row in iter_changes(conn.cursor(), since, limit):
+                change = {
+                    'seq': row['seq'],
+                    'op': row['op'],
+                    'id': row['resource_id'],
+                    'changed_at': row['changed_at'],
+                    'resource': row_to_resource(row) if row['id'] is not None else None
+                }
+                yield (',' if count else '') + json.dumps(change)
+                next_since = row['seq']
+                count += 1
+
+            has_more = count == limit and next_since < latest
+            yield '], "next_since": %d, "latest_seq": %d, "has_more": %s}' % (
+                next_since, latest, 'true' if has_more else 'false')
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            conn.close()
+
+    return Response(stream_with_context(generate()), mimetype='application/json')
+
 @app.route('/')
 def index():
     """Simple web interface for testing the API."""
@@ -480,4 +1045,5 @@ def index():
     """
 
 if __name__ == '__main__':
+    warm_caches()
     app.run(host='0.0.0.0', port=8082, debug=True)
@@ -0,0 +1,46 @@
+"""
+ASGI entry point for the FTS5 search API.
+
+Serves the same endpoints as fts_search_api.py through AsgiBridge: client
+connections are handled on the event loop, and only the SQLite work runs
+in a bounded thread pool. Requests beyond the configured limit get a 503
+instead of queueing.
+
+Run it with an ASGI server, for example:
+    uvicorn fts_search_asgi:app --port 8082
+    gunicorn -c gunicorn_config.py -k uvicorn.workers.UvicornWorker fts_search_asgi:app
+
+The pool size and request limit come from KERN_RESOURCES_ASGI_THREADS and
+KERN_RESOURCES_ASGI_MAX_REQUESTS.
+"""
+
+import os
+import sys
+
+import fts_search_api
+from asgi_bridge import AsgiBridge, DEFAULT_MAX_WORKERS, DEFAULT_MAX_REQUESTS
+
+
+def shutdown():
+    """Flush what the worker has buffered before it exits."""
+    fts_search_api.get_query_log().flush()
+    if fts_search_api._writer is not None:
+        fts_search_api._writer.close()
+
+
+app = AsgiBridge(
+    fts_search_api.app,
+    max_workers=int(os.environ.get('KERN_RESOURCES_ASGI_THREADS', DEFAULT_MAX_WORKERS)),
+    max_requests=int(os.environ.get('KERN_RESOURCES_ASGI_MAX_REQUESTS', DEFAULT_MAX_REQUESTS)),
+    on_startup=fts_search_api.warm_caches,
+    on_shutdown=shutdown
+)
+
+if __name__ == '__main__':
+    try:
+        import uvicorn
+    except ImportError:
+        print("Error: uvicorn is required to run the ASGI server (pip install uvicorn)")
+        sys.exit(1)
+
+    uvicorn.run(app, host='0.0.0.0', port=8082)
@@ -0,0 +1,118 @@
+"""
+Geo-proximity search over resources.
+
+Resource coordinates live in the resource_geo R*Tree virtual table, filled
+offline by geocode_resources.py. A proximity search first narrows the
+candidates to a bounding box around the search point through the R*Tree,
+then ranks the remaining text matches by a blend of bm25 relevance and
+distance.
+"""
+
+import math
+
+from search_queries import RESOURCE_COLUMNS, open_at_filter, row_to_resource
+
+EARTH_RADIUS_KM = 6371.0
+
+# Weight of text relevance in the combined ranking; the rest is proximity
+RELEVANCE_WEIGHT = 0.5
+
+# Upper bound on text matches pulled from the bounding box for ranking
+MAX_CANDIDATES = 500
+
+NEAR_SQL = """
+SELECT {columns}, bm25(resource_fts) AS score,
+       g.min_lat AS latitude, g.min_lon AS longitude
+FROM resource_fts
+JOIN resources r ON r.id = resource_fts.rowid
+JOIN resource_geo g ON g.id = r.id
+WHERE resource_fts MATCH ?
+  AND r.id IN (
+      SELECT id FROM resource_geo
+      WHERE min_lat >= ? AND max_lat <= ?
+        AND min_lon >= ? AND max_lon <= ?
+  ){filters}
+ORDER BY score
+LIMIT ?
+"""
+
+
+def create_geo_table(conn):
+    """Create the R*Tree table holding one point per geocoded resource."""
+    conn.execute("""
+    CREATE VIRTUAL TABLE IF NOT EXISTS resource_geo USING rtree(
+        id,
+        min_lat, max_lat,
+        min_lon, max_lon,
+        +matched TEXT
+    )
+    """)
+
+
+def parse_point(value):
+    """Parse a "lat,lon" string into a (lat, lon) tuple."""
+    try:
+        lat, lon = (float(part) for part in value.split(','))
+    except (AttributeError, ValueError):
+        raise ValueError(f"Invalid point '{value}', expected 'lat,lon'")
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        raise ValueError(f"Point '{value}' is out of range")
+    return lat, lon
+
+
+def bounding_box(lat, lon, radius_km):
+    """Return (min_lat, max_lat, min_lon, max_lon) enclosing the radius."""
+    dlat = math.degrees(radius_km / EARTH_RADIUS_KM)
+    # Longitude degrees shrink towards the poles
+    cos_lat = max(math.cos(math.radians(lat)), 1e-6)
+    dlon = min(math.degrees(radius_km / (EARTH_RADIUS_KM * cos_lat)), 180.0)
+    return lat - dlat, lat + dlat, lon - dlon, lon + dlon
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance between two points in kilometres."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def search_near(conn, query, lat, lon, radius_km, limit=10, offset=0, open_at=None):
+    """
+    Find resources matching query within radius_km of (lat, lon).
+
+    Returns (resources, total). Resources are ordered by a blend of text
+    relevance and proximity and carry their distance_km. open_at optionally
+    limits the results to resources open at that (day, minute).
+    """
+    min_lat, max_lat, min_lon, max_lon = bounding_box(lat, lon, radius_km)
+    filters, filter_params = open_at_filter(open_at)
+    rows = conn.execute(
+        NEAR_SQL.format(columns=RESOURCE_COLUMNS, filters=filters),
+        (query, min_lat, max_lat, min_lon, max_lon) + filter_params + (MAX_CANDIDATES,)
+    ).fetchall()
+
+    candidates = []
+    for row in rows:
+        # The box corners are further away than the radius
+        distance = haversine_km(lat, lon, row['latitude'], row['longitude'])
+        if distance <= radius_km:
+            resource = row_to_resource(row)
+            resource['latitude'] = row['latitude']
+            resource['longitude'] = row['longitude']
+            resource['distance_km'] = round(distance, 3)
+            candidates.append(resource)
+
+    if not candidates:
+        return [], 0
+
+    # bm25 is negative and lower is better; scale it so the best match is 1
+    best = min(resource['score'] for resource in candidates)
+    for resource in candidates:
+        relevance = resource['score'] / best if best < 0 else 1.0
+        proximity = 1.0 - resource['distance_km'] / radius_km if radius_km > 0 else 1.0
+        resource['geo_score'] = RELEVANCE_WEIGHT * relevance + (1 - RELEVANCE_WEIGHT) * proximity
+
+    candidates.sort(key=lambda resource: (-resource['geo_score'], resource['distance_km']))
+    return candidates[offset:offset + limit], len(candidates)
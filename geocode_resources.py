@@ -0,0 +1,177 @@
+"""
+Geocode resource addresses offline with a local gazetteer.
+
+This script:
+1. Loads a gazetteer CSV of places (name, latitude, longitude, postal_codes)
+2. Matches each resource address by ZIP code, falling back to the place name
+3. Stores the coordinates in the resource_geo R*Tree table
+4. Reports the addresses that could not be matched
+
+No network calls are made. The default gazetteer covers the cities of
+Kern County at city-centroid precision. Run it once after loading
+resources; the admin update endpoint and bulk_import.py geocode the rows
+whose address they write with geocode_rows, so near= searches keep
+finding them.
+"""
+
+import csv
+import os
+import re
+import sys
+
+from geo_search import create_geo_table
+from db_connection import connect
+from setup_fts_index import table_exists
+
+DEFAULT_GAZETTEER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'kern_gazetteer.csv')
+
+ZIP_RE = re.compile(r'\b(\d{5})(?:-\d{4})?\b')
+
+# Resources geocoded per statement by geocode_rows
+GEOCODE_CHUNK = 500
+
+
+class Gazetteer:
+    """Place lookups by ZIP code and by name."""
+
+    def __init__(self, places):
+        self.by_zip = {}
+        self.by_name = {}
+        for place in places:
+            point = (float(place['latitude']), float(place['longitude']))
+            self.by_name[place['name'].lower()] = (place['name'], point)
+            for zip_code in (place.get('postal_codes') or '').split():
+                self.by_zip[zip_code] = (f"{place['name']} {zip_code}", point)
+
+        # Try longer names first so "California City" wins over shorter names
+        names = sorted(self.by_name, key=len, reverse=True)
+        self.name_re = re.compile(r'\b(' + '|'.join(re.escape(name) for name in names) + r')\b',
+                                  re.IGNORECASE) if names else None
+
+    @classmethod
+    def load(cls, path=DEFAULT_GAZETTEER):
+        """Load a gazetteer CSV file."""
+        with open(path, newline='', encoding='utf-8') as f:
+            return cls(list(csv.DictReader(f)))
+
+    def locate(self, address):
+        """Return (matched place, (lat, lon)) for an address, or None."""
+        if not address:
+            return None
+
+        for zip_code in ZIP_RE.findall(address):
+            if zip_code in self.by_zip:
+                return self.by_zip[zip_code]
+
+        if self.name_re is not None:
+            # Prefer the last place named; street names often contain city names
+            matches = self.name_re.findall(address)
+            if matches:
+                return self.by_name[matches[-1].lower()]
+        return None
+
+
+def locate_rows(gazetteer, rows):
+    """
+    Locate (id, address) rows.
+
+    Returns the resource_geo rows for the matched addresses and the
+    (id, address) list of unmatched ones.
+    """
+    points = []
+    unmatched = []
+    for resource_id, address in rows:
+        location = gazetteer.locate(address)
+        if location is None:
+            unmatched.append((resource_id, address))
+            continue
+        matched, (lat, lon) = location
+        points.append((resource_id, lat, lat, lon, lon, matched))
+    return points, unmatched
+
+
+def insert_points(conn, points):
+    """Insert located rows into resource_geo."""
+    conn.executemany("""
+    INSERT INTO resource_geo (id, min_lat, max_lat, min_lon, max_lon, matched)
+    VALUES (?, ?, ?, ?, ?, ?)
+    """, points)
+
+
+def geocode_rows(conn, resource_ids, gazetteer):
+    """
+    Replace the resource_geo entries of the given resources.
+
+    Called by the write paths after they change an address, inside their
+    transaction; the caller commits. Does nothing until geocode_resources
+    has created the table. Returns the (id, address) list of addresses that
+    could not be matched; those resources drop out of near= searches, as a
+    full run would leave them.
+    """
+    if not table_exists(conn.cursor(), 'resource_geo'):
+        return []
+
+    resource_ids = list(resource_ids)
+    unmatched = []
+    for start in range(0, len(resource_ids), GEOCODE_CHUNK):
+        chunk = resource_ids[start:start + GEOCODE_CHUNK]
+        placeholders = ', '.join('?' * len(chunk))
+        conn.execute(f"DELETE FROM resource_geo WHERE id IN ({placeholders})", chunk)
+        rows = conn.execute(f"SELECT id, address FROM resources WHERE id IN ({placeholders})",
+                            chunk).fetchall()
+        points, chunk_unmatched = locate_rows(gazetteer, rows)
+        insert_points(conn, points)
+        unmatched.extend(chunk_unmatched)
+    return unmatched
+
+
+def geocode_resources(db_path='resources.db', gazetteer_path=DEFAULT_GAZETTEER):
+    """
+    Geocode every resource address into the resource_geo table.
+
+    Returns a dictionary with the geocoded count and the unmatched
+    addresses, or None if the database could not be used.
+    """
+    print(f"Geocoding resources for database at {db_path}")
+
+    if not os.path.exists(db_path):
+        print(f"Error: Database file not found at {db_path}")
+        return None
+
+    gazetteer = Gazetteer.load(gazetteer_path)
+    print(f"Loaded {len(gazetteer.by_name)} places from {gazetteer_path}")
+
+    conn = connect(db_path)
+    try:
+        create_geo_table(conn)
+
+        points, unmatched = locate_rows(
+            gazetteer, conn.execute("SELECT id, address FROM resources ORDER BY id"))
+
+        # Replace the table contents in one transaction
+        conn.execute("DELETE FROM resource_geo")
+        insert_points(conn, points)
+        conn.commit()
+
+        print(f"Geocoded {len(points)} resources, {len(unmatched)} addresses could not be matched")
+        for resource_id, address in unmatched:
+            print(f"  Unmatched: ID {resource_id}: {address!r}")
+
+        return {'geocoded': len(points), 'unmatched': unmatched}
+
+    except Exception as e:
+        print(f"Error geocoding resources: {str(e)}")
+        conn.rollback()
+        return None
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    # Get database and gazetteer paths from command line arguments or use defaults
+    db_path = sys.argv[1] if len(sys.argv) > 1 else 'resources.db'
+    gazetteer_path = sys.argv[2] if len(sys.argv) > 2 else DEFAULT_GAZETTEER
+
+    if geocode_resources(db_path, gazetteer_path) is None:
+        print("Failed to geocode resources")
+        sys.exit(1)
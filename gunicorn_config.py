@@ -1,7 +1,30 @@
 import os
+import sys
+import tempfile
 
 port = os.environ.get('PORT', 8080)
 bind = f"0.0.0.0:{port}"
 workers = 2
 threads = 4
-timeout = 120
\ No newline at end of file
+timeout = 120
+
+# Search results cache shared by all workers on this host
+os.environ.setdefault(
+    'KERN_RESOURCES_CACHE',
+    os.path.join(tempfile.gettempdir(), 'kern_resources_search_cache.db')
+)
+
+# Search history shared by all workers on this host, used by
+# /api/admin/top-queries and to warm new workers
+os.environ.setdefault(
+    'KERN_RESOURCES_QUERY_LOG',
+    os.path.join(tempfile.gettempdir(), 'kern_resources_queries.jsonl')
+)
+
+
+def post_worker_init(worker):
+    """Replay the most frequent past queries before the worker takes traffic."""
+    api = sys.modules.get('fts_search_api')
+    # The ASGI entry point warms its workers in its lifespan startup
+    if api is not None and 'fts_search_asgi' not in sys.modules:
+        api.warm_caches()
@@ -0,0 +1,214 @@
+"""
+Parse hours_of_operation strings into weekly open intervals.
+
+hours_of_operation holds free text such as "Mon–Fri 8:30am–3:30pm (closed
+12–1pm)" or "24/7". parse_hours() turns it into (day, open_minute,
+close_minute) intervals, where day is 0 for Monday and minutes count from
+midnight. Intervals that run past midnight are split at midnight, so every
+interval lies within a single day.
+"""
+
+import re
+from datetime import datetime
+
+MINUTES_PER_DAY = 24 * 60
+
+DAY_NAMES = {
+    'mon': 0, 'monday': 0, 'm': 0,
+    'tue': 1, 'tues': 1, 'tuesday': 1, 'tu': 1,
+    'wed': 2, 'weds': 2, 'wednesday': 2, 'w': 2,
+    'thu': 3, 'thur': 3, 'thurs': 3, 'thursday': 3, 'th': 3,
+    'fri': 4, 'friday': 4, 'f': 4,
+    'sat': 5, 'saturday': 5, 'sa': 5,
+    'sun': 6, 'sunday': 6, 'su': 6
+}
+
+WEEKDAYS = (0, 1, 2, 3, 4)
+ALL_DAYS = (0, 1, 2, 3, 4, 5, 6)
+
+_DAY = r'(?:' + '|'.join(sorted(DAY_NAMES, key=len, reverse=True)) + r')\.?'
+_TIME = r'(?:\d{1,2}(?::\d{2})?\s*(?:[ap]\.?m\.?)?|noon|midnight)'
+_DASH = r'\s*(?:-|–|—|to|until|through|thru)\s*'
+
+DAY_RANGE_RE = re.compile(rf'\b({_DAY})(?:{_DASH}({_DAY}))?(?=[\s,:;&/]|$)', re.IGNORECASE)
+TIME_RANGE_RE = re.compile(rf'({_TIME}){_DASH}({_TIME})', re.IGNORECASE)
+CLOSED_RE = re.compile(rf'\(?\s*closed\s+(?:for\s+lunch\s+)?({_TIME}){_DASH}({_TIME})\s*\)?', re.IGNORECASE)
+DAY_GROUPS_RE = re.compile(r'\b(daily|every\s*day|7\s*days(?:\s*a\s*week)?|weekdays|weekends?)\b', re.IGNORECASE)
+ALWAYS_OPEN_RE = re.compile(r'\b(?:24\s*/\s*7|24\s*hours?(?:\s*a\s*day)?|open\s+24\s*hours?)\b', re.IGNORECASE)
+
+
+class HoursParseError(ValueError):
+    """Raised when an hours string cannot be turned into intervals."""
+
+
+def _parse_time(text, default_meridiem=None):
+    """Return (minutes since midnight, explicit meridiem or None)."""
+    text = text.strip().lower().replace('.', '')
+    if text == 'noon':
+        return 12 * 60, 'pm'
+    if text == 'midnight':
+        return 0, 'am'
+
+    match = re.match(r'(\d{1,2})(?::(\d{2}))?\s*([ap]m)?$', text)
+    if not match:
+        raise HoursParseError(f"Unrecognized time '{text}'")
+
+    hour = int(match.group(1))
+    minute = int(match.group(2) or 0)
+    meridiem = match.group(3)
+    if hour > 23 or minute > 59:
+        raise HoursParseError(f"Unrecognized time '{text}'")
+
+    if meridiem or (default_meridiem and hour <= 12):
+        effective = meridiem or default_meridiem
+        hour = hour % 12 + (12 if effective == 'pm' else 0)
+    return hour * 60 + minute, meridiem
+
+
+def parse_time_range(start_text, end_text):
+    """
+    Parse a time range into (open_minute, close_minute).
+
+    Missing am/pm markers are inferred the way people write hours: "9-5"
+    is 9am to 5pm, "3-7" is 3pm to 7pm and "8:30am-3:30" closes at 3:30pm.
+    """
+    end_minute, end_meridiem = _parse_time(end_text)
+    start_minute, start_meridiem = _parse_time(start_text)
+
+    if start_meridiem is None and end_meridiem is None and 60 <= start_minute < 7 * 60:
+        # Nobody opens at 3am; "3-7" is an afternoon shift
+        start_minute += 12 * 60
+
+    if start_meridiem is None and end_meridiem is not None:
+        # "9-5pm" shares the end marker unless that would put open after close
+        shared, _ = _parse_time(start_text, end_meridiem)
+        start_minute = shared if shared < end_minute else _parse_time(start_text, 'am')[0]
+
+    if end_meridiem is None and end_minute <= start_minute and end_minute < 12 * 60:
+        # "9-5" and "8:30am-3:30": the close is in the afternoon
+        end_minute += 12 * 60
+
+    if end_minute == 0:
+        end_minute = MINUTES_PER_DAY
+    if end_minute == start_minute:
+        raise HoursParseError(f"Empty time range '{start_text}-{end_text}'")
+    return start_minute, end_minute
+
+
+def _parse_days(text):
+    """Return the days named in text, or None if no day is named."""
+    days = []
+    for match in DAY_GROUPS_RE.finditer(text):
+        group = match.group(1).lower()
+        if group == 'weekdays':
+            days.extend(WEEKDAYS)
+        elif group.startswith('weekend'):
+            days.extend((5, 6))
+        else:
+            days.extend(ALL_DAYS)
+    for match in DAY_RANGE_RE.finditer(text):
+        first = DAY_NAMES[match.group(1).lower().rstrip('.')]
+        if match.group(2):
+            last = DAY_NAMES[match.group(2).lower().rstrip('.')]
+            span = (last - first) % 7
+            days.extend((first + offset) % 7 for offset in range(span + 1))
+        else:
+            days.append(first)
+    return sorted(set(days)) if days else None
+
+
+def _subtract(intervals, closed):
+    """Remove a (start, end) closure from a list of (start, end) intervals."""
+    result = []
+    for start, end in intervals:
+        if closed[1] <= start or closed[0] >= end:
+            result.append((start, end))
+            continue
+        if start < closed[0]:
+            result.append((start, closed[0]))
+        if closed[1] < end:
+            result.append((closed[1], end))
+    return result
+
+
+def _split_segments(text):
+    """Split a schedule into segments that each carry their own days."""
+    return [segment for segment in re.split(r'[;\n]|,\s*(?=' + _DAY + r')', text, flags=re.IGNORECASE)
+            if segment.strip()]
+
+
+def parse_hours(text):
+    """
+    Parse an hours_of_operation string into (day, open_minute, close_minute).
+
+    Times without any day apply Monday to Friday. Raises HoursParseError
+    when the string holds no recognizable hours.
+    """
+    if not text or not text.strip():
+        raise HoursParseError("Empty hours string")
+
+    if ALWAYS_OPEN_RE.search(text):
+        return [(day, 0, MINUTES_PER_DAY) for day in ALL_DAYS]
+
+    intervals = set()
+    pending_days = None
+    for segment in _split_segments(text):
+        closures = [parse_time_range(*match.groups()) for match in CLOSED_RE.finditer(segment)]
+        hours_text = CLOSED_RE.sub(' ', segment)
+
+        days = _parse_days(TIME_RANGE_RE.sub(' ', hours_text))
+        ranges = [parse_time_range(*match.groups()) for match in TIME_RANGE_RE.finditer(hours_text)]
+
+        if not ranges:
+            # "Mon, Wed" followed later by the hours: carry the days forward
+            if days and not re.search(r'\bclosed\b', hours_text, re.IGNORECASE):
+                pending_days = (pending_days or []) + days
+            else:
+                pending_days = None
+            continue
+
+        days = sorted(set((pending_days or []) + (days or []))) or list(WEEKDAYS)
+        pending_days = None
+
+        for open_minute, close_minute in ranges:
+            # (day offset, start, end); the part after midnight belongs to
+            # the next day
+            if close_minute > open_minute:
+                parts = [(0, open_minute, close_minute)]
+            else:
+                parts = [(0, open_minute, MINUTES_PER_DAY), (1, 0, close_minute)]
+
+            for closed in closures:
+                parts = [(offset, start, end)
+                         for offset, part_start, part_end in parts
+                         for start, end in _subtract([(part_start, part_end)], closed)]
+
+            for day in days:
+                for offset, start, end in parts:
+                    intervals.add(((day + offset) % 7, start, end))
+
+    if not intervals:
+        raise HoursParseError(f"No hours found in '{text}'")
+    return sorted(intervals)
+
+
+def parse_open_at(value):
+    """
+    Parse an open_at value into (day, minute).
+
+    Accepts an ISO datetime ("2025-03-10T14:30") or a day and time
+    ("mon 14:30", "Fri 2:30pm").
+    """
+    value = value.strip()
+    try:
+        moment = datetime.fromisoformat(value)
+        return moment.weekday(), moment.hour * 60 + moment.minute
+    except ValueError:
+        pass
+
+    match = re.match(rf'({_DAY})\s+({_TIME})$', value, re.IGNORECASE)
+    if not match:
+        raise HoursParseError(f"Invalid open_at '{value}', expected an ISO datetime or 'mon 14:30'")
+    day = DAY_NAMES[match.group(1).lower().rstrip('.')]
+    minute, _ = _parse_time(match.group(2))
+    return day, minute
@@ -0,0 +1,192 @@
+"""
+Hybrid lexical + semantic search for resources.
+
+FTS5 only finds resources that share terms with the query, so "I can't
+afford groceries" never reaches "food pantry". Hybrid search ranks the
+resources a second time by embedding similarity and combines both rankings
+with reciprocal rank fusion (RRF).
+
+Stored vectors are loaded once per worker into a contiguous float32
+matrix, so a semantic lookup is a single matrix-vector product. They are
+written offline by precompute_embeddings.py; the corpus is never encoded
+while serving a request. The loaded matrix is reloaded when the database
+changes.
+"""
+
+import sqlite3
+import threading
+
+import numpy as np
+
+from shared_cache import data_version
+
+# Text fields covered by the FTS5 index, in index column order
+RESOURCE_TEXT_FIELDS = (
+    'name',
+    'description',
+    'eligibility_criteria',
+    'application_process',
+    'documents_required',
+    'cost',
+    'hours_of_operation',
+    'languages_supported'
+)
+
+# Standard RRF damping constant; keeps a single top rank from dominating
+RRF_K = 60
+
+
+def resource_text(row):
+    """Join a resource's indexed text fields into the text that gets embedded."""
+    return '\n'.join(str(row[field]) for field in RESOURCE_TEXT_FIELDS if row[field])
+
+
+def normalize_rows(matrix):
+    """Scale each row to unit length so cosine similarity is a dot product."""
+    matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+    if matrix.ndim == 1:
+        matrix = matrix.reshape(1, -1)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def reciprocal_rank_fusion(rankings, k=RRF_K):
+    """
+    Fuse several ranked id lists into one.
+
+    Each id scores sum(1 / (k + rank)) over the rankings it appears in.
+    Returns (id, score) pairs, best first.
+    """
+    scores = {}
+    for ranking in rankings:
+        for rank, resource_id in enumerate(ranking, 1):
+            scores[resource_id] = scores.get(resource_id, 0.0) + 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+
+
+class ResourceVectorIndex:
+    """Resource embeddings held as one (n, dim) float32 matrix."""
+
+    def __init__(self, ids, matrix):
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.matrix = normalize_rows(matrix) if len(self.ids) else np.zeros((0, 0), dtype=np.float32)
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def load(cls, conn, handler):
+        """
+        Load the precomputed resource vectors for handler's model from the
+        resource_embeddings table. The index is empty when there are none.
+        """
+        ids, vectors = cls._read_precomputed(conn, handler)
+        if not ids:
+            return cls([], np.zeros((0, handler.dimension), dtype=np.float32))
+        return cls(ids, np.vstack(vectors))
+
+    @classmethod
+    def encode(cls, conn, handler):
+        """
+        Build an index by encoding every resource with handler. This encodes
+        the whole corpus; use it offline, not while serving requests.
+        """
+        ids, vectors = cls._encode_resources(conn, handler)
+        if not ids:
+            return cls([], np.zeros((0, handler.dimension), dtype=np.float32))
+        return cls(ids, vectors)
+
+    @staticmethod
+    def _read_precomputed(conn, handler):
+        try:
+            cursor = conn.execute("""
+            SELECT resource_id, vector
+            FROM resource_embeddings
+            WHERE model_version = ? AND dimension = ?
+            ORDER BY resource_id
+            """, (handler.model_name, handler.dimension))
+        except sqlite3.OperationalError:
+            # No precomputed embeddings in this database
+            return [], []
+
+        ids = []
+        vectors = []
+        skipped = 0
+        for resource_id, blob in cursor:
+            vector = np.frombuffer(blob, dtype=np.float32)
+            if vector.shape != (handler.dimension,):
+                # A vector stored under the wrong dimension would break the
+                # whole matrix
+                skipped += 1
+                continue
+            ids.append(resource_id)
+            vectors.append(vector)
+        if skipped:
+            print(f"Skipped {skipped} stored vectors that are not {handler.dimension}-dimensional")
+        return ids, vectors
+
+    @staticmethod
+    def _encode_resources(conn, handler):
+        rows = conn.execute(f"""
+        SELECT id, {', '.join(RESOURCE_TEXT_FIELDS)}
+        FROM resources
+        ORDER BY id
+        """).fetchall()
+        if not rows:
+            return [], []
+
+        columns = ('id',) + RESOURCE_TEXT_FIELDS
+        texts = [resource_text(dict(zip(columns, row))) for row in rows]
+        return [row[0] for row in rows], handler.batch_encode(texts)
+
+    def search(self, query_vector, k=50):
+        """Return the k most similar resources as (id, similarity) pairs."""
+        if not len(self.ids):
+            return []
+
+        query_vector = np.asarray(query_vector, dtype=np.float32).ravel()
+        norm = np.linalg.norm(query_vector)
+        if norm == 0:
+            # The encoder gave us nothing to compare against
+            return []
+
+        scores = self.matrix @ (query_vector / norm)
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind='stable')]
+        return [(int(self.ids[i]), float(scores[i])) for i in top]
+
+
+class VectorIndexCache:
+    """
+    Per-worker cache of ResourceVectorIndex objects, one per database and
+    model. Each index is stamped with the database's data_version and
+    reloaded once a write changes it.
+    """
+
+    def __init__(self):
+        self._indexes = {}
+        self._lock = threading.Lock()
+
+    def get(self, db_path, handler, connect):
+        """Get the index for db_path, loading it on first use or after a write."""
+        key = (db_path, handler.model_name)
+        version = data_version(db_path)
+        entry = self._indexes.get(key)
+        if entry is None or entry[0] != version:
+            with self._lock:
+                entry = self._indexes.get(key)
+                if entry is None or entry[0] != version:
+                    conn = connect(db_path)
+                    try:
+                        entry = (version, ResourceVectorIndex.load(conn, handler))
+                    finally:
+                        conn.close()
+                    self._indexes[key] = entry
+        return entry[1]
+
+    def clear(self):
+        """Drop all loaded indexes."""
+        with self._lock:
+            self._indexes.clear()
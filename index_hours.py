@@ -0,0 +1,161 @@
+"""
+Build the structured opening hours index for resources.
+
+This script:
+1. Creates the resource_hours table (one row per open interval per day)
+2. Parses every resource's hours_of_operation with hours_parser
+3. Replaces the stored intervals in a single transaction
+4. Reports the hours strings that could not be parsed
+
+Run it once after loading resources so open_at/open_now searches can filter
+in SQL instead of parsing hours for every hit. The admin update endpoint and
+bulk_import.py re-parse the hours of the rows they write with reindex_hours,
+so the index stays current after it has been built.
+"""
+
+import csv
+import os
+import sys
+
+from hours_parser import parse_hours, HoursParseError
+from db_connection import connect
+from setup_fts_index import table_exists
+
+# Resources re-parsed per statement by reindex_hours
+REINDEX_CHUNK = 500
+
+
+def create_hours_table(conn):
+    """Create the resource_hours table and its lookup index."""
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS resource_hours (
+        resource_id INTEGER NOT NULL,
+        day INTEGER NOT NULL,
+        open_minute INTEGER NOT NULL,
+        close_minute INTEGER NOT NULL
+    )
+    """)
+    # Covers the open_at lookup: day equality, then the minute range
+    conn.execute("""
+    CREATE INDEX IF NOT EXISTS idx_resource_hours_lookup
+    ON resource_hours(day, open_minute, close_minute, resource_id)
+    """)
+
+
+def parse_intervals(rows):
+    """
+    Parse (id, hours_of_operation) rows into resource_hours intervals.
+
+    Returns the number of parsed resources, the (id, day, open_minute,
+    close_minute) intervals and the (id, hours, error) list of failures.
+    Resources without hours are skipped.
+    """
+    intervals = []
+    failures = []
+    parsed = 0
+    for resource_id, hours in rows:
+        if not hours or not hours.strip():
+            continue
+        try:
+            days = parse_hours(hours)
+        except HoursParseError as e:
+            failures.append((resource_id, hours, str(e)))
+            continue
+        parsed += 1
+        intervals.extend((resource_id, day, open_minute, close_minute)
+                         for day, open_minute, close_minute in days)
+    return parsed, intervals, failures
+
+
+def insert_intervals(conn, intervals):
+    """Insert (id, day, open_minute, close_minute) rows into resource_hours."""
+    conn.executemany("""
+    INSERT INTO resource_hours (resource_id, day, open_minute, close_minute)
+    VALUES (?, ?, ?, ?)
+    """, intervals)
+
+
+def reindex_hours(conn, resource_ids):
+    """
+    Replace the resource_hours intervals of the given resources.
+
+    Called by the write paths after they change hours_of_operation, inside
+    their transaction; the caller commits. Does nothing until index_hours
+    has created the table. Returns the (id, hours, error) list of hours
+    that could not be parsed; those resources are left without intervals,
+    as a full rebuild would leave them.
+    """
+    if not table_exists(conn.cursor(), 'resource_hours'):
+        return []
+
+    resource_ids = list(resource_ids)
+    failures = []
+    for start in range(0, len(resource_ids), REINDEX_CHUNK):
+        chunk = resource_ids[start:start + REINDEX_CHUNK]
+        placeholders = ', '.join('?' * len(chunk))
+        conn.execute(f"DELETE FROM resource_hours WHERE resource_id IN ({placeholders})", chunk)
+        rows = conn.execute(f"""
+        SELECT id, hours_of_operation FROM resources WHERE id IN ({placeholders})
+        """, chunk).fetchall()
+        _, intervals, chunk_failures = parse_intervals(rows)
+        insert_intervals(conn, intervals)
+        failures.extend(chunk_failures)
+    return failures
+
+
+def index_hours(db_path='resources.db', report_path=None):
+    """
+    Parse all hours_of_operation strings into resource_hours.
+
+    Returns a dictionary with the number of parsed resources, the interval
+    count and the (id, hours, error) list of failures, or None if the
+    database could not be used.
+    """
+    print(f"Indexing opening hours for database at {db_path}")
+
+    if not os.path.exists(db_path):
+        print(f"Error: Database file not found at {db_path}")
+        return None
+
+    conn = connect(db_path)
+    try:
+        create_hours_table(conn)
+
+        parsed, intervals, failures = parse_intervals(
+            conn.execute("SELECT id, hours_of_operation FROM resources ORDER BY id"))
+
+        conn.execute("DELETE FROM resource_hours")
+        insert_intervals(conn, intervals)
+        conn.commit()
+
+        print(f"Parsed hours for {parsed} resources into {len(intervals)} intervals")
+        if failures:
+            print(f"Could not parse hours for {len(failures)} resources:")
+            for resource_id, hours, error in failures:
+                print(f"  ID {resource_id}: {hours!r} ({error})")
+
+        if report_path:
+            with open(report_path, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.writer(f)
+                writer.writerow(['resource_id', 'hours_of_operation', 'error'])
+                writer.writerows(failures)
+            print(f"Wrote unparsed hours report to {report_path}")
+
+        return {'parsed': parsed, 'intervals': len(intervals), 'failures': failures}
+
+    except Exception as e:
+        print(f"Error indexing hours: {str(e)}")
+        conn.rollback()
+        return None
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    # Get database and report paths from command line arguments or use defaults
+    db_path = sys.argv[1] if len(sys.argv) > 1 else 'resources.db'
+    report_path = sys.argv[2] if len(sys.argv) > 2 else None
+
+    if index_hours(db_path, report_path) is None:
+        print("Failed to index hours")
+        sys.exit(1)
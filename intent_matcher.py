@@ -0,0 +1,114 @@
+"""
+Service category (intent) extraction from free-text messages.
+
+Trigger phrases for each service category live in a JSON taxonomy:
+
+    {"food": {"search": "food", "phrases": ["food", "food stamps", "hungry", ...]}, ...}
+
+All phrases of all categories are compiled once into a token-level
+Aho-Corasick automaton, so a message is scanned in a single pass however
+many categories and phrases there are. Matching is on whole words, like
+the \\b-delimited regexes it replaces, and reports every phrase found with
+its character positions in the message.
+"""
+
+import json
+import os
+from collections import deque, namedtuple
+
+from query_synonyms import TOKEN_RE
+
+DEFAULT_INTENTS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'intents.json')
+
+# A matched trigger phrase; start and end are character offsets in the message
+IntentHit = namedtuple('IntentHit', ['category', 'phrase', 'start', 'end'])
+
+
+class IntentMatcher:
+    """Single-pass matcher for the trigger phrases of a taxonomy."""
+
+    def __init__(self, taxonomy):
+        """
+        Compile taxonomy, a mapping of category name to a dictionary with
+        the category's trigger "phrases" and optional "search" term.
+        """
+        self.categories = list(taxonomy)
+        self.search = {category: spec.get('search', category) for category, spec in taxonomy.items()}
+
+        # Node 0 is the root. goto[node] maps a token to the next node;
+        # output[node] lists the (category, phrase, length in tokens) of the
+        # phrases that end at node, including those reached by failure links
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+        self.phrase_count = 0
+        self.max_phrase_tokens = 1
+        for category, spec in taxonomy.items():
+            for phrase in spec.get('phrases', []):
+                tokens = TOKEN_RE.findall(phrase.lower())
+                if tokens:
+                    self._add(tokens, (category, phrase, len(tokens)))
+        self._link()
+
+    @classmethod
+    def from_file(cls, path=DEFAULT_INTENTS_PATH):
+        """Load and compile a taxonomy JSON file."""
+        with open(path, encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def _add(self, tokens, entry):
+        node = 0
+        for token in tokens:
+            next_node = self._goto[node].get(token)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][token] = next_node
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            node = next_node
+        if entry not in self._output[node]:
+            self._output[node].append(entry)
+            self.phrase_count += 1
+            self.max_phrase_tokens = max(self.max_phrase_tokens, len(tokens))
+
+    def _link(self):
+        """Compute failure links breadth first and merge their outputs."""
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for token, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and token not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(token, 0)
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+    def match(self, text):
+        """Return every trigger phrase in text as IntentHits, in order of their end."""
+        hits = []
+        # Spans of the last tokens, enough to locate the longest phrase
+        spans = deque(maxlen=self.max_phrase_tokens)
+        node = 0
+        for token_match in TOKEN_RE.finditer(text):
+            token = token_match.group().lower()
+            spans.append(token_match.span())
+            while node and token not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(token, 0)
+            for category, phrase, length in self._output[node]:
+                hits.append(IntentHit(category, phrase, spans[-length][0], spans[-1][1]))
+        return hits
+
+    def categories_in(self, text):
+        """Categories mentioned in text, in order of their first mention."""
+        first = {}
+        for hit in self.match(text):
+            if hit.category not in first or hit.start < first[hit.category]:
+                first[hit.category] = hit.start
+        return sorted(first, key=lambda category: (first[category], self.categories.index(category)))
+
+    def search_terms(self, text):
+        """Search terms of the categories mentioned in text."""
+        return [self.search[category] for category in self.categories_in(text)]
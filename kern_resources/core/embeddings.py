@@ -1,20 +1,109 @@
-from typing import List, Union
+from typing import List
+import re
+import zlib
 import numpy as np
 
+class SentenceTransformerBackend:
+    """Encodes texts with a sentence-transformers model on the CPU.
+
+    The model is loaded on first use, so creating a handler stays cheap and
+    sentence-transformers is only needed where texts are actually encoded.
+    """
+
+    def __init__(self, model_name: str = "all-MiniLM-L6-v2", device: str = "cpu"):
+        self.model_name = model_name
+        self.device = device
+        self._model = None
+
+    def _load(self):
+        if self._model is None:
+            try:
+                from sentence_transformers import SentenceTransformer
+            except ImportError as e:
+                raise ImportError("sentence-transformers is required to encode with "
+                                  f"{self.model_name}; install it or use HashingEmbeddingsHandler") from e
+            self._model = SentenceTransformer(self.model_name, device=self.device)
+        return self._model
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """Encode one batch into an unnormalized (len(texts), dim) matrix."""
+        return self._load().encode(texts, batch_size=len(texts), convert_to_numpy=True,
+                                   normalize_embeddings=False, show_progress_bar=False)
+
+class HashingBackend:
+    """Deterministic local stand-in encoder based on feature hashing.
+
+    Words and character trigrams are hashed into a fixed number of buckets,
+    so texts sharing vocabulary get similar vectors. It needs no model
+    download and gives the same vectors in every process, which makes it
+    suitable for tests and offline development.
+    """
+
+    def __init__(self, dimension: int = 384):
+        self.dimension = dimension
+
+    def _features(self, text: str) -> List[str]:
+        words = re.findall(r"\w+", text.lower())
+        features = list(words)
+        for word in words:
+            padded = f"#{word}#"
+            features.extend(padded[i:i + 3] for i in range(len(padded) - 2))
+        return features
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """Encode one batch into an unnormalized (len(texts), dim) matrix."""
+        matrix = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        for row, text in enumerate(texts):
+            digests = np.fromiter((zlib.crc32(feature.encode("utf-8")) for feature in self._features(text)),
+                                  dtype=np.uint32)
+            signs = np.where(digests & 0x80000000, 1.0, -1.0).astype(np.float32)
+            np.add.at(matrix[row], digests % self.dimension, signs)
+        return matrix
+
 class EmbeddingsHandler:
-    def __init__(self, model_name: str = "all-MiniLM-L6-v2", dimension: int = 384):
+    """Encodes texts into unit-length float32 vectors with a pluggable backend.
+
+    A backend has an encode(texts) method returning a (len(texts), dim)
+    matrix. Texts are encoded in batches of batch_size, longest first, so
+    each batch holds texts of similar length and little padding is wasted.
+    Vectors are normalized here, once, so similarity is a dot product.
+    """
+
+    def __init__(self, model_name: str = "all-MiniLM-L6-v2", dimension: int = 384,
+                 batch_size: int = 64, backend=None, device: str = "cpu"):
         self.model_name = model_name
         self.dimension = dimension
-    
+        self.batch_size = batch_size
+        self.backend = backend if backend is not None else SentenceTransformerBackend(model_name, device)
+
     def encode_text(self, text: str) -> np.ndarray:
-        """Placeholder for text encoding - to be implemented with actual embedding model."""
-        # Return dummy embedding for now
-        return np.zeros(self.dimension)
-    
-    def batch_encode(self, texts: List[str]) -> List[np.ndarray]:
-        """Encode multiple texts into embeddings."""
-        return [self.encode_text(text) for text in texts]
-    
+        """Encode text into a unit-length float32 vector."""
+        return self.batch_encode([text])[0]
+
+    def batch_encode(self, texts: List[str]) -> np.ndarray:
+        """Encode texts into a contiguous float32 (len(texts), dimension) matrix of unit rows."""
+        matrix = np.empty((len(texts), self.dimension), dtype=np.float32)
+        order = sorted(range(len(texts)), key=lambda index: len(texts[index]), reverse=True)
+        for start in range(0, len(order), self.batch_size):
+            indices = order[start:start + self.batch_size]
+            vectors = np.asarray(self.backend.encode([texts[index] for index in indices]), dtype=np.float32)
+            if vectors.shape != (len(indices), self.dimension):
+                raise ValueError(f"Backend returned vectors of shape {vectors.shape}, "
+                                 f"expected {(len(indices), self.dimension)}")
+            matrix[indices] = vectors
+
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        matrix /= norms
+        return matrix
+
     def similarity(self, emb1: np.ndarray, emb2: np.ndarray) -> float:
-        """Calculate cosine similarity between two embeddings."""
-        return float(np.dot(emb1, emb2) / (np.linalg.norm(emb1) * np.linalg.norm(emb2)))
+        """Cosine similarity of two unit-length embeddings, as returned by encode_text."""
+        return float(np.dot(emb1, emb2))
+
+class HashingEmbeddingsHandler(EmbeddingsHandler):
+    """EmbeddingsHandler using the feature hashing backend."""
+
+    def __init__(self, model_name: str = "hashing-v1", dimension: int = 384, batch_size: int = 64):
+        super().__init__(model_name=model_name, dimension=dimension, batch_size=batch_size,
+                         backend=HashingBackend(dimension))
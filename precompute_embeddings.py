@@ -0,0 +1,229 @@
+"""
+Precompute resource embeddings for hybrid search.
+
+This script:
+1. Creates the resource_embeddings table if needed
+2. Finds resources whose indexed text changed since they were last encoded
+3. Encodes them in large batches, spread across worker processes
+4. Stores each vector as a float32 BLOB stamped with the model version
+
+Every batch is committed as soon as it is encoded, so an interrupted run
+resumes where it stopped: finished rows already match their content hash
+and are skipped next time.
+"""
+
+import argparse
+import hashlib
+import importlib
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from hybrid_search import RESOURCE_TEXT_FIELDS, resource_text
+from db_connection import connect
+
+DEFAULT_ENCODER = 'kern_resources.core.embeddings:EmbeddingsHandler'
+
+# Encoder instance for the current worker process
+_worker_handler = None
+
+
+def load_encoder(spec, **kwargs):
+    """Create an encoder from a "module:ClassName" spec."""
+    module_name, class_name = spec.split(':', 1)
+    return getattr(importlib.import_module(module_name), class_name)(**kwargs)
+
+
+def _init_worker(spec, kwargs):
+    global _worker_handler
+    _worker_handler = load_encoder(spec, **kwargs)
+
+
+def _encode_batch(batch):
+    """Encode a batch of (id, text) pairs in a worker process."""
+    ids = [resource_id for resource_id, _ in batch]
+    return ids, _worker_handler.batch_encode([text for _, text in batch])
+
+
+def content_hash(text):
+    """Hash of the text a resource is encoded from."""
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+def create_embeddings_table(conn):
+    """Create the resource_embeddings table."""
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS resource_embeddings (
+        resource_id INTEGER NOT NULL,
+        model_version TEXT NOT NULL,
+        content_hash TEXT NOT NULL,
+        source_updated_at TIMESTAMP,
+        dimension INTEGER NOT NULL,
+        vector BLOB NOT NULL,
+        encoded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (resource_id, model_version)
+    )
+    """)
+    conn.commit()
+
+
+def find_stale_resources(conn, model_version, dimension=None):
+    """
+    Yield (id, updated_at, hash, text) for resources that need encoding.
+
+    A resource is stale when it has no vector for model_version yet, its
+    text no longer matches the stored content hash, or its vector has
+    another dimension than the encoder's.
+    """
+    cursor = conn.execute(f"""
+    SELECT r.id, r.updated_at, e.content_hash, e.dimension,
+           {', '.join('r.' + f for f in RESOURCE_TEXT_FIELDS)}
+    FROM resources r
+    LEFT JOIN resource_embeddings e
+           ON e.resource_id = r.id AND e.model_version = ?
+    ORDER BY r.id
+    """, (model_version,))
+
+    columns = ('id', 'updated_at', 'stored_hash', 'stored_dimension') + RESOURCE_TEXT_FIELDS
+    for row in cursor:
+        row = dict(zip(columns, row))
+        text = resource_text(row)
+        digest = content_hash(text)
+        resized = dimension is not None and row['stored_dimension'] != dimension
+        if digest != row['stored_hash'] or resized:
+            yield row['id'], row['updated_at'], digest, text
+
+
+def _batches(items, batch_size):
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def precompute_embeddings(db_path='resources.db', encoder=DEFAULT_ENCODER, encoder_kwargs=None,
+                          batch_size=256, processes=None):
+    """
+    Encode every stale resource and store its vector.
+
+    Returns a dictionary with the number of rows encoded, removed and the
+    encoding throughput, or None if the database could not be used.
+    """
+    print(f"Precomputing resource embeddings for database at {db_path}")
+
+    if not os.path.exists(db_path):
+        print(f"Error: Database file not found at {db_path}")
+        return None
+
+    encoder_kwargs = encoder_kwargs or {}
+    handler = load_encoder(encoder, **encoder_kwargs)
+    model_version = handler.model_name
+    processes = processes or os.cpu_count() or 1
+    print(f"Model version: {model_version}, batch size: {batch_size}, processes: {processes}")
+
+    conn = connect(db_path)
+    started = time.perf_counter()
+    encoded = 0
+
+    try:
+        create_embeddings_table(conn)
+
+        # Drop vectors of resources that no longer exist
+        removed = conn.execute("""
+        DELETE FROM resource_embeddings
+        WHERE model_version = ?
+          AND resource_id NOT IN (SELECT id FROM resources)
+        """, (model_version,)).rowcount
+        conn.commit()
+
+        # Materialize the work list so the read cursor is closed before writing
+        stale = list(find_stale_resources(conn, model_version, handler.dimension))
+        print(f"Found {len(stale)} resources to encode")
+        details = {resource_id: (updated_at, digest) for resource_id, updated_at, digest, _ in stale}
+        batches = _batches(((resource_id, text) for resource_id, _, _, text in stale), batch_size)
+
+        def store(ids, vectors):
+            conn.executemany("""
+            INSERT OR REPLACE INTO resource_embeddings
+                (resource_id, model_version, content_hash, source_updated_at, dimension, vector)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """, [
+                (resource_id, model_version, details[resource_id][1], details[resource_id][0],
+                 vector.shape[0], vector.tobytes())
+                for resource_id, vector in zip(ids, vectors)
+            ])
+            conn.commit()
+
+        if processes == 1:
+            _init_worker(encoder, encoder_kwargs)
+            for batch in batches:
+                ids, vectors = _encode_batch(batch)
+                store(ids, vectors)
+                encoded += len(ids)
+                _report_progress(encoded, len(stale), started)
+        else:
+            with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker,
+                                     initargs=(encoder, encoder_kwargs)) as executor:
+                pending = set()
+                for batch in batches:
+                    # Keep a bounded number of batches in flight
+                    if len(pending) >= processes * 2:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            ids, vectors = future.result()
+                            store(ids, vectors)
+                            encoded += len(ids)
+                            _report_progress(encoded, len(stale), started)
+                    pending.add(executor.submit(_encode_batch, batch))
+
+                for future in pending:
+                    ids, vectors = future.result()
+                    store(ids, vectors)
+                    encoded += len(ids)
+                    _report_progress(encoded, len(stale), started)
+
+        elapsed = time.perf_counter() - started
+        rows_per_sec = encoded / elapsed if elapsed > 0 else 0.0
+        print(f"Encoded {encoded} resources in {elapsed:.2f}s ({rows_per_sec:.1f} rows/sec), "
+              f"removed {removed} stale vectors")
+        return {
+            'model_version': model_version,
+            'encoded': encoded,
+            'removed': removed,
+            'seconds': elapsed,
+            'rows_per_sec': rows_per_sec
+        }
+
+    except Exception as e:
+        print(f"Error precomputing embeddings: {str(e)}")
+        conn.rollback()
+        return None
+    finally:
+        conn.close()
+
+
+def _report_progress(done, total, started):
+    elapsed = time.perf_counter() - started
+    rate = done / elapsed if elapsed > 0 else 0.0
+    print(f"  {done}/{total} resources encoded ({rate:.1f} rows/sec)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Precompute resource embeddings for hybrid search")
+    parser.add_argument('db_path', nargs='?', default='resources.db')
+    parser.add_argument('--encoder', default=DEFAULT_ENCODER,
+                        help='Encoder class as module:ClassName')
+    parser.add_argument('--batch-size', type=int, default=256)
+    parser.add_argument('--processes', type=int, default=None,
+                        help='Worker processes (default: CPU count)')
+    args = parser.parse_args()
+
+    if precompute_embeddings(args.db_path, args.encoder, batch_size=args.batch_size,
+                             processes=args.processes) is None:
+        print("Failed to precompute embeddings")
+        sys.exit(1)
@@ -0,0 +1,211 @@
+"""
+Query analytics for the search API.
+
+Each worker records a sample of its searches (the normalized query, its
+latency and how many resources it found) in a bounded in-memory ring
+buffer. The buffer is appended to a local JSONL file at most every
+flush_interval seconds, so every worker on the host contributes to one
+history file, which is rotated once it grows past max_file_bytes.
+
+The history serves two purposes: /api/admin/top-queries summarizes it,
+and a freshly started worker replays the most frequent queries to warm
+the result cache and the OS page cache before it takes traffic.
+"""
+
+import json
+import os
+import random
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    # Windows; flushes from different processes are then not serialized
+    fcntl = None
+
+# Entries kept in memory per worker
+DEFAULT_CAPACITY = 5000
+
+# Seconds between appends of the buffer to the history file
+DEFAULT_FLUSH_INTERVAL = 60.0
+
+# The history file is rotated to <path>.1 once it grows past this size
+DEFAULT_MAX_FILE_BYTES = 16 * 1024 * 1024
+
+
+def normalize_query(query):
+    """Lowercase a query and collapse its whitespace."""
+    return ' '.join(query.lower().split())
+
+
+def collapse_whitespace(query):
+    """
+    Collapse a query's whitespace but keep its case, the form the search API
+    keys its results by. Case matters to FTS5 syntax ("OR" vs "or").
+    """
+    return ' '.join(query.split())
+
+
+@contextmanager
+def _file_lock(path):
+    """Hold an exclusive lock on path + '.lock' across processes."""
+    if fcntl is None:
+        yield
+        return
+    with open(path + '.lock', 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+class QueryLog:
+    """Sampled ring buffer of searches, flushed to an optional history file."""
+
+    def __init__(self, path=None, capacity=DEFAULT_CAPACITY, sample_rate=1.0,
+                 flush_interval=DEFAULT_FLUSH_INTERVAL, max_file_bytes=DEFAULT_MAX_FILE_BYTES):
+        self.path = path
+        self.sample_rate = sample_rate
+        self.flush_interval = flush_interval
+        self.max_file_bytes = max_file_bytes
+        self._entries = deque(maxlen=capacity)
+        # Entries recorded since the last flush; a subset of _entries
+        # unless the buffer wrapped around in between
+        self._unflushed = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self.recorded = 0
+        self.skipped = 0
+
+    def record(self, query, latency_ms, hits, mode='fts'):
+        """Record a search, subject to sampling."""
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            with self._lock:
+                self.skipped += 1
+            return
+
+        entry = {
+            'time': round(time.time(), 3),
+            'query': normalize_query(query),
+            # The query as searched, so warming replays the same cache key
+            'raw': collapse_whitespace(query),
+            'mode': mode,
+            'ms': round(latency_ms, 2),
+            'hits': hits
+        }
+        with self._lock:
+            self._entries.append(entry)
+            self._unflushed.append(entry)
+            self.recorded += 1
+            due = self.path and time.monotonic() - self._last_flush >= self.flush_interval
+        if due:
+            self.flush()
+
+    def flush(self):
+        """Append the entries recorded since the last flush to the history file."""
+        with self._lock:
+            self._last_flush = time.monotonic()
+            if not self.path or not self._unflushed:
+                return 0
+            entries = list(self._unflushed)
+            self._unflushed.clear()
+
+        try:
+            # Without the lock two workers can both see the file over the
+            # limit, and the second rotation replaces the first's history
+            with _file_lock(self.path):
+                if os.path.exists(self.path) and os.path.getsize(self.path) > self.max_file_bytes:
+                    os.replace(self.path, self.path + '.1')
+                # One write per flush, so lines from different workers don't
+                # interleave in the shared file
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write(''.join(json.dumps(entry) + '\n' for entry in entries))
+        except OSError as e:
+            print(f"Error writing query log {self.path}: {str(e)}")
+            return 0
+        return len(entries)
+
+    def entries(self):
+        """Entries in this worker's buffer, oldest first."""
+        with self._lock:
+            return list(self._entries)
+
+    def stats(self):
+        """Recorded, skipped and buffered entry counts."""
+        with self._lock:
+            return {
+                'recorded': self.recorded,
+                'skipped': self.skipped,
+                'buffered': len(self._entries),
+                'unflushed': len(self._unflushed),
+                'sample_rate': self.sample_rate
+            }
+
+
+def read_history(path, max_entries=100000):
+    """Read the newest max_entries entries of a history file and its rotation."""
+    entries = deque(maxlen=max_entries)
+    for history_path in (path + '.1', path):
+        if not os.path.exists(history_path):
+            continue
+        with open(history_path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    # A line cut short by a crash mid-write
+                    continue
+    return list(entries)
+
+
+def summarize(entries, limit=20):
+    """
+    Summarize entries per normalized query, most frequent first.
+
+    Each summary has the query, how often it was searched, its average and
+    95th percentile latency in milliseconds, its average number of hits and
+    how many of the searches found nothing.
+    """
+    by_query = {}
+    for entry in entries:
+        by_query.setdefault(entry['query'], []).append(entry)
+
+    summaries = []
+    for query, group in by_query.items():
+        latencies = sorted(entry['ms'] for entry in group)
+        hits = [entry['hits'] for entry in group if entry['hits'] is not None]
+        summaries.append({
+            'query': query,
+            'count': len(group),
+            'avg_ms': round(sum(latencies) / len(latencies), 2),
+            'p95_ms': latencies[max(int(len(latencies) * 0.95) - 1, 0)],
+            'avg_hits': round(sum(hits) / len(hits), 1) if hits else None,
+            'zero_hits': sum(1 for hit in hits if hit == 0)
+        })
+
+    summaries.sort(key=lambda summary: (-summary['count'], summary['query']))
+    return summaries[:limit]
+
+
+def top_queries(entries, limit=50, mode='fts'):
+    """
+    The limit most frequent queries of a search mode, counted per normalized
+    query. Each is returned as it was most often searched, so replaying it
+    fills the same cache entry as the real searches.
+    """
+    counts = Counter()
+    spellings = {}
+    for entry in entries:
+        if entry.get('mode') != mode or not entry['query']:
+            continue
+        counts[entry['query']] += 1
+        # Entries written before the raw form was recorded only have the
+        # normalized query
+        spellings.setdefault(entry['query'], Counter())[entry.get('raw', entry['query'])] += 1
+
+    top = sorted(counts.items(), key=lambda item: (-item[1], item[0]))[:limit]
+    return [spellings[query].most_common(1)[0][0] for query, _ in top]
@@ -0,0 +1,175 @@
+"""
+Synonym expansion for FTS5 search queries.
+
+People search for "food stamps", "EBT" or "welfare" while the resources say
+"CalFresh" or "CalWORKs". The synonym table is loaded once per worker into a
+token trie, and each query is compiled into an FTS5 expression where every
+known phrase becomes an OR group of its synonyms.
+
+The table is a JSON file holding a list of synonym groups:
+
+    [["calfresh", "food stamps", "ebt", "snap"], ...]
+
+It is reloaded automatically when the file changes.
+"""
+
+import json
+import os
+import re
+import threading
+import time
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# Characters and keywords that mean the caller wrote FTS5 syntax themselves
+FTS_SYNTAX_RE = re.compile(r'["()*:^+]|\b(?:AND|OR|NOT|NEAR)\b')
+
+# Trie key that marks the end of a phrase; tokens are never empty strings
+_END = ''
+
+
+def tokenize(text):
+    """Split text into lowercase word tokens."""
+    return TOKEN_RE.findall(text.lower())
+
+
+def quote(phrase_tokens, phrases=True):
+    """
+    Quote tokens as an FTS5 phrase, or with phrases=False as an AND group
+    of single terms for indexes without token positions.
+    """
+    if phrases or len(phrase_tokens) == 1:
+        return '"' + ' '.join(phrase_tokens) + '"'
+    return '(' + ' AND '.join(f'"{token}"' for token in phrase_tokens) + ')'
+
+
+def build_trie(groups):
+    """
+    Compile synonym groups into a token trie.
+
+    Each phrase maps to the index of its group in the returned group list.
+    """
+    trie = {}
+    compiled_groups = []
+    for group in groups:
+        phrases = []
+        for phrase in group:
+            tokens = tokenize(phrase)
+            if tokens and tokens not in phrases:
+                phrases.append(tokens)
+        if len(phrases) < 2:
+            continue
+
+        group_index = len(compiled_groups)
+        compiled_groups.append(phrases)
+        for tokens in phrases:
+            node = trie
+            for token in tokens:
+                node = node.setdefault(token, {})
+            node[_END] = group_index
+    return trie, compiled_groups
+
+
+class SynonymExpander:
+    """Expand search queries with a hot-reloaded synonym table."""
+
+    def __init__(self, path, max_alternatives=6, max_expansions=24, reload_interval=5.0):
+        # max_alternatives caps one OR group (the user's own phrase included);
+        # max_expansions caps the synonyms added over the whole query
+        self.path = path
+        self.max_alternatives = max_alternatives
+        self.max_expansions = max_expansions
+        self.reload_interval = reload_interval
+        self._table = ({}, [])
+        self._mtime = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self.reload()
+
+    def reload(self):
+        """Load the synonym table from disk."""
+        with self._lock:
+            try:
+                mtime = os.path.getmtime(self.path)
+                with open(self.path, encoding='utf-8') as f:
+                    groups = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Error loading synonyms from {self.path}: {str(e)}")
+                return False
+
+            # Swap trie and groups in one assignment so readers never see a mix
+            self._table = build_trie(groups)
+            self._mtime = mtime
+            self._checked_at = time.monotonic()
+            print(f"Loaded {len(self._table[1])} synonym groups from {self.path}")
+            return True
+
+    def _reload_if_changed(self):
+        now = time.monotonic()
+        if now - self._checked_at < self.reload_interval:
+            return
+        self._checked_at = now
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return
+        if mtime != self._mtime:
+            self.reload()
+
+    def _longest_match(self, trie, tokens, start):
+        """Return (group index, end) of the longest phrase starting at start."""
+        node = trie
+        match = None
+        for position in range(start, len(tokens)):
+            node = node.get(tokens[position])
+            if node is None:
+                break
+            if _END in node:
+                match = (node[_END], position + 1)
+        return match
+
+    def compile(self, query, phrases=True):
+        """
+        Compile a free-text query into an FTS5 expression.
+
+        Known phrases become OR groups of their synonyms, everything else is
+        quoted as a plain term, and the parts are ANDed together. Queries that
+        already use FTS5 syntax are returned unchanged. Pass phrases=False
+        for indexes built with detail=column or detail=none, which reject
+        phrase queries; multi-word synonyms then match as ANDed terms.
+        """
+        if FTS_SYNTAX_RE.search(query):
+            return query
+
+        self._reload_if_changed()
+        trie, groups = self._table
+
+        tokens = tokenize(query)
+        if not tokens:
+            return query
+
+        parts = []
+        budget = self.max_expansions
+        position = 0
+        while position < len(tokens):
+            match = self._longest_match(trie, tokens, position)
+            if match is None:
+                parts.append(quote([tokens[position]], phrases))
+                position += 1
+                continue
+
+            group_index, end = match
+            matched = tokens[position:end]
+            alternatives = [matched] + [p for p in groups[group_index] if p != matched]
+            alternatives = alternatives[:1 + max(0, min(self.max_alternatives - 1, budget))]
+            budget -= len(alternatives) - 1
+
+            if len(alternatives) == 1:
+                parts.append(quote(matched, phrases))
+            else:
+                parts.append('(' + ' OR '.join(quote(p, phrases) for p in alternatives) + ')')
+            position = end
+
+        # An OR group next to another term needs an explicit AND; FTS5 only
+        # allows implicit AND between plain terms and phrases
+        return ' AND '.join(parts)
@@ -0,0 +1,76 @@
+"""
+Single-flight coalescing of identical concurrent requests.
+
+When a chat surge sends many identical searches at once, only the first one
+runs. Requests with the same key that arrive while it is in flight wait for
+it and share its result (or its exception).
+"""
+
+import threading
+
+
+class _Call:
+    """An in-flight execution that followers can wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Run at most one execution per key at a time within this process."""
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.executions = 0
+        self.coalesced = 0
+
+    def do(self, key, fn):
+        """
+        Return fn()'s result, sharing an in-flight execution for key.
+
+        The result object is handed to every waiting caller, so callers must
+        treat it as read-only.
+        """
+        with self._lock:
+            self.requests += 1
+            call = self._calls.get(key)
+            if call is not None:
+                self.coalesced += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                self.executions += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def stats(self):
+        """Counters and the share of requests served by another execution."""
+        with self._lock:
+            return {
+                'requests': self.requests,
+                'executions': self.executions,
+                'coalesced': self.coalesced,
+                'coalescing_ratio': self.coalesced / self.requests if self.requests else 0.0,
+                'in_flight': len(self._calls)
+            }
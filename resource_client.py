@@ -0,0 +1,188 @@
+"""
+Python client for the resource search API.
+
+Keeps one pooled requests.Session per client, so calls reuse keep-alive
+connections instead of paying TCP setup each time. Every call has a
+timeout, and idempotent calls are retried with exponential backoff on
+connection errors and 502/503/504 responses (honoring Retry-After).
+
+Resource lookups are cached for cache_ttl seconds. After that the cached
+copy is revalidated with If-None-Match, and a 304 answer renews it without
+transferring the resource again.
+
+Usage:
+    client = ResourceClient("http://localhost:8082/api")
+    result = client.search("food", limit=5)
+    resource = client.get_resource(12)
+    print(client.stats())
+"""
+
+import threading
+import time
+from collections import OrderedDict, deque
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+API_BASE_URL = "http://localhost:8082/api"
+
+# (connect, read) timeout in seconds
+DEFAULT_TIMEOUT = (3.05, 10)
+
+DEFAULT_RETRIES = 3
+
+# Retries wait backoff * 2^(retry - 1) seconds
+DEFAULT_BACKOFF = 0.3
+
+# How long a cached resource is used without asking the server
+DEFAULT_CACHE_TTL = 300
+
+DEFAULT_CACHE_SIZE = 1024
+
+# Latencies kept per endpoint for the stats
+LATENCY_SAMPLES = 1000
+
+
+class EndpointStats:
+    """Call counts and recent latencies of one endpoint."""
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.cache_hits = 0
+        self.not_modified = 0
+        self.latencies = deque(maxlen=LATENCY_SAMPLES)
+
+    def summary(self):
+        latencies = sorted(self.latencies)
+        return {
+            'calls': self.calls,
+            'errors': self.errors,
+            'cache_hits': self.cache_hits,
+            'not_modified': self.not_modified,
+            'avg_ms': round(sum(latencies) / len(latencies), 2) if latencies else None,
+            'p95_ms': round(latencies[max(int(len(latencies) * 0.95) - 1, 0)], 2) if latencies else None
+        }
+
+
+class ResourceClient:
+    """Pooled, retrying, caching client for the resource search API."""
+
+    def __init__(self, base_url=API_BASE_URL, timeout=DEFAULT_TIMEOUT, retries=DEFAULT_RETRIES,
+                 backoff=DEFAULT_BACKOFF, cache_ttl=DEFAULT_CACHE_TTL, cache_size=DEFAULT_CACHE_SIZE,
+                 pool_size=10):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.cache_ttl = cache_ttl
+        self.cache_size = cache_size
+
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset(['GET']),
+            respect_retry_after_header=True,
+            # Give the last 5xx response back instead of raising
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        # resource_id -> (expires_at, etag, payload)
+        self._cache = OrderedDict()
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Close the pooled connections."""
+        self.session.close()
+
+    def _endpoint_stats(self, endpoint):
+        with self._lock:
+            return self._stats.setdefault(endpoint, EndpointStats())
+
+    def _get(self, endpoint, path, params=None, headers=None, timeout=None):
+        """GET path; returns the response, or None on a connection error."""
+        stats = self._endpoint_stats(endpoint)
+        started = time.perf_counter()
+        try:
+            response = self.session.get(f"{self.base_url}{path}", params=params, headers=headers,
+                                        timeout=timeout or self.timeout)
+        except requests.RequestException as e:
+            with self._lock:
+                stats.calls += 1
+                stats.errors += 1
+            print(f"Error calling {path}: {str(e)}")
+            return None
+
+        with self._lock:
+            stats.calls += 1
+            stats.latencies.append((time.perf_counter() - started) * 1000)
+            if response.status_code == 304:
+                stats.not_modified += 1
+            elif response.status_code != 200:
+                stats.errors += 1
+        if response.status_code not in (200, 304):
+            print(f"Error: API returned status code {response.status_code} for {path}")
+            return None
+        return response
+
+    def search(self, query, limit=5, timeout=None, **params):
+        """Search resources; returns the API response dictionary or None."""
+        response = self._get('search', '/search', params=dict(params, q=query, limit=limit), timeout=timeout)
+        return response.json() if response is not None else None
+
+    def get_resource(self, resource_id, timeout=None):
+        """Get a resource by ID; returns the API response dictionary or None."""
+        now = time.monotonic()
+        with self._lock:
+            cached = self._cache.get(resource_id)
+            if cached is not None:
+                self._cache.move_to_end(resource_id)
+                if cached[0] > now:
+                    self._stats.setdefault('resource', EndpointStats()).cache_hits += 1
+                    return cached[2]
+
+        headers = {'If-None-Match': cached[1]} if cached and cached[1] else None
+        response = self._get('resource', f"/resource/{resource_id}", headers=headers, timeout=timeout)
+        if response is None:
+            return None
+
+        if response.status_code == 304:
+            payload = cached[2]
+            etag = cached[1]
+        else:
+            payload = response.json()
+            etag = response.headers.get('ETag')
+            if not payload.get('success'):
+                # Don't cache "not found" and other failures
+                return payload
+
+        with self._lock:
+            self._cache[resource_id] = (time.monotonic() + self.cache_ttl, etag, payload)
+            self._cache.move_to_end(resource_id)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return payload
+
+    def invalidate(self, resource_id=None):
+        """Drop one cached resource, or all of them."""
+        with self._lock:
+            if resource_id is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(resource_id, None)
+
+    def stats(self):
+        """Per-endpoint call counts, cache hits and latencies in milliseconds."""
+        with self._lock:
+            return {endpoint: stats.summary() for endpoint, stats in self._stats.items()}
@@ -0,0 +1,275 @@
+"""
+Offline evaluation of search relevance and latency.
+
+Replays a set of queries with graded relevance judgments against a local
+database and reports, per index configuration:
+1. nDCG@k, from the relevance grades of the top k results
+2. Recall@k, the share of relevant resources found in the top k
+3. Zero-result rate, the share of queries with no results
+4. Latency percentiles (p50, p95, p99) over all runs of all queries
+
+Searches go through fts_search_api.execute_search with the parameters
+/api/search would read from the same query string, so synonym expansion,
+geo and hours filters and the search modes are evaluated as served. The
+result cache and request coalescing are bypassed, so every run is timed
+as a real search.
+
+Judgments are a JSON list; grades are 0 (not relevant) to 3 (perfect):
+
+    [{"query": "food stamps", "relevant": {"12": 3, "40": 2, "7": 1}},
+     {"query": "dentist", "params": {"open_now": "1"}, "relevant": {"31": 3}}]
+
+A configuration is an FTS profile from setup_fts_index.FTS_PROFILES,
+built on a copy of the database, or the path of another database. Either
+can be followed by search parameters applied to every query:
+
+    python search_eval.py judgments.json --db resources.db --compare default porter
+    python search_eval.py judgments.json --db resources.db --compare 'default' 'default?expand=0'
+"""
+
+import argparse
+import json
+import math
+import os
+import shutil
+import tempfile
+import time
+from contextlib import redirect_stdout
+from io import StringIO
+from urllib.parse import parse_qsl
+
+from werkzeug.datastructures import MultiDict
+
+import fts_search_api
+from db_connection import connect
+from setup_fts_index import FTS_PROFILES, rebuild_fts_index
+
+DEFAULT_K = 10
+
+# Queries whose nDCG changed most between two configurations that are listed
+CHANGED_QUERIES_SHOWN = 10
+
+
+def load_judgments(path):
+    """
+    Load relevance judgments as a list of dictionaries with the query, its
+    extra search parameters and {resource_id: grade}.
+    """
+    with open(path, encoding='utf-8') as f:
+        judgments = json.load(f)
+
+    loaded = []
+    for index, judgment in enumerate(judgments):
+        if not judgment.get('query'):
+            raise ValueError(f"Judgment {index} has no query")
+        loaded.append({
+            'query': judgment['query'],
+            'params': judgment.get('params', {}),
+            'relevant': {int(resource_id): grade for resource_id, grade in judgment.get('relevant', {}).items()}
+        })
+    return loaded
+
+
+def dcg(grades):
+    """Discounted cumulative gain of grades in rank order."""
+    return sum((2 ** grade - 1) / math.log2(rank + 2) for rank, grade in enumerate(grades))
+
+
+def ndcg_at_k(ranked_ids, relevant, k=DEFAULT_K):
+    """nDCG@k of ranked resource IDs, or None if nothing is relevant."""
+    ideal = dcg(sorted(relevant.values(), reverse=True)[:k])
+    if ideal == 0:
+        return None
+    return dcg([relevant.get(resource_id, 0) for resource_id in ranked_ids[:k]]) / ideal
+
+
+def recall_at_k(ranked_ids, relevant, k=DEFAULT_K):
+    """Share of the relevant resources in the top k, or None if nothing is relevant."""
+    wanted = {resource_id for resource_id, grade in relevant.items() if grade > 0}
+    if not wanted:
+        return None
+    return len(wanted.intersection(ranked_ids[:k])) / len(wanted)
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of already sorted values."""
+    if not sorted_values:
+        return None
+    return sorted_values[max(math.ceil(len(sorted_values) * fraction) - 1, 0)]
+
+
+def mean(values):
+    values = [value for value in values if value is not None]
+    return sum(values) / len(values) if values else None
+
+
+def parse_config(spec, db_path, work_dir):
+    """
+    Turn a configuration spec into {'name', 'db_path', 'params'}, building
+    the index of a profile on a copy of db_path in work_dir.
+    """
+    target, _, query_string = spec.partition('?')
+    params = dict(parse_qsl(query_string))
+
+    if target in FTS_PROFILES:
+        config_path = os.path.join(work_dir, f"{target}.db")
+        if not os.path.exists(config_path):
+            # VACUUM INTO includes the pages still in the WAL, which a copy
+            # of the database file alone would miss
+            conn = connect(db_path)
+            try:
+                conn.execute("VACUUM INTO ?", (config_path,))
+            finally:
+                conn.close()
+            with redirect_stdout(StringIO()):
+                if rebuild_fts_index(config_path, profile=target) is None:
+                    raise RuntimeError(f"Building the '{target}' index failed")
+    elif os.path.exists(target):
+        config_path = target
+    else:
+        raise ValueError(f"'{target}' is neither an FTS profile nor a database file")
+
+    return {'name': spec, 'db_path': config_path, 'params': params}
+
+
+def run_query(judgment, config, k):
+    """Run one judged query; returns (result, latency in milliseconds)."""
+    args = dict(config['params'])
+    args.update(judgment['params'])
+    args['q'] = judgment['query']
+    args.setdefault('limit', str(k))
+    params = fts_search_api.search_params(MultiDict(args))
+
+    started = time.perf_counter()
+    result = fts_search_api.execute_search(params)
+    return result, (time.perf_counter() - started) * 1000
+
+
+def evaluate(judgments, config, k=DEFAULT_K, repeat=1):
+    """
+    Evaluate one configuration. Returns a dictionary with the summary
+    metrics and, under 'queries', the metrics of every query.
+    """
+    app_config = fts_search_api.app.config
+    saved_path = app_config.get('DATABASE_PATH')
+    app_config['DATABASE_PATH'] = config['db_path']
+
+    latencies = []
+    queries = []
+    try:
+        for judgment in judgments:
+            for _ in range(repeat):
+                result, latency_ms = run_query(judgment, config, k)
+                latencies.append(latency_ms)
+
+            ranked_ids = [resource['id'] for resource in result.get('resources', [])]
+            queries.append({
+                'query': judgment['query'],
+                'error': None if result.get('success') else result.get('error'),
+                'results': len(ranked_ids),
+                'ndcg': ndcg_at_k(ranked_ids, judgment['relevant'], k),
+                'recall': recall_at_k(ranked_ids, judgment['relevant'], k)
+            })
+    finally:
+        if saved_path is None:
+            app_config.pop('DATABASE_PATH', None)
+        else:
+            app_config['DATABASE_PATH'] = saved_path
+
+    latencies.sort()
+    return {
+        'name': config['name'],
+        'queries': queries,
+        'ndcg': mean(query['ndcg'] for query in queries),
+        'recall': mean(query['recall'] for query in queries),
+        'zero_result_rate': (sum(1 for query in queries if query['results'] == 0) / len(queries)
+                             if queries else None),
+        'errors': sum(1 for query in queries if query['error']),
+        'p50_ms': percentile(latencies, 0.50),
+        'p95_ms': percentile(latencies, 0.95),
+        'p99_ms': percentile(latencies, 0.99)
+    }
+
+
+def format_value(value, digits=3):
+    return 'n/a' if value is None else f"{value:.{digits}f}"
+
+
+def print_report(reports, k=DEFAULT_K):
+    """Print the metrics of the configurations side by side."""
+    rows = [
+        (f"nDCG@{k}", 'ndcg', 3),
+        (f"recall@{k}", 'recall', 3),
+        ('zero-result rate', 'zero_result_rate', 3),
+        ('errors', 'errors', 0),
+        ('p50 ms', 'p50_ms', 2),
+        ('p95 ms', 'p95_ms', 2),
+        ('p99 ms', 'p99_ms', 2)
+    ]
+    width = max(14, *(len(report['name']) for report in reports))
+    header = f"{'':<18}" + ''.join(f"{report['name']:>{width + 2}}" for report in reports)
+    if len(reports) == 2:
+        header += f"{'change':>10}"
+    print(header)
+
+    for label, key, digits in rows:
+        values = [report[key] for report in reports]
+        line = f"{label:<18}" + ''.join(f"{format_value(value, digits):>{width + 2}}" for value in values)
+        if len(reports) == 2 and None not in values:
+            line += f"{values[1] - values[0]:>+10.{digits}f}"
+        print(line)
+
+    if len(reports) == 2:
+        print_changed_queries(*reports)
+
+
+def print_changed_queries(baseline, candidate, limit=CHANGED_QUERIES_SHOWN):
+    """List the queries whose nDCG changed most from baseline to candidate."""
+    changes = []
+    for before, after in zip(baseline['queries'], candidate['queries']):
+        if before['ndcg'] is not None and after['ndcg'] is not None and before['ndcg'] != after['ndcg']:
+            changes.append((after['ndcg'] - before['ndcg'], before['query']))
+    if not changes:
+        return
+
+    print()
+    print(f"Largest nDCG changes ({len(changes)} queries changed):")
+    for change, query in sorted(changes, key=lambda item: -abs(item[0]))[:limit]:
+        print(f"  {change:+.3f}  {query}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Evaluate search relevance and latency")
+    parser.add_argument('judgments', help='JSON file of queries with graded relevance judgments')
+    parser.add_argument('--db', default='resources.db', help='Database to evaluate against')
+    parser.add_argument('--compare', nargs='+', default=None, metavar='CONFIG',
+                        help='Configurations to compare: FTS profiles or database paths, '
+                             'optionally followed by ?search parameters')
+    parser.add_argument('-k', type=int, default=DEFAULT_K, help='Rank cutoff for nDCG and recall')
+    parser.add_argument('--repeat', type=int, default=5, help='Times each query is run for the latency')
+    parser.add_argument('--json', dest='json_path', help='Also write the full results to this file')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        print(f"Error: Database file not found at {args.db}")
+        raise SystemExit(1)
+
+    judgments = load_judgments(args.judgments)
+    work_dir = tempfile.mkdtemp(prefix='search_eval_')
+    try:
+        reports = []
+        for spec in args.compare or [args.db]:
+            print(f"Evaluating {spec} on {len(judgments)} queries...")
+            config = parse_config(spec, args.db, work_dir)
+            with redirect_stdout(StringIO()):
+                # Run every query once so all configurations are timed warm
+                evaluate(judgments, config, args.k)
+                reports.append(evaluate(judgments, config, args.k, args.repeat))
+
+        print()
+        print_report(reports, args.k)
+        if args.json_path:
+            with open(args.json_path, 'w', encoding='utf-8') as f:
+                json.dump(reports, f, indent=2)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
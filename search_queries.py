@@ -0,0 +1,123 @@
+"""
+Shared SQL for querying resources through the FTS5 index.
+
+The search API, federated search and the other search modes all read
+resources the same way. Keeping the SQL and the row conversion in one place
+means every mode returns identically shaped resources.
+"""
+
+RESOURCE_COLUMNS = """
+    r.id, r.name, r.description, r.url, r.phone, r.email, r.address,
+    r.eligibility_criteria, r.application_process, r.documents_required,
+    r.cost, r.hours_of_operation, r.languages_supported, r.is_active,
+    r.is_verified
+"""
+
+# Restricts a search to resources open at a given day and minute, using
+# the intervals built by index_hours.py
+OPEN_AT_FILTER = """
+  AND r.id IN (
+      SELECT resource_id FROM resource_hours
+      WHERE day = ? AND open_minute <= ? AND close_minute > ?
+  )
+"""
+
+SEARCH_TEMPLATE = """
+SELECT {columns}, bm25(resource_fts) AS score
+FROM resource_fts
+JOIN resources r ON r.id = resource_fts.rowid
+WHERE resource_fts MATCH ?{filters}
+ORDER BY score
+LIMIT ? OFFSET ?
+"""
+
+COUNT_TEMPLATE = """
+SELECT COUNT(*) AS count
+FROM resource_fts
+JOIN resources r ON r.id = resource_fts.rowid
+WHERE resource_fts MATCH ?{filters}
+"""
+
+SEARCH_SQL = SEARCH_TEMPLATE.format(columns=RESOURCE_COLUMNS, filters='')
+COUNT_SQL = COUNT_TEMPLATE.format(filters='')
+
+
+def open_at_filter(open_at):
+    """Return the (sql, params) filter for an optional (day, minute)."""
+    if open_at is None:
+        return '', ()
+    day, minute = open_at
+    return OPEN_AT_FILTER, (day, minute, minute)
+
+
+def open_resource_ids(conn, resource_ids, open_at):
+    """Return the set of resource_ids open at the (day, minute) open_at."""
+    if not resource_ids:
+        return set()
+    day, minute = open_at
+    placeholders = ','.join('?' * len(resource_ids))
+    rows = conn.execute(f"""
+    SELECT DISTINCT resource_id FROM resource_hours
+    WHERE day = ? AND open_minute <= ? AND close_minute > ?
+      AND resource_id IN ({placeholders})
+    """, [day, minute, minute] + list(resource_ids)).fetchall()
+    return {row[0] for row in rows}
+
+
+def row_to_resource(row):
+    """Convert a resource row into the dictionary returned by the API."""
+    resource = {
+        'id': row['id'],
+        'name': row['name'],
+        'description': row['description'],
+        'url': row['url'],
+        'phone': row['phone'],
+        'email': row['email'],
+        'address': row['address'],
+        'eligibility_criteria': row['eligibility_criteria'],
+        'application_process': row['application_process'],
+        'documents_required': row['documents_required'],
+        'cost': row['cost'],
+        'hours_of_operation': row['hours_of_operation'],
+        'languages_supported': row['languages_supported'],
+        'is_active': bool(row['is_active']),
+        'is_verified': bool(row['is_verified'])
+    }
+    if 'score' in row.keys():
+        resource['score'] = row['score']
+    return resource
+
+
+def search_fts(conn, query, limit=10, offset=0, open_at=None):
+    """
+    Run an FTS5 MATCH and return (resources, total) ordered by bm25.
+
+    open_at is an optional (day, minute) that limits the results to
+    resources open at that time.
+    """
+    filters, filter_params = open_at_filter(open_at)
+    cursor = conn.cursor()
+    cursor.execute(SEARCH_TEMPLATE.format(columns=RESOURCE_COLUMNS, filters=filters),
+                   (query,) + filter_params + (limit, offset))
+    resources = [row_to_resource(row) for row in cursor.fetchall()]
+
+    cursor.execute(COUNT_TEMPLATE.format(filters=filters), (query,) + filter_params)
+    total = cursor.fetchone()['count']
+    return resources, total
+
+
+def fetch_resources(conn, resource_ids):
+    """Fetch resources by id, returned in the order of resource_ids."""
+    if not resource_ids:
+        return []
+
+    placeholders = ','.join('?' * len(resource_ids))
+    cursor = conn.cursor()
+    cursor.execute(f"""
+    SELECT {RESOURCE_COLUMNS}
+    FROM resources r
+    WHERE r.id IN ({placeholders})
+    """, list(resource_ids))
+
+    by_id = {row['id']: row_to_resource(row) for row in cursor.fetchall()}
+    return [by_id[resource_id] for resource_id in resource_ids if resource_id in by_id]
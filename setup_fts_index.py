@@ -5,23 +5,344 @@ This script:
 1. Creates an FTS5 virtual table for resources
 2. Populates it with existing resource data
 3. Sets up triggers to keep the index in sync with the resources table
+
+The index is populated in chunks of rows, each committed with a checkpoint,
+so an interrupted build resumes where it stopped when the script is run
+again.
+
+With --rebuild it instead builds a fresh index next to the live one and
+swaps it in, so searches keep working during the rebuild.
 """
 
 import sqlite3
 import os
 import sys
+import re
+import time
+import argparse
+
+from db_connection import connect
+from change_feed import create_change_log
+
+FTS_TABLE = 'resource_fts'
+
+# Columns of the resources table that are indexed, in index column order
+FTS_COLUMNS = [
+    'name',
+    'description',
+    'eligibility_criteria',
+    'application_process',
+    'documents_required',
+    'cost',
+    'hours_of_operation',
+    'languages_supported'
+]
+
+FTS_TRIGGERS = ['resources_ai', 'resources_au', 'resources_ad']
+
+# Index profiles trade features for size and build time:
+#   detail    - 'full' keeps token positions, needed for phrase and NEAR
+#               queries; 'column' keeps only which columns match; 'none'
+#               keeps only which rows match
+#   columnsize - 0 drops the per-row token counts bm25 normalizes by
+#   prefix    - prefix lengths with their own index, for fast "foo*" queries
+#   tokenize  - tokenizer; porter adds English stemming
+#   content   - '' makes the index contentless: smallest, but snippet() and
+#               highlight() have no text to work with
+FTS_PROFILES = {
+    'default': {},
+    'prefix': {'prefix': [2, 3]},
+    'porter': {'tokenize': 'porter unicode61 remove_diacritics 2'},
+    'compact': {'detail': 'column'},
+    'minimal': {'detail': 'none', 'columnsize': 0},
+    'contentless': {'content': ''}
+}
+
+QUOTED_OPTIONS = ('content', 'content_rowid', 'prefix', 'tokenize')
+
+FTS_OPTION_RE = re.compile(r"\b(\w+)\s*=\s*('(?:[^']|'')*'|\w+)")
+
+# Triggers that keep a shadow index in sync while it is being built
+SHADOW_TRIGGERS = ['resources_ai_shadow', 'resources_au_shadow', 'resources_ad_shadow']
+
+# Rowids up to last_rowid have been copied into the index being built
+BUILD_STATE_TABLE = 'fts_build_state'
+
+def fts_column_list(prefix=''):
+    """Comma-separated indexed columns, optionally prefixed (e.g. 'new.')."""
+    return ', '.join(prefix + column for column in FTS_COLUMNS)
+
+def fts_profile_options(profile='default'):
+    """
+    Return the FTS5 options of an index profile as an ordered dictionary.
+
+    profile is the name of one of FTS_PROFILES or a dictionary of options
+    to apply on top of the external content defaults.
+    """
+    if isinstance(profile, str):
+        if profile not in FTS_PROFILES:
+            raise ValueError(f"Unknown FTS profile '{profile}', expected one of {', '.join(FTS_PROFILES)}")
+        profile = FTS_PROFILES[profile]
+
+    options = {'content': 'resources', 'content_rowid': 'id'}
+    options.update(profile)
+    if options['content'] == '':
+        # A contentless index has no content table to take rowids from
+        options.pop('content_rowid', None)
+    return options
+
+def fts_table_options(cursor, table=FTS_TABLE):
+    """Read back the FTS5 options an existing index was created with."""
+    cursor.execute("SELECT sql FROM sqlite_master WHERE name = ?", (table,))
+    row = cursor.fetchone()
+    if row is None:
+        return None
+    return {key.lower(): value[1:-1].replace("''", "'") if value.startswith("'") else value
+            for key, value in FTS_OPTION_RE.findall(row[0])}
+
+def create_fts_table(cursor, table=FTS_TABLE, profile='default'):
+    """Create an FTS5 table indexing the resources table."""
+    options = []
+    for key, value in fts_profile_options(profile).items():
+        if isinstance(value, (list, tuple)):
+            value = ' '.join(str(item) for item in value)
+        if key in QUOTED_OPTIONS:
+            value = "'" + str(value).replace("'", "''") + "'"
+        options.append(f"{key}={value}")
+
+    cursor.execute(f"""
+    CREATE VIRTUAL TABLE {table} USING fts5(
+        {fts_column_list()},
+        {', '.join(options)}
+    )
+    """)
+
+def create_fts_triggers(cursor, table=FTS_TABLE):
+    """
+    Create the triggers that keep the FTS5 table in sync with resources.
+
+    The index is external content, so removing a row's tokens needs the old
+    column values; updates and deletes use the FTS5 'delete' command.
+    """
+    cursor.execute(f"""
+    CREATE TRIGGER resources_ai AFTER INSERT ON resources BEGIN
+        INSERT INTO {table}(rowid, {fts_column_list()})
+        VALUES (new.id, {fts_column_list('new.')});
+    END;
+    """)
+
+    cursor.execute(f"""
+    CREATE TRIGGER resources_au AFTER UPDATE ON resources BEGIN
+        INSERT INTO {table}({table}, rowid, {fts_column_list()})
+        VALUES ('delete', old.id, {fts_column_list('old.')});
+        INSERT INTO {table}(rowid, {fts_column_list()})
+        VALUES (new.id, {fts_column_list('new.')});
+    END;
+    """)
+
+    cursor.execute(f"""
+    CREATE TRIGGER resources_ad AFTER DELETE ON resources BEGIN
+        INSERT INTO {table}({table}, rowid, {fts_column_list()})
+        VALUES ('delete', old.id, {fts_column_list('old.')});
+    END;
+    """)
+
+def create_shadow_triggers(cursor, table):
+    """
+    Create triggers that mirror resource changes into an index being built.
+
+    Only rows at or below the build watermark are touched; rows above it
+    are picked up when their chunk is copied.
+    """
+    watermark = f"(SELECT last_rowid FROM {BUILD_STATE_TABLE} WHERE table_name = '{table}')"
+
+    cursor.execute(f"""
+    CREATE TRIGGER resources_ai_shadow AFTER INSERT ON resources
+    WHEN new.id <= {watermark} BEGIN
+        INSERT INTO {table}(rowid, {fts_column_list()})
+        VALUES (new.id, {fts_column_list('new.')});
+    END;
+    """)
+
+    cursor.execute(f"""
+    CREATE TRIGGER resources_au_shadow AFTER UPDATE ON resources BEGIN
+        INSERT INTO {table}({table}, rowid, {fts_column_list()})
+        SELECT 'delete', old.id, {fts_column_list('old.')}
+        WHERE old.id <= {watermark};
+        INSERT INTO {table}(rowid, {fts_column_list()})
+        SELECT new.id, {fts_column_list('new.')}
+        WHERE new.id <= {watermark};
+    END;
+    """)
+
+    cursor.execute(f"""
+    CREATE TRIGGER resources_ad_shadow AFTER DELETE ON resources
+    WHEN old.id <= {watermark} BEGIN
+        INSERT INTO {table}({table}, rowid, {fts_column_list()})
+        VALUES ('delete', old.id, {fts_column_list('old.')});
+    END;
+    """)
+
+def drop_triggers(cursor, trigger_names):
+    """Drop the named triggers if they exist."""
+    for trigger_name in trigger_names:
+        cursor.execute(f"DROP TRIGGER IF EXISTS {trigger_name}")
+
+def table_exists(cursor, table):
+    """Check whether a table (or virtual table) exists."""
+    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name=?", (table,))
+    return cursor.fetchone() is not None
+
+def check_fts5(cursor):
+    """Check that this SQLite build supports FTS5."""
+    try:
+        cursor.execute("SELECT sqlite_version()")
+        version = cursor.fetchone()[0]
+        print(f"SQLite version: {version}")
+
+        # Create a test FTS5 table to check if FTS5 is available
+        cursor.execute("CREATE VIRTUAL TABLE temp.test_fts USING fts5(content)")
+        cursor.execute("DROP TABLE temp.test_fts")
+        print("FTS5 is available")
+        return True
+    except sqlite3.OperationalError as e:
+        print(f"Error: FTS5 is not available - {str(e)}")
+        print("Please make sure your SQLite version supports FTS5")
+        return False
+
+def fts_index_size(cursor, table=FTS_TABLE):
+    """Bytes stored in the shadow tables of an FTS5 table."""
+    total = 0
+    for suffix, column in (('data', 'block'), ('idx', 'term'), ('docsize', 'sz'), ('config', 'v')):
+        if table_exists(cursor, f"{table}_{suffix}"):
+            cursor.execute(f"SELECT COALESCE(SUM(LENGTH({column})), 0) FROM {table}_{suffix}")
+            total += cursor.fetchone()[0]
+    return total
+
+def read_varint(data, offset=0):
+    """Decode an SQLite varint at offset; returns (value, next offset)."""
+    value = 0
+    for i in range(8):
+        byte = data[offset + i]
+        value = (value << 7) | (byte & 0x7f)
+        if not byte & 0x80:
+            return value, offset + i + 1
+    return (value << 8) | data[offset + 8], offset + 9
+
+def indexed_row_count(cursor, table=FTS_TABLE):
+    """
+    Number of rows in an FTS5 index, or None if it can't be told.
+
+    Counts the _docsize rows when the index has them. Indexes created with
+    columnsize=0 have none, so the row total FTS5 keeps in its averages
+    record (rowid 1 of _data) is read instead.
+    """
+    if table_exists(cursor, f"{table}_docsize"):
+        cursor.execute(f"SELECT COUNT(*) FROM {table}_docsize")
+        return cursor.fetchone()[0]
+    if not table_exists(cursor, f"{table}_data"):
+        return None
+
+    if cursor.connection.in_transaction:
+        # FTS5 buffers the averages record until the statement savepoint
+        # ends; releasing one writes out the rows added in this transaction
+        cursor.execute("SAVEPOINT fts_row_count")
+        cursor.execute("RELEASE fts_row_count")
+    cursor.execute(f"SELECT block FROM {table}_data WHERE id = 1")
+    row = cursor.fetchone()
+    if row is None or not row[0]:
+        # Nothing has been written to the index yet
+        return 0
+    return read_varint(row[0])[0]
+
+def copy_next_chunk(cursor, table, after_rowid, chunk_size):
+    """
+    Copy the next chunk of resources above after_rowid into table.
+
+    Returns the highest rowid copied, or None if there was nothing left.
+    """
+    cursor.execute("""
+    SELECT MAX(id) FROM (
+        SELECT id FROM resources WHERE id > ? ORDER BY id LIMIT ?
+    )
+    """, (after_rowid, chunk_size))
+    upper = cursor.fetchone()[0]
+    if upper is None:
+        return None
+
+    cursor.execute(f"""
+    INSERT INTO {table}(rowid, {fts_column_list()})
+    SELECT id, {fts_column_list()}
+    FROM resources
+    WHERE id > ? AND id <= ?
+    """, (after_rowid, upper))
+    cursor.execute(f"UPDATE {BUILD_STATE_TABLE} SET last_rowid = ? WHERE table_name = ?", (upper, table))
+    return upper
 
-def setup_fts_index(db_path='resources.db'):
-    """Set up FTS5 index for resources."""
-    print(f"Setting up FTS5 index for database at {db_path}")
+def create_build_state_table(cursor):
+    cursor.execute(f"""
+    CREATE TABLE IF NOT EXISTS {BUILD_STATE_TABLE} (
+        table_name TEXT PRIMARY KEY,
+        last_rowid INTEGER NOT NULL
+    )
+    """)
+
+def get_build_checkpoint(cursor, table):
+    """Return the last rowid copied into an unfinished build of table, or None."""
+    if not table_exists(cursor, BUILD_STATE_TABLE):
+        return None
+    cursor.execute(f"SELECT last_rowid FROM {BUILD_STATE_TABLE} WHERE table_name = ?", (table,))
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+def populate_in_chunks(cursor, table, last_rowid=0, chunk_size=5000):
+    """
+    Copy resources above last_rowid into table, one transaction per chunk.
+
+    Each chunk commits together with its checkpoint, so at most one chunk
+    of work is lost if the process dies, and memory use is bounded by the
+    chunk size rather than the table size. Returns the last rowid copied.
+    """
+    cursor.execute("SELECT COUNT(*) FROM resources WHERE id > ?", (last_rowid,))
+    remaining = cursor.fetchone()[0]
+    print(f"Populating {table}: {remaining} resources in chunks of {chunk_size}...")
+
+    started = time.perf_counter()
+    done = 0
+    while True:
+        cursor.execute("BEGIN IMMEDIATE")
+        upper = copy_next_chunk(cursor, table, last_rowid, chunk_size)
+        if upper is None:
+            cursor.execute("COMMIT")
+            return last_rowid
+        cursor.execute("SELECT COUNT(*) FROM resources WHERE id > ? AND id <= ?", (last_rowid, upper))
+        done += cursor.fetchone()[0]
+        cursor.execute("COMMIT")
+        last_rowid = upper
+
+        elapsed = time.perf_counter() - started
+        rate = done / elapsed if elapsed > 0 else 0.0
+        print(f"  {done}/{remaining} resources indexed ({rate:.0f} rows/sec)")
+
+def setup_fts_index(db_path='resources.db', profile='default', chunk_size=5000, resume=True):
+    """
+    Set up FTS5 index for resources.
+
+    profile selects the index options, see FTS_PROFILES. The index is filled
+    in chunks of chunk_size resources; if an earlier build was interrupted
+    and resume is set, it continues from its last checkpoint instead of
+    starting over.
+    """
+    print(f"Setting up FTS5 index for database at {db_path} (profile: {profile})")
 
     # Check if the database file exists
     if not os.path.exists(db_path):
         print(f"Error: Database file not found at {db_path}")
         return False
 
-    # Connect to the database
-    conn = sqlite3.connect(db_path)
+    # Connect to the database; transactions are managed explicitly so each
+    # chunk commits on its own
+    conn = connect(db_path, isolation_level=None)
     cursor = conn.cursor()
 
     try:
@@ -37,103 +358,59 @@ def setup_fts_index(db_path='resources.db'):
         print(f"Found {resource_count} resources in the database")
 
         # Check if FTS5 is available
-        try:
-            cursor.execute("SELECT sqlite_version()")
-            version = cursor.fetchone()[0]
-            print(f"SQLite version: {version}")
-
-            # Create a test FTS5 table to check if FTS5 is available
-            cursor.execute("CREATE VIRTUAL TABLE temp.test_fts USING fts5(content)")
-            cursor.execute("DROP TABLE temp.test_fts")
-            print("FTS5 is available")
-        except sqlite3.OperationalError as e:
-            print(f"Error: FTS5 is not available - {str(e)}")
-            print("Please make sure your SQLite version supports FTS5")
+        if not check_fts5(cursor):
             return False
 
-        # Check if the FTS5 table already exists
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='resource_fts'")
-        if cursor.fetchone():
-            print("FTS5 table already exists, dropping it to recreate")
-            cursor.execute("DROP TABLE resource_fts")
+        checkpoint = get_build_checkpoint(cursor, FTS_TABLE)
+        if resume and checkpoint is not None and table_exists(cursor, FTS_TABLE):
+            print(f"Resuming interrupted index build after resource {checkpoint}")
+        else:
+            cursor.execute("BEGIN IMMEDIATE")
 
-        # Create the FTS5 virtual table
-        print("Creating FTS5 virtual table...")
-        cursor.execute("""
-        CREATE VIRTUAL TABLE resource_fts USING fts5(
-            name,
-            description,
-            eligibility_criteria,
-            application_process,
-            documents_required,
-            cost,
-            hours_of_operation,
-            languages_supported,
-            content='resources',
-            content_rowid='id'
-        )
-        """)
+            # Check if the FTS5 table already exists
+            if table_exists(cursor, FTS_TABLE):
+                print("FTS5 table already exists, dropping it to recreate")
+                cursor.execute(f"DROP TABLE {FTS_TABLE}")
+
+            # Check for existing triggers and drop them if they exist
+            print("Checking for existing triggers...")
+            for trigger_name in FTS_TRIGGERS + SHADOW_TRIGGERS:
+                cursor.execute("SELECT name FROM sqlite_master WHERE type='trigger' AND name=?", (trigger_name,))
+                if cursor.fetchone():
+                    print(f"Dropping existing trigger {trigger_name}...")
+                    cursor.execute(f"DROP TRIGGER {trigger_name}")
+
+            # Create the FTS5 virtual table
+            print("Creating FTS5 virtual table...")
+            create_fts_table(cursor, profile=profile)
+
+            # Until the build finishes, only rows that are already indexed
+            # are kept in sync
+            create_build_state_table(cursor)
+            cursor.execute(f"INSERT OR REPLACE INTO {BUILD_STATE_TABLE} (table_name, last_rowid) VALUES (?, 0)",
+                           (FTS_TABLE,))
+            create_shadow_triggers(cursor, FTS_TABLE)
+            cursor.execute("COMMIT")
+            checkpoint = 0
 
         # Populate the FTS5 table with existing data
-        print("Populating FTS5 table with existing data...")
-        cursor.execute("""
-        INSERT INTO resource_fts(rowid, name, description, eligibility_criteria,
-                                application_process, documents_required, cost,
-                                hours_of_operation, languages_supported)
-        SELECT id, name, description, eligibility_criteria,
-               application_process, documents_required, cost,
-               hours_of_operation, languages_supported
-        FROM resources
-        """)
-
-        # Check for existing triggers and drop them if they exist
-        print("Checking for existing triggers...")
-        for trigger_name in ['resources_ai', 'resources_au', 'resources_ad']:
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='trigger' AND name=?", (trigger_name,))
-            if cursor.fetchone():
-                print(f"Dropping existing trigger {trigger_name}...")
-                cursor.execute(f"DROP TRIGGER {trigger_name}")
+        last_rowid = populate_in_chunks(cursor, FTS_TABLE, checkpoint, chunk_size)
 
         # Create triggers to keep the FTS5 table in sync with the resources table
         print("Creating triggers to keep the FTS5 table in sync...")
+        cursor.execute("BEGIN IMMEDIATE")
+        # Pick up rows inserted since the last chunk
+        while copy_next_chunk(cursor, FTS_TABLE, last_rowid, chunk_size) is not None:
+            last_rowid = get_build_checkpoint(cursor, FTS_TABLE)
+        drop_triggers(cursor, SHADOW_TRIGGERS)
+        create_fts_triggers(cursor)
+        cursor.execute(f"DELETE FROM {BUILD_STATE_TABLE} WHERE table_name = ?", (FTS_TABLE,))
 
-        # Insert trigger
-        cursor.execute("""
-        CREATE TRIGGER resources_ai AFTER INSERT ON resources BEGIN
-            INSERT INTO resource_fts(rowid, name, description, eligibility_criteria,
-                                    application_process, documents_required, cost,
-                                    hours_of_operation, languages_supported)
-            VALUES (new.id, new.name, new.description, new.eligibility_criteria,
-                   new.application_process, new.documents_required, new.cost,
-                   new.hours_of_operation, new.languages_supported);
-        END;
-        """)
-
-        # Update trigger
-        cursor.execute("""
-        CREATE TRIGGER resources_au AFTER UPDATE ON resources BEGIN
-            UPDATE resource_fts
-            SET name = new.name,
-                description = new.description,
-                eligibility_criteria = new.eligibility_criteria,
-                application_process = new.application_process,
-                documents_required = new.documents_required,
-                cost = new.cost,
-                hours_of_operation = new.hours_of_operation,
-                languages_supported = new.languages_supported
-            WHERE rowid = old.id;
-        END;
-        """)
-
-        # Delete trigger
-        cursor.execute("""
-        CREATE TRIGGER resources_ad AFTER DELETE ON resources BEGIN
-            DELETE FROM resource_fts WHERE rowid = old.id;
-        END;
-        """)
+        # Log resource changes for clients syncing through /api/changes
+        create_change_log(cursor)
 
         # Commit changes
-        conn.commit()
+        cursor.execute("COMMIT")
 
         # Test the FTS5 index
         print("\nTesting FTS5 index...")
@@ -163,16 +440,125 @@ def setup_fts_index(db_path='resources.db'):
 
     except Exception as e:
         print(f"Error setting up FTS5 index: {str(e)}")
-        conn.rollback()
+        if conn.in_transaction:
+            cursor.execute("ROLLBACK")
         return False
     finally:
         conn.close()
 
+def rebuild_fts_index(db_path='resources.db', chunk_size=5000, profile=None):
+    """
+    Rebuild the FTS5 index without taking search offline.
+
+    profile selects the options of the new index; by default the options of
+    the current index are kept, so a rebuild can also switch profiles.
+
+    A new index is built in resource_fts_new next to the live one, filled
+    in chunks while shadow triggers mirror concurrent changes into it. Once
+    its row count is verified, it replaces resource_fts in one short
+    transaction. Returns a dictionary with build statistics, or None on
+    failure.
+    """
+    print(f"Rebuilding FTS5 index for database at {db_path}")
+
+    if not os.path.exists(db_path):
+        print(f"Error: Database file not found at {db_path}")
+        return None
+
+    new_table = f"{FTS_TABLE}_new"
+    started = time.perf_counter()
+
+    # Manage transactions explicitly so the swap is one atomic transaction
+    conn = connect(db_path, isolation_level=None)
+    cursor = conn.cursor()
+
+    try:
+        if not table_exists(cursor, 'resources'):
+            print("Error: Resources table does not exist")
+            return None
+        if not check_fts5(cursor):
+            return None
+
+        if profile is None:
+            profile = fts_table_options(cursor) or 'default'
+
+        # Clear out whatever an interrupted rebuild left behind
+        cursor.execute("BEGIN IMMEDIATE")
+        drop_triggers(cursor, SHADOW_TRIGGERS)
+        cursor.execute(f"DROP TABLE IF EXISTS {new_table}")
+        create_build_state_table(cursor)
+        cursor.execute(f"INSERT OR REPLACE INTO {BUILD_STATE_TABLE} (table_name, last_rowid) VALUES (?, 0)",
+                       (new_table,))
+
+        print(f"Creating shadow index {new_table}...")
+        create_fts_table(cursor, new_table, profile)
+        create_shadow_triggers(cursor, new_table)
+        cursor.execute("COMMIT")
+
+        # Fill the shadow index in chunks, one short transaction each, so
+        # writers are only ever blocked for the length of one chunk
+        last_rowid = populate_in_chunks(cursor, new_table, 0, chunk_size)
+
+        # Swap the indexes in one transaction
+        print("Swapping the new index into place...")
+        cursor.execute("BEGIN IMMEDIATE")
+
+        # Rows inserted since the last chunk are not covered by the shadow triggers
+        while copy_next_chunk(cursor, new_table, last_rowid, chunk_size) is not None:
+            last_rowid = get_build_checkpoint(cursor, new_table)
+
+        cursor.execute("SELECT COUNT(*) FROM resources")
+        resource_count = cursor.fetchone()[0]
+        indexed = indexed_row_count(cursor, new_table)
+        if indexed is None:
+            raise RuntimeError(f"Can't count the rows of {new_table}; refusing to swap it in")
+        if indexed != resource_count:
+            raise RuntimeError(f"{new_table} has {indexed} rows but resources has {resource_count}")
+
+        drop_triggers(cursor, SHADOW_TRIGGERS + FTS_TRIGGERS)
+        cursor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+        cursor.execute(f"ALTER TABLE {new_table} RENAME TO {FTS_TABLE}")
+        create_fts_triggers(cursor)
+        cursor.execute(f"DELETE FROM {BUILD_STATE_TABLE} WHERE table_name = ?", (new_table,))
+        cursor.execute("COMMIT")
+
+        stats = {
+            'rows': resource_count,
+            'seconds': time.perf_counter() - started,
+            'index_bytes': fts_index_size(cursor)
+        }
+        print(f"Rebuilt index of {stats['rows']} resources in {stats['seconds']:.2f}s, "
+              f"index size {stats['index_bytes'] / 1024:.1f} KiB")
+        return stats
+
+    except Exception as e:
+        print(f"Error rebuilding FTS5 index: {str(e)}")
+        if conn.in_transaction:
+            cursor.execute("ROLLBACK")
+        # Leave the live index untouched and stop mirroring into the shadow
+        drop_triggers(cursor, SHADOW_TRIGGERS)
+        return None
+    finally:
+        conn.close()
+
 if __name__ == "__main__":
-    # Get database path from command line arguments or use default
-    db_path = sys.argv[1] if len(sys.argv) > 1 else 'resources.db'
+    parser = argparse.ArgumentParser(description="Set up the FTS5 index for resources")
+    parser.add_argument('db_path', nargs='?', default='resources.db')
+    parser.add_argument('--rebuild', action='store_true',
+                        help='Rebuild the index alongside the live one and swap it in')
+    parser.add_argument('--chunk-size', type=int, default=5000,
+                        help='Rows copied per transaction')
+    parser.add_argument('--restart', action='store_true',
+                        help='Start an interrupted build over instead of resuming it')
+    parser.add_argument('--profile', choices=sorted(FTS_PROFILES), default=None,
+                        help='Index options (default: "default", or the current options on --rebuild)')
+    args = parser.parse_args()
 
-    if setup_fts_index(db_path):
+    if args.rebuild:
+        if rebuild_fts_index(args.db_path, args.chunk_size, args.profile) is None:
+            print("Failed to rebuild FTS5 index")
+            sys.exit(1)
+    elif setup_fts_index(args.db_path, args.profile or 'default', args.chunk_size, not args.restart):
         print("FTS5 index setup completed successfully")
     else:
         print("Failed to set up FTS5 index")
@@ -0,0 +1,233 @@
+"""
+Search result cache shared by all worker processes on a host.
+
+Gunicorn runs several worker processes, so an in-process cache is warmed
+once per worker and lost whenever a worker is recycled. SharedResultCache
+keeps results in a local SQLite file that every worker reads and writes.
+
+Each entry is stamped with the data version of the database it was computed
+from. When the resources database changes, old entries stop matching and
+are treated as misses. The file is kept under a size limit by evicting the
+least recently used entries.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# Only refresh an entry's access time when it is older than this, so most
+# hits are pure reads
+TOUCH_INTERVAL = 10.0
+
+
+def data_version(*db_paths):
+    """
+    Stamp describing the current contents of the given database files.
+
+    Built from the size and modification time of each database and its WAL
+    file, so any committed write produces a new stamp.
+    """
+    parts = []
+    for db_path in db_paths:
+        for path in (db_path, db_path + '-wal'):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            if path != db_path and stat.st_size == 0:
+                # An empty WAL comes and goes with connections, not with writes
+                continue
+            parts.append(f"{stat.st_mtime_ns}:{stat.st_size}")
+    return '|'.join(parts)
+
+
+class SharedResultCache:
+    """Size-bounded result cache stored in a SQLite file."""
+
+    def __init__(self, path, max_bytes=64 * 1024 * 1024, busy_timeout_ms=100):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.busy_timeout_ms = busy_timeout_ms
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.errors = 0
+        self._hit_seconds = 0.0
+        self._create_table()
+
+    def _connection(self):
+        # sqlite3 connections are per thread
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout_ms / 1000, isolation_level=None)
+            conn.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout_ms)}")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _create_table(self):
+        conn = self._connection()
+        # WAL lets every worker read while one of them writes
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS cache_entries (
+            key TEXT PRIMARY KEY,
+            data_version TEXT NOT NULL,
+            value BLOB NOT NULL,
+            size INTEGER NOT NULL,
+            accessed_at REAL NOT NULL
+        )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_entries_accessed ON cache_entries(accessed_at)")
+
+        # Running total of the entry sizes, so a write doesn't have to sum
+        # the whole table to decide whether to evict. Triggers keep it in
+        # step with every insert, update and delete from any process
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("""
+            CREATE TABLE IF NOT EXISTS cache_meta (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                total_size INTEGER NOT NULL
+            )
+            """)
+            conn.execute("""
+            INSERT OR IGNORE INTO cache_meta (id, total_size)
+            SELECT 1, COALESCE(SUM(size), 0) FROM cache_entries
+            """)
+            conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS cache_entries_size_ai AFTER INSERT ON cache_entries BEGIN
+                UPDATE cache_meta SET total_size = total_size + new.size WHERE id = 1;
+            END
+            """)
+            conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS cache_entries_size_ad AFTER DELETE ON cache_entries BEGIN
+                UPDATE cache_meta SET total_size = total_size - old.size WHERE id = 1;
+            END
+            """)
+            conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS cache_entries_size_au
+            AFTER UPDATE OF size ON cache_entries BEGIN
+                UPDATE cache_meta SET total_size = total_size + new.size - old.size WHERE id = 1;
+            END
+            """)
+            conn.execute("COMMIT")
+        except sqlite3.Error:
+            conn.execute("ROLLBACK")
+            raise
+
+    @staticmethod
+    def make_key(parts):
+        """Hash any JSON-serializable key into a fixed-size cache key."""
+        return hashlib.sha1(json.dumps(parts, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+    def get(self, key, version):
+        """Return the cached value for key, or None if missing or stale."""
+        started = time.perf_counter()
+        try:
+            conn = self._connection()
+            row = conn.execute(
+                "SELECT data_version, value, accessed_at FROM cache_entries WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None:
+                self._count('misses')
+                return None
+
+            if row[0] != version:
+                self._count('stale')
+                conn.execute("DELETE FROM cache_entries WHERE key = ? AND data_version = ?", (key, row[0]))
+                return None
+
+            value = json.loads(row[1])
+            now = time.time()
+            if now - row[2] > TOUCH_INTERVAL:
+                conn.execute("UPDATE cache_entries SET accessed_at = ? WHERE key = ?", (now, key))
+        except sqlite3.Error as e:
+            # The cache must never fail a request
+            print(f"Shared cache read failed: {str(e)}")
+            self._count('errors')
+            return None
+
+        with self._stats_lock:
+            self.hits += 1
+            self._hit_seconds += time.perf_counter() - started
+        return value
+
+    def set(self, key, version, value):
+        """Store value for key, then evict old entries if over the size limit."""
+        data = json.dumps(value).encode('utf-8')
+        if len(data) > self.max_bytes:
+            return
+        try:
+            conn = self._connection()
+            # An upsert rather than INSERT OR REPLACE: the rows REPLACE deletes
+            # don't fire the delete trigger that keeps the total
+            conn.execute("""
+            INSERT INTO cache_entries (key, data_version, value, size, accessed_at)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(key) DO UPDATE SET
+                data_version = excluded.data_version,
+                value = excluded.value,
+                size = excluded.size,
+                accessed_at = excluded.accessed_at
+            """, (key, version, data, len(data), time.time()))
+            self._evict(conn)
+        except sqlite3.Error as e:
+            print(f"Shared cache write failed: {str(e)}")
+            self._count('errors')
+
+    def _total_size(self, conn):
+        return conn.execute("SELECT total_size FROM cache_meta WHERE id = 1").fetchone()[0]
+
+    def _evict(self, conn):
+        total = self._total_size(conn)
+        if total <= self.max_bytes:
+            return
+
+        # Evict least recently used entries until we are back under the limit
+        excess = total - self.max_bytes
+        victims = []
+        for key, size in conn.execute("SELECT key, size FROM cache_entries ORDER BY accessed_at"):
+            victims.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        conn.executemany("DELETE FROM cache_entries WHERE key = ?", victims)
+
+    def clear(self):
+        """Remove every entry."""
+        self._connection().execute("DELETE FROM cache_entries")
+
+    def _count(self, name):
+        with self._stats_lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def stats(self):
+        """Hit/miss counters for this process plus the size of the shared file."""
+        try:
+            conn = self._connection()
+            entries = conn.execute("SELECT COUNT(*) FROM cache_entries").fetchone()[0]
+            size = self._total_size(conn)
+        except sqlite3.Error:
+            entries, size = None, None
+
+        with self._stats_lock:
+            lookups = self.hits + self.misses + self.stale
+            return {
+                'path': self.path,
+                'hits': self.hits,
+                'misses': self.misses,
+                'stale': self.stale,
+                'errors': self.errors,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'avg_hit_ms': (self._hit_seconds / self.hits * 1000) if self.hits else 0.0,
+                'entries': entries,
+                'bytes': size,
+                'max_bytes': self.max_bytes
+            }
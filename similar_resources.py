@@ -0,0 +1,178 @@
+"""
+"More like this" search for resources.
+
+The resources similar to a given one are found with its own most
+distinctive terms. Each term of the resource's indexed text is weighted by
+how often it occurs there and by how rare it is across the index, using
+the document frequencies of an fts5vocab table. The top terms then run as
+a single weighted OR query against resource_fts: every matching resource
+scores the sum of its bm25 score per term, times the term's weight.
+
+Term vectors are cached per worker and stamped with the database's data
+version, so any edit to the resources recomputes them.
+"""
+
+import math
+import threading
+from collections import Counter, OrderedDict
+
+from search_queries import RESOURCE_COLUMNS, row_to_resource
+from setup_fts_index import FTS_TABLE, FTS_COLUMNS, fts_column_list, fts_table_options
+from shared_cache import data_version
+
+# How many of a resource's terms make up its query
+MAX_TERMS = 12
+
+# Term vectors kept per worker
+MAX_CACHED_VECTORS = 1024
+
+# Temp tables used to tokenize a resource the same way the index does
+TERMS_TABLE = 'similar_terms'
+
+
+def quote_term(term):
+    """Quote an index term as an FTS5 string."""
+    return '"' + term.replace('"', '""') + '"'
+
+
+def create_vocab_tables(conn):
+    """Create the temp tables that tokenize resources and read document frequencies."""
+    options = fts_table_options(conn.cursor()) or {}
+    tokenize = options.get('tokenize')
+    tokenize_option = f", tokenize='{tokenize.replace(chr(39), chr(39) * 2)}'" if tokenize else ''
+
+    conn.execute(f"CREATE VIRTUAL TABLE IF NOT EXISTS temp.{TERMS_TABLE} "
+                 f"USING fts5({fts_column_list()}{tokenize_option})")
+    conn.execute(f"CREATE VIRTUAL TABLE IF NOT EXISTS temp.{TERMS_TABLE}_instance "
+                 f"USING fts5vocab(temp, {TERMS_TABLE}, instance)")
+    conn.execute(f"CREATE VIRTUAL TABLE IF NOT EXISTS temp.{FTS_TABLE}_row "
+                 f"USING fts5vocab(main, {FTS_TABLE}, row)")
+
+
+def resource_terms(conn, resource_id):
+    """
+    Count the index terms in a resource's text.
+
+    Returns a Counter of term frequencies, or None if there is no such
+    resource.
+    """
+    row = conn.execute(f"SELECT {fts_column_list()} FROM resources WHERE id = ?",
+                       (resource_id,)).fetchone()
+    if row is None:
+        return None
+
+    create_vocab_tables(conn)
+    try:
+        conn.execute(f"INSERT INTO temp.{TERMS_TABLE}({fts_column_list()}) VALUES "
+                     f"({', '.join('?' * len(FTS_COLUMNS))})", tuple(row))
+        return Counter(term for term, in conn.execute(f"SELECT term FROM temp.{TERMS_TABLE}_instance"))
+    finally:
+        conn.execute(f"DELETE FROM temp.{TERMS_TABLE}")
+
+
+def term_vector(conn, resource_id, max_terms=MAX_TERMS):
+    """
+    Return the most distinctive terms of a resource as (term, weight) pairs.
+
+    The weight is the term frequency in the resource times the bm25 inverse
+    document frequency. Terms no other resource contains can't find
+    anything and are left out. Returns None if there is no such resource.
+    """
+    terms = resource_terms(conn, resource_id)
+    if terms is None:
+        return None
+
+    total = conn.execute("SELECT COUNT(*) FROM resources").fetchone()[0]
+    weights = []
+    for term, frequency in terms.items():
+        if len(term) < 2:
+            continue
+        row = conn.execute(f"SELECT doc FROM temp.{FTS_TABLE}_row WHERE term = ?", (term,)).fetchone()
+        documents = row[0] if row else 0
+        if documents < 2:
+            continue
+        idf = math.log((total - documents + 0.5) / (documents + 0.5) + 1)
+        weights.append((term, frequency * idf))
+
+    weights.sort(key=lambda item: (-item[1], item[0]))
+    return weights[:max_terms]
+
+
+def search_similar(conn, terms, exclude_id, limit=10, offset=0):
+    """
+    Run a weighted OR query for terms and return (resources, total).
+
+    exclude_id, the resource the terms came from, is left out of the
+    results. Each resource carries its combined score.
+    """
+    if not terms:
+        return [], 0
+
+    matches = '\n        UNION ALL\n'.join(
+        f"        SELECT rowid, -bm25({FTS_TABLE}) * ? AS score FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH ?"
+        for _ in terms)
+    params = [value for term, weight in terms for value in (weight, quote_term(term))]
+    scored = f"""
+    SELECT rowid, SUM(score) AS score
+    FROM (
+{matches}
+    )
+    WHERE rowid != ?
+    GROUP BY rowid
+    """
+
+    cursor = conn.cursor()
+    cursor.execute(f"""
+    SELECT {RESOURCE_COLUMNS}, s.score
+    FROM ({scored}) s
+    JOIN resources r ON r.id = s.rowid
+    ORDER BY s.score DESC, r.id
+    LIMIT ? OFFSET ?
+    """, params + [exclude_id, limit, offset])
+    resources = [row_to_resource(row) for row in cursor.fetchall()]
+
+    cursor.execute(f"SELECT COUNT(*) FROM ({scored})", params + [exclude_id])
+    total = cursor.fetchone()[0]
+    return resources, total
+
+
+class TermVectorCache:
+    """Per-worker LRU cache of resource term vectors."""
+
+    def __init__(self, max_entries=MAX_CACHED_VECTORS):
+        self.max_entries = max_entries
+        self._vectors = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, conn, db_path, resource_id):
+        """Get the term vector of a resource, computing it on a miss."""
+        key = (db_path, resource_id)
+        version = data_version(db_path)
+        with self._lock:
+            entry = self._vectors.get(key)
+            if entry is not None and entry[0] == version:
+                self._vectors.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+
+        vector = term_vector(conn, resource_id)
+        with self._lock:
+            self.misses += 1
+            if vector is not None:
+                self._vectors[key] = (version, vector)
+                self._vectors.move_to_end(key)
+                while len(self._vectors) > self.max_entries:
+                    self._vectors.popitem(last=False)
+        return vector
+
+    def stats(self):
+        """Entries, hits and misses so far."""
+        with self._lock:
+            return {'entries': len(self._vectors), 'hits': self.hits, 'misses': self.misses}
+
+    def clear(self):
+        """Drop all cached vectors."""
+        with self._lock:
+            self._vectors.clear()
@@ -0,0 +1,84 @@
+"""
+Helpers for building small resource databases in tests.
+"""
+
+import os
+import sqlite3
+from contextlib import closing
+
+SAMPLE_RESOURCES = [
+    (1, "Food Bank of Kern County", "Provides food assistance to those in need", "123 Main St", "Low income", "9-5"),
+    (2, "Community Action Partnership of Kern (CAPK) Food Bank", "Distributes food to those in need throughout Kern County", "456 Oak St", "Low income", "10-4"),
+    (3, "Bakersfield Rescue Mission", "Provides shelter and meals to homeless individuals", "789 Pine St", "Homeless", "24/7"),
+    (4, "Kern County Department of Human Services", "Administers CalWORKs (cash aid), General Assistance, and CalFresh (food stamps)", "321 Elm St", "Low income", "8-5"),
+    (5, "Medical Clinic", "Provides medical services to low-income individuals", "654 Maple St", "Low income", "9-6")
+]
+
+
+def create_resources_db(db_path, resources=SAMPLE_RESOURCES):
+    """
+    Create a resources database at db_path.
+
+    Each resource is a (id, name, description, address, eligibility_criteria,
+    hours_of_operation) tuple; the remaining columns get fixed test values.
+    """
+    if os.path.exists(db_path):
+        os.remove(db_path)
+
+    with closing(sqlite3.connect(db_path)) as conn:
+        cursor = conn.cursor()
+        cursor.execute('''
+        CREATE TABLE resources (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            description TEXT,
+            url TEXT,
+            phone TEXT,
+            email TEXT,
+            address TEXT,
+            eligibility_criteria TEXT,
+            application_process TEXT,
+            documents_required TEXT,
+            cost TEXT,
+            hours_of_operation TEXT,
+            languages_supported TEXT,
+            is_active BOOLEAN DEFAULT 1,
+            is_verified BOOLEAN DEFAULT 0,
+            verification_notes TEXT,
+            image_path TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        ''')
+        cursor.execute('''
+        CREATE TABLE categories (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            description TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        ''')
+        cursor.execute('''
+        CREATE TABLE resource_categories (
+            resource_id INTEGER,
+            category_id INTEGER,
+            PRIMARY KEY (resource_id, category_id)
+        )
+        ''')
+        cursor.executemany('''
+        INSERT INTO resources (id, name, description, url, phone, email, address,
+                               eligibility_criteria, application_process,
+                               documents_required, cost, hours_of_operation,
+                               languages_supported)
+        VALUES (?, ?, ?, 'http://example.com', '555-0000', 'info@example.org', ?, ?,
+                'Walk-in', 'ID', 'Free', ?, 'English, Spanish')
+        ''', resources)
+        conn.commit()
+
+
+def remove_db(db_path):
+    """Remove a test database and any WAL/journal files next to it."""
+    for suffix in ('', '-wal', '-shm', '-journal'):
+        if os.path.exists(db_path + suffix):
+            os.remove(db_path + suffix)
@@ -0,0 +1,108 @@
+"""
+Tests for the concurrent term searches of the AI search demo.
+"""
+
+import os
+import sys
+import threading
+import time
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+from unittest.mock import patch
+
+# Add the parent directory to the path so we can import the modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import ai_search_demo
+from ai_search_demo import fan_out_search
+
+
+def fake_search(results, delays, release=None):
+    """search_resources stand-in returning canned ids after a delay per term."""
+    def search(term, limit=5):
+        if delays.get(term) == 'hang':
+            release.wait(5)
+        else:
+            time.sleep(delays.get(term, 0))
+        return {'success': True, 'resources': [{'id': resource_id, 'name': str(resource_id)}
+                                               for resource_id in results[term]]}
+    return search
+
+
+class TestFanOutSearch(unittest.TestCase):
+    """Test concurrency, merging, early stop and the deadline."""
+
+    def run_fan_out(self, results, delays, release=None, **kwargs):
+        with patch.object(ai_search_demo, 'search_resources', fake_search(results, delays, release)):
+            with redirect_stdout(StringIO()):
+                started = time.perf_counter()
+                resources = fan_out_search(list(results), **kwargs)
+                return [resource['id'] for resource in resources], time.perf_counter() - started
+
+    def test_searches_run_concurrently(self):
+        results = {'food': [1, 2], 'housing': [3, 1], 'medical': [5]}
+        ids, elapsed = self.run_fan_out(results, {'food': 0.2, 'housing': 0.2, 'medical': 0.2}, enough=10)
+
+        self.assertLess(elapsed, 0.5)
+        # Each term's top result first, in term order; duplicates merged
+        self.assertEqual(ids, [1, 3, 5, 2])
+
+    def test_every_term_included_whatever_finishes_first(self):
+        results = {'food': [1, 2, 3], 'housing': [4, 5, 6]}
+        for delays in ({'food': 0.1}, {'housing': 0.1}):
+            ids, _ = self.run_fan_out(results, delays, enough=3)
+            self.assertEqual(ids, [1, 4, 2, 5, 3, 6])
+
+    def test_stops_once_top_results_settled(self):
+        release = threading.Event()
+        results = {'food': [1, 2], 'housing': [3], 'medical': [4], 'legal': [5]}
+        try:
+            ids, elapsed = self.run_fan_out(results, {'legal': 'hang'}, release, enough=3)
+        finally:
+            release.set()
+
+        # legal's top result could only come after food, housing and medical's
+        self.assertEqual(ids[:3], [1, 3, 4])
+        self.assertNotIn(5, ids)
+        self.assertLess(elapsed, 1)
+
+    def test_waits_for_earlier_terms(self):
+        release = threading.Event()
+        results = {'food': [1], 'housing': [2, 3, 4]}
+        try:
+            ids, elapsed = self.run_fan_out(results, {'food': 'hang'}, release, enough=2, deadline=0.3)
+        finally:
+            release.set()
+
+        # food might still rank first, so housing's results alone don't settle it
+        self.assertGreaterEqual(elapsed, 0.3)
+        self.assertEqual(ids, [2, 3, 4])
+
+    def test_deadline(self):
+        release = threading.Event()
+        results = {'food': [1], 'housing': [4]}
+        try:
+            ids, elapsed = self.run_fan_out(results, {'housing': 'hang'}, release, deadline=0.3)
+        finally:
+            release.set()
+
+        self.assertEqual(ids, [1])
+        self.assertLess(elapsed, 1)
+
+
+class TestResponse(unittest.TestCase):
+    """Test the wording of the simulated answer."""
+
+    def test_counts_retrieved_resources(self):
+        resources = [{'id': n, 'name': f"Resource {n}"} for n in range(8)]
+        with patch.object(ai_search_demo, 'fan_out_search', lambda terms: resources):
+            with redirect_stdout(StringIO()):
+                response = ai_search_demo.simulate_ai_response('food')
+
+        self.assertIn('I retrieved 8 resources.', response)
+        self.assertNotIn('in total', response)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,219 @@
+"""
+Tests for serving the search API over ASGI.
+"""
+
+import asyncio
+import json
+import os
+import sys
+import sqlite3
+import tempfile
+import threading
+import unittest
+from contextlib import closing, redirect_stdout
+from io import StringIO
+
+# Add the parent directory to the path so we can import the modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import fts_search_api
+from asgi_bridge import AsgiBridge, build_environ
+from setup_fts_index import setup_fts_index
+from fts_test_utils import create_resources_db, remove_db
+
+
+def http_scope(path, query=b'', method='GET', headers=()):
+    return {'type': 'http', 'method': method, 'path': path, 'query_string': query,
+            'headers': list(headers), 'http_version': '1.1', 'scheme': 'http',
+            'server': ('testserver', 80), 'client': ('127.0.0.1', 5000)}
+
+
+async def request(app, scope, body=b''):
+    """Call an ASGI app and collect (status, headers, body chunks)."""
+    messages = [{'type': 'http.request', 'body': body, 'more_body': False}]
+    sent = []
+
+    async def receive():
+        if messages:
+            return messages.pop(0)
+        # Like a server, only report a disconnect when one happens
+        await asyncio.Event().wait()
+
+    async def send(message):
+        sent.append(message)
+
+    await app(scope, receive, send)
+    start = sent[0]
+    chunks = [message['body'] for message in sent[1:] if message['body']]
+    return start['status'], dict(start['headers']), chunks
+
+
+class TestBuildEnviron(unittest.TestCase):
+    """Test the translation of ASGI scopes to WSGI environs."""
+
+    def test_environ(self):
+        environ = build_environ(http_scope('/api/search', b'q=caf%C3%A9', 'POST', [
+            (b'content-type', b'application/json'), (b'accept', b'a'), (b'accept', b'b')]), b'{}')
+
+        self.assertEqual((environ['REQUEST_METHOD'], environ['PATH_INFO']), ('POST', '/api/search'))
+        self.assertEqual(environ['QUERY_STRING'], 'q=caf%C3%A9')
+        self.assertEqual(environ['CONTENT_TYPE'], 'application/json')
+        self.assertEqual(environ['CONTENT_LENGTH'], '2')
+        self.assertEqual(environ['HTTP_ACCEPT'], 'a,b')
+        self.assertEqual(environ['wsgi.input'].read(), b'{}')
+
+
+class TestAsgiSearchApi(unittest.TestCase):
+    """Test the search API endpoints through the bridge."""
+
+    def setUp(self):
+        self.db_path = tempfile.mktemp(suffix='.db')
+        create_resources_db(self.db_path)
+        with redirect_stdout(StringIO()):
+            setup_fts_index(self.db_path)
+        fts_search_api.app.config['DATABASE_PATH'] = self.db_path
+        self.app = AsgiBridge(fts_search_api.app, max_workers=4)
+
+    def tearDown(self):
+        fts_search_api.app.config.pop('DATABASE_PATH')
+        remove_db(self.db_path)
+
+    def test_search(self):
+        status, headers, chunks = asyncio.run(request(self.app, http_scope('/api/search', b'q=food&expand=0')))
+
+        self.assertEqual(status, 200)
+        self.assertEqual(headers[b'content-type'], b'application/json')
+        data = json.loads(b''.join(chunks))
+        self.assertEqual(sorted(resource['id'] for resource in data['resources']), [1, 2, 4])
+
+    def test_streaming_response_in_batches(self):
+        with closing(sqlite3.connect(self.db_path)) as conn:
+            conn.executemany("INSERT INTO resources (name, description) VALUES (?, ?)",
+                             [(f"Pantry {n}", 'x' * 200) for n in range(200)])
+            conn.commit()
+
+        status, _, chunks = asyncio.run(request(self.app, http_scope('/api/changes', b'since=0&limit=200')))
+
+        self.assertEqual(status, 200)
+        # One message per batch of changes, not one per change
+        self.assertGreater(len(chunks), 1)
+        self.assertLess(len(chunks), 20)
+        data = json.loads(b''.join(chunks))
+        self.assertEqual(len(data['changes']), 200)
+
+
+class TestDisconnect(unittest.TestCase):
+    """Test that a client going away stops its request."""
+
+    def test_partial_body_is_not_processed(self):
+        calls = []
+
+        def app(environ, start_response):
+            calls.append(environ['wsgi.input'].read())
+            start_response('200 OK', [])
+            return [b'']
+
+        messages = [{'type': 'http.request', 'body': b'{"name": "tru', 'more_body': True},
+                    {'type': 'http.disconnect'}]
+        sent = []
+
+        async def receive():
+            return messages.pop(0)
+
+        async def send(message):
+            sent.append(message)
+
+        asyncio.run(AsgiBridge(app)(http_scope('/', method='PUT'), receive, send))
+        self.assertEqual((calls, sent), ([], []))
+
+    def test_stream_stops_after_disconnect(self):
+        pulled = []
+        closed = []
+
+        class Stream:
+            def __iter__(self):
+                for n in range(1000):
+                    pulled.append(n)
+                    yield b'x' * 1024
+
+            def close(self):
+                closed.append(True)
+
+        def app(environ, start_response):
+            start_response('200 OK', [])
+            return Stream()
+
+        messages = [{'type': 'http.request', 'body': b'', 'more_body': False}]
+        gone = None
+
+        async def receive():
+            if messages:
+                return messages.pop(0)
+            await gone.wait()
+            return {'type': 'http.disconnect'}
+
+        async def send(message):
+            if message['type'] == 'http.response.body':
+                # The client drops off after the first batch
+                gone.set()
+                await asyncio.sleep(0)
+
+        async def run():
+            nonlocal gone
+            gone = asyncio.Event()
+            await AsgiBridge(app)(http_scope('/api/changes'), receive, send)
+
+        asyncio.run(run())
+        self.assertLess(len(pulled), 1000)
+        self.assertEqual(closed, [True])
+
+
+class TestBackpressure(unittest.TestCase):
+    """Test that requests beyond the limit are rejected, not queued."""
+
+    def test_rejects_over_limit(self):
+        release = threading.Event()
+
+        def slow_app(environ, start_response):
+            release.wait(5)
+            start_response('200 OK', [('Content-Type', 'text/plain')])
+            return [b'done']
+
+        app = AsgiBridge(slow_app, max_workers=2, max_requests=2)
+
+        async def run():
+            pending = [asyncio.create_task(request(app, http_scope('/'))) for _ in range(2)]
+            await asyncio.sleep(0.05)
+            rejected = await request(app, http_scope('/'))
+            release.set()
+            return rejected, await asyncio.gather(*pending)
+
+        (status, headers, _), completed = asyncio.run(run())
+        self.assertEqual(status, 503)
+        self.assertEqual(headers[b'retry-after'], b'1')
+        self.assertEqual([result[0] for result in completed], [200, 200])
+        self.assertEqual(app.stats()['rejected'], 1)
+
+    def test_lifespan(self):
+        started = []
+        app = AsgiBridge(lambda environ, start_response: [], on_startup=lambda: started.append(True))
+
+        async def run():
+            messages = [{'type': 'lifespan.startup'}, {'type': 'lifespan.shutdown'}]
+            sent = []
+
+            async def receive():
+                return messages.pop(0)
+
+            async def send(message):
+                sent.append(message['type'])
+
+            await app({'type': 'lifespan'}, receive, send)
+            return sent
+
+        self.assertEqual(asyncio.run(run()), ['lifespan.startup.complete', 'lifespan.shutdown.complete'])
+        self.assertEqual(started, [True])
+
+
+if __name__ == '__main__':
+    unittest.main()
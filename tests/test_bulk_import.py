@@ -0,0 +1,184 @@
+"""
+Tests for the bulk resource import.
+"""
+
+import csv
+import json
+import os
+import sys
+import sqlite3
+import tempfile
+import unittest
+from contextlib import closing
+
+# Add the parent directory to the path so we can import the modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from bulk_import import bulk_import, normalize_row, normalize_values, provided_columns, RowError
+from setup_fts_index import setup_fts_index
+from index_hours import index_hours
+from geocode_resources import geocode_resources
+from fts_test_utils import create_resources_db, remove_db
+
+
+def match_ids(conn, query):
+    return sorted(row[0] for row in conn.execute(
+        "SELECT rowid FROM resource_fts WHERE resource_fts MATCH ?", (query,)))
+
+
+class TestNormalizeRow(unittest.TestCase):
+    """Test row validation and normalization."""
+
+    def test_normalizes_values(self):
+        row = normalize_row({'name': '  Food   Pantry ', 'phone': '661.555.1234', 'email': 'Info@Example.org',
+                             'url': 'example.org/food', 'is_active': 'no', 'extra': 'ignored'})
+
+        self.assertEqual(row['name'], 'Food Pantry')
+        self.assertEqual(row['phone'], '(661) 555-1234')
+        self.assertEqual(row['email'], 'info@example.org')
+        self.assertEqual(row['url'], 'https://example.org/food')
+        self.assertEqual((row['is_active'], row['is_verified']), (0, 0))
+        self.assertNotIn('extra', row)
+
+    def test_rejects_invalid_rows(self):
+        for raw in ({'name': ' '}, {'name': 'A', 'email': 'not-an-email'}, {'name': 'A', 'is_active': 'maybe'}):
+            with self.assertRaises(RowError):
+                normalize_row(raw)
+
+    def test_partial_values(self):
+        self.assertEqual(normalize_values({'phone': '6615551234', 'is_verified': 'yes'}, ['phone', 'is_verified']),
+                         {'phone': '(661) 555-1234', 'is_verified': 1})
+        # No insert-time defaults for flags that weren't given
+        self.assertIsNone(normalize_values({'name': 'A'})['is_active'])
+        with self.assertRaises(RowError):
+            normalize_values({'is_active': ['yes']}, ['is_active'])
+        self.assertEqual(provided_columns({'name': 'A', 'address': ' ', 'phone': '1', 'extra': 'x'}), ('name', 'phone'))
+
+
+class TestBulkImport(unittest.TestCase):
+    """Test importing files into a resources database."""
+
+    def setUp(self):
+        self.db_path = tempfile.mktemp(suffix='.db')
+        create_resources_db(self.db_path)
+        self.assertTrue(setup_fts_index(self.db_path))
+        self.temp_files = []
+
+    def tearDown(self):
+        remove_db(self.db_path)
+        for path in self.temp_files:
+            if os.path.exists(path):
+                os.remove(path)
+
+    def write_input(self, suffix, rows):
+        path = tempfile.mktemp(suffix=suffix)
+        self.temp_files.append(path)
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            if suffix == '.csv':
+                writer = csv.DictWriter(f, fieldnames=['Name', 'Address', 'Description'])
+                writer.writeheader()
+                writer.writerows(rows)
+            else:
+                for row in rows:
+                    f.write((row if isinstance(row, str) else json.dumps(row)) + '\n')
+        return path
+
+    def test_csv_upsert_by_natural_key(self):
+        path = self.write_input('.csv', [
+            # Matches resource 1 despite case and spacing
+            {'Name': 'food bank of  kern county', 'Address': '123 Main St', 'Description': 'Dental clinic'},
+            {'Name': 'New Pantry', 'Address': '1 First St', 'Description': 'Free food'},
+            {'Name': 'New Pantry', 'Address': '1 First St', 'Description': 'Free groceries'},
+            {'Name': '', 'Address': 'nowhere', 'Description': 'no name'}
+        ])
+        rejects_path = tempfile.mktemp(suffix='.csv')
+        self.temp_files.append(rejects_path)
+
+        stats = bulk_import(self.db_path, path, batch_size=2, processes=1, rejects_path=rejects_path)
+
+        self.assertEqual((stats['read'], stats['inserted'], stats['updated'], stats['rejected']), (4, 1, 2, 1))
+        with closing(sqlite3.connect(self.db_path)) as conn:
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM resources").fetchone()[0], 6)
+            self.assertEqual(conn.execute("SELECT description FROM resources WHERE name = 'New Pantry'")
+                             .fetchone()[0], 'Free groceries')
+            self.assertEqual(match_ids(conn, 'dental'), [1])
+            self.assertEqual(match_ids(conn, 'groceries'), [6])
+        with open(rejects_path, encoding='utf-8') as f:
+            self.assertIn('missing name', f.read())
+
+    def test_partial_reimport_keeps_other_columns(self):
+        with closing(sqlite3.connect(self.db_path)) as conn:
+            conn.execute("UPDATE resources SET is_verified = 1 WHERE id = 1")
+            conn.commit()
+        path = tempfile.mktemp(suffix='.csv')
+        self.temp_files.append(path)
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            f.write('name,address,phone,cost\nFood Bank of Kern County,123 Main St,661-555-1234,\n')
+
+        stats = bulk_import(self.db_path, path, processes=1)
+
+        self.assertEqual(stats['updated'], 1)
+        with closing(sqlite3.connect(self.db_path)) as conn:
+            row = conn.execute("SELECT phone, description, cost, is_active, is_verified FROM resources WHERE id = 1").fetchone()
+        self.assertEqual(row, ('(661) 555-1234', 'Provides food assistance to those in need', 'Free', 1, 1))
+
+    def test_import_reindexes_hours(self):
+        self.assertIsNotNone(index_hours(self.db_path))
+        path = self.write_input('.jsonl', [
+            {'name': 'Food Bank of Kern County', 'address': '123 Main St',
+             'hours_of_operation': 'Sat 9am-1pm'},
+            {'name': 'Night Pantry', 'hours_of_operation': 'Mon 6pm-9pm'},
+            {'name': 'Call Pantry', 'hours_of_operation': 'Call for hours'}
+        ])
+
+        stats = bulk_import(self.db_path, path, processes=1)
+
+        self.assertEqual(stats['hours_unparsed'], 1)
+        with closing(sqlite3.connect(self.db_path)) as conn:
+            intervals = conn.execute("""
+            SELECT r.name, h.day, h.open_minute, h.close_minute
+            FROM resource_hours h JOIN resources r ON r.id = h.resource_id
+            WHERE r.name IN ('Food Bank of Kern County', 'Night Pantry', 'Call Pantry')
+            ORDER BY r.name
+            """).fetchall()
+        self.assertEqual(intervals, [('Food Bank of Kern County', 5, 540, 780),
+                                     ('Night Pantry', 0, 1080, 1260)])
+
+    def test_import_geocodes_addresses(self):
+        self.assertIsNotNone(geocode_resources(self.db_path))
+        path = self.write_input('.jsonl', [
+            {'name': 'Delano Pantry', 'address': '1 High St, Delano, CA'},
+            {'name': 'Mobile Pantry', 'address': 'Various locations'}
+        ])
+
+        stats = bulk_import(self.db_path, path, processes=1)
+
+        self.assertEqual(stats['ungeocoded'], 1)
+        with closing(sqlite3.connect(self.db_path)) as conn:
+            matched = conn.execute("""
+            SELECT r.name, g.matched FROM resource_geo g JOIN resources r ON r.id = g.id
+            WHERE r.name IN ('Delano Pantry', 'Mobile Pantry')
+            """).fetchall()
+        self.assertEqual(matched, [('Delano Pantry', 'Delano')])
+
+    def test_jsonl_with_triggers_disabled(self):
+        path = self.write_input('.jsonl', [
+            {'name': 'Pantry A', 'description': 'Free food', 'is_verified': True},
+            'not json',
+            {'name': 'Pantry B', 'description': 'Hot meals'}
+        ])
+
+        stats = bulk_import(self.db_path, path, processes=2, disable_triggers=True)
+
+        self.assertEqual((stats['inserted'], stats['rejected']), (2, 1))
+        with closing(sqlite3.connect(self.db_path)) as conn:
+            self.assertEqual(match_ids(conn, 'meals'), [3, 7])
+            self.assertEqual(conn.execute("SELECT is_verified FROM resources WHERE id = 6").fetchone()[0], 1)
+            triggers = {row[0] for row in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type='trigger' AND name NOT IN ('resources_ci', 'resources_cu', 'resources_cd')")}
+            self.assertEqual(triggers, {'resources_ai', 'resources_au', 'resources_ad'})
+            conn.execute("INSERT INTO resource_fts(resource_fts) VALUES ('integrity-check')")
+
+
+if __name__ == '__main__':
+    unittest.main()
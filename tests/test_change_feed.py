@@ -0,0 +1,99 @@
+"""
+Tests for the resource change log and the /api/changes endpoint.
+"""
+
+import json
+import os
+import sys
+import sqlite3
+import tempfile
+import unittest
+from contextlib import closing
+
+# Add the parent directory to the path so we can import the modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import fts_search_api
+from change_feed import compact_changes
+from setup_fts_index import setup_fts_index
+from fts_test_utils import create_resources_db, remove_db
+
+
+class TestChangeFeed(unittest.TestCase):
+    """Test logging, paging, compaction and expiry of changes."""
+
+    def setUp(self):
+        self.db_path = tempfile.mktemp(suffix='.db')
+        create_resources_db(self.db_path)
+        setup_fts_index(self.db_path)
+        fts_search_api.app.config['TESTING'] = True
+        fts_search_api.app.config['DATABASE_PATH'] = self.db_path
+        self.client = fts_search_api.app.test_client()
+
+        with closing(sqlite3.connect(self.db_path)) as conn:
+            conn.execute("UPDATE resources SET description = 'Dental care' WHERE id = 1")
+            conn.execute("INSERT INTO resources (id, name) VALUES (6, 'Pantry')")
+            conn.execute("UPDATE resources SET description = 'Free food' WHERE id = 6")
+            conn.execute("DELETE FROM resources WHERE id = 2")
+            conn.commit()
+
+    def tearDown(self):
+        fts_search_api.app.config.pop('DATABASE_PATH')
+        remove_db(self.db_path)
+
+    def get_changes(self, since, limit=500):
+        response = self.client.get(f'/api/changes?since={since}&limit={limit}')
+        return response.status_code, json.loads(response.data)
+
+    def test_changes_since(self):
+        status, data = self.get_changes(0)
+
+        self.assertEqual(status, 200)
+        self.assertTrue(data['success'])
+        self.assertEqual([(change['seq'], change['op'], change['id']) for change in data['changes']],
+                         [(1, 'update', 1), (2, 'insert', 6), (3, 'update', 6), (4, 'delete', 2)])
+        self.assertEqual(data['changes'][0]['resource']['description'], 'Dental care')
+        self.assertIsNone(data['changes'][3]['resource'])
+        self.assertEqual((data['next_since'], data['latest_seq'], data['has_more']), (4, 4, False))
+
+    def test_paging(self):
+        _, first = self.get_changes(0, limit=3)
+        self.assertTrue(first['has_more'])
+        self.assertEqual(first['next_since'], 3)
+
+        _, second = self.get_changes(first['next_since'], limit=3)
+        self.assertEqual([change['seq'] for change in second['changes']], [4])
+        self.assertFalse(second['has_more'])
+
+    def test_compaction_keeps_newest_change(self):
+        result = compact_changes(self.db_path, retain_days=30)
+
+        self.assertEqual((result['collapsed'], result['expired'], result['horizon']), (1, 0, 0))
+        _, data = self.get_changes(0)
+        self.assertEqual([change['seq'] for change in data['changes']], [1, 3, 4])
+
+    def test_expired_changes_require_resync(self):
+        with closing(sqlite3.connect(self.db_path)) as conn:
+            conn.execute("UPDATE resource_changes SET changed_at = datetime('now', '-40 days') WHERE seq <= 2")
+            conn.commit()
+
+        # Change 2 is superseded by change 3, so only change 1 expires
+        result = compact_changes(self.db_path, retain_days=30)
+        self.assertEqual((result['expired'], result['horizon']), (1, 1))
+
+        status, data = self.get_changes(0)
+        self.assertEqual(status, 410)
+        self.assertTrue(data['resync_required'])
+        self.assertEqual(data['latest_seq'], 4)
+
+        status, data = self.get_changes(1)
+        self.assertEqual(status, 200)
+        self.assertEqual([change['seq'] for change in data['changes']], [3, 4])
+
+    def test_invalid_since(self):
+        _, data = self.get_changes('abc')
+        self.assertFalse(data['success'])
+
+
+if __name__ == '__main__':
+    unittest.main()
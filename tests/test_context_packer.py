@@ -0,0 +1,92 @@
+"""
+Tests for token-budgeted context packing.
+"""
+
+import os
+import sys
+import unittest
+
+# Add the parent directory to the path so we can import the modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from context_packer import MIN_TRUNCATED_CHARS, estimate_tokens, pack_resources, truncate
+
+RESOURCES = [
+    {
+        'id': 1,
+        'name': 'Community Food Bank',
+        'phone': '661-555-0100',
+        'description': 'Provides emergency food boxes to families in need. ' * 20,
+        'eligibility_criteria': 'Kern County residents with a household income below 200% of the poverty line.',
+        'languages_supported': 'English, Spanish'
+    },
+    {'id': 2, 'name': 'Westside Pantry', 'phone': '661-555-0101', 'cost': 'Free'},
+    {'id': 3, 'name': 'Eastside Pantry', 'phone': '661-555-0102'}
+]
+
+
+class TestTruncate(unittest.TestCase):
+    """Test cutting values at word boundaries."""
+
+    def test_short_value_unchanged(self):
+        self.assertEqual(truncate('free meals', 20), 'free meals')
+
+    def test_cut_at_word_boundary(self):
+        self.assertEqual(truncate('free meals every day', 15), 'free meals...')
+        self.assertLessEqual(len(truncate('free meals every day', 15)), 15)
+
+
+class TestPackResources(unittest.TestCase):
+    """Test packing ranked resources into a budget."""
+
+    def test_large_budget(self):
+        packed = pack_resources(RESOURCES, 10000)
+
+        self.assertEqual(packed.resources, 3)
+        self.assertEqual(packed.omitted, 0)
+        # The long description is still cut to its per-field limit
+        self.assertEqual(packed.truncated, 1)
+        # Lines are estimated one by one, rounding each up
+        self.assertGreaterEqual(packed.used, estimate_tokens(packed.text))
+        self.assertTrue(packed.text.startswith('Resource 1:\nName: Community Food Bank\nPhone: 661-555-0100\n'))
+        self.assertIn('\n\nResource 3:\nName: Eastside Pantry\n', packed.text)
+
+    def test_never_over_budget(self):
+        for budget in range(0, 400, 7):
+            packed = pack_resources(RESOURCES, budget, unit='chars')
+            self.assertLessEqual(len(packed.text), budget)
+            self.assertEqual(packed.used, len(packed.text))
+
+    def test_fields_by_value(self):
+        # With little room, contact details win over the description
+        packed = pack_resources(RESOURCES[:1], 80, unit='chars')
+
+        self.assertIn('Phone: 661-555-0100', packed.text)
+        self.assertNotIn('Description', packed.text)
+        self.assertGreater(packed.omitted, 0)
+
+    def test_field_cut_to_fit(self):
+        packed = pack_resources(RESOURCES[:1], 150, unit='chars')
+        description = [line for line in packed.text.splitlines() if line.startswith('Description: ')]
+
+        self.assertEqual(len(description), 1)
+        self.assertTrue(description[0].endswith('...'))
+        self.assertGreaterEqual(len(description[0]) - len('Description: '), MIN_TRUNCATED_CHARS)
+
+    def test_greedy_in_rank_order(self):
+        packed = pack_resources(RESOURCES, 300, unit='chars')
+
+        self.assertEqual(packed.resources, 1)
+        packed = pack_resources(RESOURCES[1:], 300, unit='chars')
+        self.assertEqual(packed.resources, 2)
+
+    def test_max_resources_and_custom_count(self):
+        words = lambda text: len(text.split())
+        packed = pack_resources(RESOURCES, 1000, count=words, max_resources=2)
+
+        self.assertEqual(packed.resources, 2)
+        self.assertEqual(packed.used, words(packed.text))
+
+
+if __name__ == '__main__':
+    unittest.main()
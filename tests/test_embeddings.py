@@ -1,6 +1,20 @@
 import numpy as np
 import pytest
-from kern_resources.core.embeddings import EmbeddingsHandler
+from kern_resources.core.embeddings import EmbeddingsHandler, HashingEmbeddingsHandler
+
+class RecordingBackend:
+    """Backend returning [len(text), 1, 0, ...] per text and recording its batches."""
+
+    def __init__(self, dimension):
+        self.dimension = dimension
+        self.batches = []
+
+    def encode(self, texts):
+        self.batches.append(list(texts))
+        vectors = np.zeros((len(texts), self.dimension))
+        vectors[:, 0] = [len(text) for text in texts]
+        vectors[:, 1] = 1.0
+        return vectors
 
 def test_embeddings_initialization():
     handler = EmbeddingsHandler()
@@ -8,18 +22,42 @@ def test_embeddings_initialization():
     assert handler.dimension == 384
 
 def test_encode_text():
-    handler = EmbeddingsHandler(dimension=5)
+    handler = EmbeddingsHandler(dimension=5, backend=RecordingBackend(5))
     embedding = handler.encode_text("test text")
     assert isinstance(embedding, np.ndarray)
     assert embedding.shape == (5,)
+    assert embedding.dtype == np.float32
+    assert np.isclose(np.linalg.norm(embedding), 1.0)
 
 def test_batch_encode():
-    handler = EmbeddingsHandler(dimension=3)
+    handler = EmbeddingsHandler(dimension=3, backend=RecordingBackend(3))
     texts = ["first text", "second text", "third text"]
     embeddings = handler.batch_encode(texts)
-    assert len(embeddings) == 3
-    assert all(isinstance(emb, np.ndarray) for emb in embeddings)
-    assert all(emb.shape == (3,) for emb in embeddings)
+    assert embeddings.shape == (3, 3)
+    assert embeddings.dtype == np.float32
+    assert embeddings.flags["C_CONTIGUOUS"]
+    assert np.allclose(np.linalg.norm(embeddings, axis=1), 1.0)
+
+def test_batch_encode_sorts_by_length():
+    backend = RecordingBackend(2)
+    handler = EmbeddingsHandler(dimension=2, batch_size=2, backend=backend)
+    texts = ["bb", "a", "dddd", "ccc", ""]
+    embeddings = handler.batch_encode(texts)
+    assert backend.batches == [["dddd", "ccc"], ["bb", "a"], [""]]
+    # Rows come back in input order
+    expected = np.array([[len(text), 1.0] for text in texts])
+    expected /= np.linalg.norm(expected, axis=1, keepdims=True)
+    assert np.allclose(embeddings, expected)
+
+def test_batch_encode_empty():
+    handler = HashingEmbeddingsHandler(dimension=8)
+    assert handler.batch_encode([]).shape == (0, 8)
+    assert not np.any(handler.encode_text(""))
+
+def test_backend_dimension_mismatch():
+    handler = EmbeddingsHandler(dimension=4, backend=RecordingBackend(3))
+    with pytest.raises(ValueError):
+        handler.batch_encode(["text"])
 
 def test_similarity():
     handler = EmbeddingsHandler()
@@ -31,3 +69,34 @@ def test_similarity():
     assert handler.similarity(emb1, emb2) == 1.0
     # Orthogonal vectors should have similarity 0.0
     assert handler.similarity(emb1, emb3) == 0.0
+
+def test_hashing_encoder_is_deterministic():
+    handler = HashingEmbeddingsHandler(dimension=64)
+    first = handler.encode_text("food pantry")
+    second = HashingEmbeddingsHandler(dimension=64).encode_text("food pantry")
+    assert first.dtype == np.float32
+    assert np.array_equal(first, second)
+    assert np.isclose(np.linalg.norm(first), 1.0)
+
+def test_hashing_encoder_similarity():
+    handler = HashingEmbeddingsHandler(dimension=256)
+    pantry = handler.encode_text("emergency food pantry")
+    food = handler.encode_text("food pantry hours")
+    clinic = handler.encode_text("dental clinic")
+    assert handler.similarity(pantry, food) > handler.similarity(pantry, clinic)
+
+def test_hashing_batch_matches_single():
+    handler = HashingEmbeddingsHandler(dimension=64, batch_size=2)
+    texts = ["food pantry", "dental clinic for seniors", "shelter"]
+    embeddings = handler.batch_encode(texts)
+    for text, embedding in zip(texts, embeddings):
+        assert np.array_equal(embedding, handler.encode_text(text))
+    # Similarity of unit vectors is their dot product
+    assert np.isclose(handler.similarity(embeddings[0], embeddings[0]), 1.0)
+
+def test_sentence_transformer_backend():
+    pytest.importorskip("sentence_transformers")
+    handler = EmbeddingsHandler()
+    embeddings = handler.batch_encode(["food pantry", "food bank", "dental clinic"])
+    assert embeddings.shape == (3, 384)
+    assert handler.similarity(embeddings[0], embeddings[1]) > handler.similarity(embeddings[0], embeddings[2])
@@ -0,0 +1,100 @@
+"""
+Tests for the read-only snapshot export.
+"""
+
+import json
+import os
+import sys
+import sqlite3
+import tempfile
+import unittest
+from contextlib import closing, redirect_stdout
+from io import StringIO
+
+# Add the parent directory to the path so we can import the modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import fts_search_api
+from export_snapshot import export_snapshot, verify_snapshot, manifest_path
+from setup_fts_index import setup_fts_index, fts_table_options
+from fts_test_utils import create_resources_db, remove_db
+
+
+class TestExportSnapshot(unittest.TestCase):
+    """Test exporting, verifying and serving a snapshot."""
+
+    def setUp(self):
+        self.db_path = tempfile.mktemp(suffix='.db')
+        self.snapshot_path = tempfile.mktemp(suffix='.db')
+        create_resources_db(self.db_path)
+        with redirect_stdout(StringIO()):
+            setup_fts_index(self.db_path)
+        with closing(sqlite3.connect(self.db_path)) as conn:
+            conn.execute("INSERT INTO categories (id, name, description) VALUES (1, 'Food', 'Food help')")
+            conn.execute("INSERT INTO resource_categories VALUES (1, 1)")
+            conn.commit()
+
+        with redirect_stdout(StringIO()):
+            self.manifest = export_snapshot(self.db_path, self.snapshot_path, page_size=16384)
+        self.assertIsNotNone(self.manifest)
+
+    def tearDown(self):
+        fts_search_api.app.config.pop('DATABASE_PATH', None)
+        fts_search_api.app.config.pop('SQLITE_IMMUTABLE', None)
+        fts_search_api.app.config.pop('ADMIN_TOKEN', None)
+        remove_db(self.db_path)
+        remove_db(self.snapshot_path)
+        if os.path.exists(manifest_path(self.snapshot_path)):
+            os.remove(manifest_path(self.snapshot_path))
+
+    def test_snapshot_contents(self):
+        with closing(sqlite3.connect(self.snapshot_path)) as conn:
+            self.assertEqual(conn.execute("PRAGMA page_size").fetchone()[0], 16384)
+            self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], 'delete')
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM sqlite_master WHERE type = 'trigger'").fetchone()[0], 0)
+            tables = {row[0] for row in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'resource_fts_%'")}
+            self.assertEqual(tables, {'resources', 'categories', 'resource_categories', 'resource_fts',
+                                      'sqlite_stat1'})
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(resources)")}
+            self.assertNotIn('verification_notes', columns)
+            self.assertIn('hours_of_operation', columns)
+            self.assertEqual(fts_table_options(conn.cursor())['prefix'], '2 3')
+
+            # optimize leaves a single segment
+            structure = conn.execute("SELECT COUNT(*) FROM resource_fts_idx").fetchone()[0]
+            self.assertEqual(structure, 1)
+
+        with open(manifest_path(self.snapshot_path), encoding='utf-8') as f:
+            manifest = json.load(f)
+        self.assertEqual(manifest['tables']['resources'], 5)
+        self.assertEqual(manifest['fts_profile'], 'prefix')
+        self.assertEqual(manifest['bytes'], os.path.getsize(self.snapshot_path))
+
+    def test_verify_detects_changes(self):
+        with redirect_stdout(StringIO()):
+            self.assertTrue(verify_snapshot(self.snapshot_path))
+            with open(self.snapshot_path, 'ab') as f:
+                f.write(b'\0')
+            self.assertFalse(verify_snapshot(self.snapshot_path))
+
+    def test_api_serves_immutable_snapshot(self):
+        fts_search_api.app.config['TESTING'] = True
+        fts_search_api.app.config['DATABASE_PATH'] = self.snapshot_path
+        fts_search_api.app.config['SQLITE_IMMUTABLE'] = True
+        client = fts_search_api.app.test_client()
+
+        data = json.loads(client.get('/api/search?q=food&expand=0').data)
+        self.assertEqual(sorted(resource['id'] for resource in data['resources']), [1, 2, 4])
+        data = json.loads(client.get('/api/resource/1').data)
+        self.assertEqual([category['name'] for category in data['resource']['categories']], ['Food'])
+
+        fts_search_api.app.config['ADMIN_TOKEN'] = 'secret'
+        data = json.loads(client.put('/api/admin/resource/1', json={'name': 'Renamed'},
+                                     headers={'Authorization': 'Bearer secret'}).data)
+        self.assertFalse(data['success'])
+        self.assertFalse(os.path.exists(self.snapshot_path + '-wal'))
+
+
+if __name__ == '__main__':
+    unittest.main()
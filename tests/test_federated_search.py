@@ -0,0 +1,141 @@
+"""
+Tests for federated search across multiple resource databases.
+"""
+
+import os
+import sys
+import json
+import sqlite3
+import time
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import setup_fts_index
+import fts_search_api
+import federated_search
+from federated_search import FederatedSearch, parse_shard_spec
+from fts_test_utils import create_resources_db, remove_db
+
+
+class TestFederatedSearch(unittest.TestCase):
+    """Test searching several shard databases at once."""
+
+    def setUp(self):
+        self.kern_db = 'test_shard_kern.db'
+        self.delano_db = 'test_shard_delano.db'
+        create_resources_db(self.kern_db)
+        create_resources_db(self.delano_db, [
+            (1, "Delano Food Pantry", "Weekly food boxes for families", "1 High St", "Low income", "9-5"),
+            (2, "Delano Youth Center", "After school programs", "2 High St", "Youth", "3-7")
+        ])
+        setup_fts_index.setup_fts_index(self.kern_db)
+        setup_fts_index.setup_fts_index(self.delano_db)
+
+        self.searcher = FederatedSearch({'kern': self.kern_db, 'delano': self.delano_db})
+
+    def tearDown(self):
+        self.searcher.close()
+        remove_db(self.kern_db)
+        remove_db(self.delano_db)
+
+    def test_parse_shard_spec(self):
+        """Shard specs accept name=path entries and bare paths."""
+        shards = parse_shard_spec("kern=a/resources.db, delano.db")
+        self.assertEqual(shards, {'kern': 'a/resources.db', 'delano': 'delano.db'})
+
+    def test_merges_hits_from_all_shards(self):
+        """Hits from every shard are merged in bm25 order and tagged."""
+        result = self.searcher.search('food', limit=10)
+
+        self.assertEqual(result['total'], 4)
+        sources = {resource['source'] for resource in result['resources']}
+        self.assertEqual(sources, {'kern', 'delano'})
+
+        scores = [resource['score'] for resource in result['resources']]
+        self.assertEqual(scores, sorted(scores))
+
+    def test_limit_and_offset_apply_globally(self):
+        """Pagination is applied to the merged list, not per shard."""
+        full = self.searcher.search('food', limit=10)['resources']
+        page = self.searcher.search('food', limit=2, offset=1)['resources']
+        self.assertEqual(
+            [(r['source'], r['id']) for r in page],
+            [(r['source'], r['id']) for r in full[1:3]]
+        )
+
+    def test_failed_shard_is_reported(self):
+        """A missing shard is reported without failing the search."""
+        self.searcher.register('missing', 'does_not_exist.db')
+        result = self.searcher.search('food')
+
+        reports = {report['source']: report for report in result['shards']}
+        self.assertFalse(reports['missing']['success'])
+        self.assertIn('error', reports['missing'])
+        self.assertTrue(reports['kern']['success'])
+        self.assertIn('latency_ms', reports['kern'])
+        self.assertEqual(result['total'], 4)
+
+    def test_timed_out_shards_are_cancelled(self):
+        """Shards still queued at the timeout never run their query."""
+        connects = []
+        original_connect = federated_search.connect
+
+        def counting_connect(db_path):
+            connects.append(db_path)
+            return original_connect(db_path)
+
+        federated_search.connect = counting_connect
+        searcher = FederatedSearch({'kern': self.kern_db, 'delano': self.delano_db},
+                                   max_workers=1, timeout=0.05)
+        blocker = searcher._get_executor().submit(time.sleep, 0.3)
+        try:
+            result = searcher.search('food')
+            blocker.result()
+            # Let anything that was not cancelled run
+            searcher._get_executor().submit(lambda: None).result()
+        finally:
+            searcher.close()
+            federated_search.connect = original_connect
+
+        self.assertEqual(result['total'], 0)
+        self.assertTrue(all('Timed out' in report['error'] for report in result['shards']))
+        self.assertEqual(connects, [])
+
+    def test_running_query_is_aborted(self):
+        """A shard given up on while its query runs stops at the next check."""
+        class GivenUpAfterStart:
+            checks = 0
+
+            def is_set(self):
+                self.checks += 1
+                return self.checks > 1
+
+        # The sample shard is too small to reach the default check interval
+        original_steps = federated_search.CANCEL_CHECK_STEPS
+        federated_search.CANCEL_CHECK_STEPS = 1
+        try:
+            with self.assertRaises(sqlite3.OperationalError):
+                self.searcher._search_shard('kern', self.kern_db, 'food', 10, GivenUpAfterStart())
+        finally:
+            federated_search.CANCEL_CHECK_STEPS = original_steps
+
+    def test_api_federated_mode(self):
+        """The search endpoint exposes federated search through mode=federated."""
+        fts_search_api.app.config['TESTING'] = True
+        fts_search_api.app.config['FEDERATED_SHARDS'] = {'kern': self.kern_db, 'delano': self.delano_db}
+        fts_search_api._federated_search = None
+        try:
+            client = fts_search_api.app.test_client()
+            data = json.loads(client.get('/api/search?q=food&mode=federated').data)
+        finally:
+            fts_search_api.app.config.pop('FEDERATED_SHARDS')
+            fts_search_api._federated_search = None
+
+        self.assertTrue(data['success'])
+        self.assertEqual(data['total'], 4)
+        self.assertEqual(len(data['shards']), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
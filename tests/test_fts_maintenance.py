@@ -0,0 +1,106 @@
+"""
+Tests for incremental FTS5 sync and index maintenance.
+"""
+
+import os
+import sys
+import sqlite3
+import tempfile
+import unittest
+from contextlib import closing
+
+# Add the parent directory to the path so we can import the modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from setup_fts_index import setup_fts_index, drop_triggers, FTS_TRIGGERS
+from fts_maintenance import detect_drift, sync_index, merge_index, optimize_index, index_stats, run_command
+from fts_test_utils import create_resources_db, remove_db
+
+
+def match_ids(conn, query):
+    return sorted(row[0] for row in conn.execute(
+        "SELECT rowid FROM resource_fts WHERE resource_fts MATCH ?", (query,)))
+
+
+class TestFTSMaintenance(unittest.TestCase):
+    """Test drift detection, resync and segment maintenance."""
+
+    def setUp(self):
+        self.db_path = tempfile.mktemp(suffix='.db')
+        create_resources_db(self.db_path)
+        self.assertTrue(setup_fts_index(self.db_path))
+        self.assertIsNotNone(sync_index(self.db_path))
+
+        # Simulate writes that bypassed the triggers
+        with closing(sqlite3.connect(self.db_path)) as conn:
+            drop_triggers(conn.cursor(), FTS_TRIGGERS)
+            conn.execute("""
+            UPDATE resources SET description = 'Dental care for children',
+                                 updated_at = '2999-01-01 00:00:00'
+            WHERE id = 4
+            """)
+            conn.execute("DELETE FROM resources WHERE id = 2")
+            conn.execute("INSERT INTO resources (id, name, description) VALUES (6, 'Pantry', 'Free food')")
+            conn.commit()
+
+    def tearDown(self):
+        remove_db(self.db_path)
+
+    def test_detect_drift(self):
+        with closing(sqlite3.connect(self.db_path)) as conn:
+            drift = detect_drift(conn)
+
+        self.assertEqual(drift['missing'], [6])
+        self.assertEqual(drift['orphaned'], [2])
+        self.assertEqual(drift['changed'], [4])
+
+    def test_sync_fixes_only_drifted_rows(self):
+        result = sync_index(self.db_path)
+
+        self.assertEqual(result['mode'], 'rows')
+        with closing(sqlite3.connect(self.db_path)) as conn:
+            # A stale 'delete' would leave the index inconsistent
+            conn.execute("INSERT INTO resource_fts(resource_fts) VALUES ('integrity-check')")
+            self.assertEqual(match_ids(conn, 'food'), [1, 6])
+            self.assertEqual(match_ids(conn, 'dental'), [4])
+            self.assertEqual(match_ids(conn, 'calworks'), [])
+
+            drift = detect_drift(conn)
+        self.assertEqual((drift['missing'], drift['orphaned'], drift['changed']), ([], [], []))
+
+    def test_sync_falls_back_to_rebuild(self):
+        result = sync_index(self.db_path, max_row_resync=1)
+
+        self.assertEqual(result['mode'], 'rebuild')
+        with closing(sqlite3.connect(self.db_path)) as conn:
+            conn.execute("INSERT INTO resource_fts(resource_fts) VALUES ('integrity-check')")
+            self.assertEqual(match_ids(conn, 'food'), [1, 6])
+
+    def test_merge_and_optimize_reduce_segments(self):
+        with closing(sqlite3.connect(self.db_path)) as conn:
+            # One segment per committed transaction
+            for n in range(10):
+                conn.execute("INSERT INTO resource_fts(rowid, name) VALUES (?, 'extra')", (100 + n,))
+                conn.commit()
+            fragmented = index_stats(conn)['segments']
+
+            merge_index(conn, pages=50)
+            optimize_index(conn)
+            conn.commit()
+            stats = index_stats(conn)
+
+        self.assertGreater(fragmented, 1)
+        self.assertEqual(stats['segments'], 1)
+        self.assertGreater(stats['index_bytes'], 0)
+
+    def test_commands(self):
+        for command in ('check', 'stats', 'merge', 'optimize', 'automerge', 'maintain'):
+            self.assertTrue(run_command(self.db_path, command), command)
+
+        with closing(sqlite3.connect(self.db_path)) as conn:
+            self.assertEqual(match_ids(conn, 'dental'), [4])
+            self.assertEqual(index_stats(conn)['automerge'], 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+"""
+Tests for the FTS5 index profiles.
+"""
+
+import os
+import sys
+import sqlite3
+import tempfile
+import unittest
+from contextlib import closing
+
+# Add the parent directory to the path so we can import the modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from setup_fts_index import (
+    FTS_PROFILES, fts_profile_options, fts_table_options, rebuild_fts_index, setup_fts_index
+)
+from search_queries import search_fts
+from fts_test_utils import create_resources_db, remove_db
+
+
+class TestFTSProfiles(unittest.TestCase):
+    """Test building and searching indexes with each profile."""
+
+    def setUp(self):
+        self.db_path = tempfile.mktemp(suffix='.db')
+        create_resources_db(self.db_path)
+
+    def tearDown(self):
+        remove_db(self.db_path)
+
+    def test_every_profile_searches(self):
+        for profile in FTS_PROFILES:
+            with self.subTest(profile=profile):
+                create_resources_db(self.db_path)
+                self.assertTrue(setup_fts_index(self.db_path, profile))
+                with closing(sqlite3.connect(self.db_path)) as conn:
+                    conn.row_factory = sqlite3.Row
+                    resources, total = search_fts(conn, 'food')
+                    self.assertEqual(total, 3)
+                    self.assertEqual(sorted(resource['id'] for resource in resources), [1, 2, 4])
+
+                    # The sync triggers work with every profile
+                    conn.execute("UPDATE resources SET description = 'Dental care' WHERE id = 4")
+                    conn.commit()
+                    self.assertEqual(search_fts(conn, 'food')[1], 2)
+
+    def test_options(self):
+        self.assertEqual(fts_profile_options('compact'),
+                         {'content': 'resources', 'content_rowid': 'id', 'detail': 'column'})
+        self.assertEqual(fts_profile_options('contentless'), {'content': ''})
+        with self.assertRaises(ValueError):
+            fts_profile_options('fastest')
+
+    def test_rebuild_keeps_or_switches_profile(self):
+        self.assertTrue(setup_fts_index(self.db_path, 'prefix'))
+
+        self.assertIsNotNone(rebuild_fts_index(self.db_path))
+        with closing(sqlite3.connect(self.db_path)) as conn:
+            self.assertEqual(fts_table_options(conn.cursor())['prefix'], '2 3')
+
+        self.assertIsNotNone(rebuild_fts_index(self.db_path, profile='compact'))
+        with closing(sqlite3.connect(self.db_path)) as conn:
+            options = fts_table_options(conn.cursor())
+        self.assertEqual(options.get('detail'), 'column')
+        self.assertNotIn('prefix', options)
+
+
+if __name__ == '__main__':
+    unittest.main()
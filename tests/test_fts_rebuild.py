@@ -0,0 +1,209 @@
+"""
+Tests for the shadow-table FTS5 index rebuild.
+"""
+
+import os
+import sys
+import sqlite3
+import tempfile
+import unittest
+from contextlib import closing
+
+# Add the parent directory to the path so we can import the modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import setup_fts_index
+from setup_fts_index import setup_fts_index as create_index, rebuild_fts_index
+from fts_test_utils import create_resources_db, remove_db
+
+
+def match_ids(conn, query):
+    return sorted(row[0] for row in conn.execute(
+        "SELECT rowid FROM resource_fts WHERE resource_fts MATCH ?", (query,)))
+
+
+class TestFTSRebuild(unittest.TestCase):
+    """Test rebuilding the index alongside the live one."""
+
+    def setUp(self):
+        self.db_path = tempfile.mktemp(suffix='.db')
+        create_resources_db(self.db_path)
+        self.assertTrue(create_index(self.db_path))
+
+    def tearDown(self):
+        remove_db(self.db_path)
+
+    def test_rebuild_swaps_in_complete_index(self):
+        stats = rebuild_fts_index(self.db_path, chunk_size=2)
+
+        self.assertEqual(stats['rows'], 5)
+        self.assertGreater(stats['index_bytes'], 0)
+        with closing(sqlite3.connect(self.db_path)) as conn:
+            self.assertEqual(match_ids(conn, 'food'), [1, 2, 4])
+            tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master")}
+            self.assertNotIn('resource_fts_new', tables)
+            self.assertTrue({'resources_ai', 'resources_au', 'resources_ad'} <= tables)
+            self.assertFalse({'resources_ai_shadow', 'resources_au_shadow'} & tables)
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM fts_build_state").fetchone()[0], 0)
+
+    def test_triggers_keep_rebuilt_index_in_sync(self):
+        rebuild_fts_index(self.db_path)
+
+        with closing(sqlite3.connect(self.db_path)) as conn:
+            conn.execute("UPDATE resources SET description = 'Dental care' WHERE id = 1")
+            conn.execute("DELETE FROM resources WHERE id = 2")
+            conn.execute("INSERT INTO resources (id, name, description) VALUES (6, 'Pantry', 'Free food')")
+            conn.commit()
+
+            self.assertEqual(match_ids(conn, 'food'), [1, 4, 6])
+            self.assertEqual(match_ids(conn, 'dental'), [1])
+            conn.execute("INSERT INTO resource_fts(resource_fts) VALUES ('integrity-check')")
+
+    def test_writes_during_build_reach_new_index(self):
+        original_copy = setup_fts_index.copy_next_chunk
+        writer = sqlite3.connect(self.db_path)
+        calls = []
+
+        def copy_then_write(cursor, table, after_rowid, chunk_size):
+            upper = original_copy(cursor, table, after_rowid, chunk_size)
+            calls.append(upper)
+            if len(calls) == 1:
+                # Simulate another process writing between chunks
+                cursor.execute("COMMIT")
+                writer.execute("UPDATE resources SET description = 'Dental care' WHERE id = 1")
+                writer.execute("UPDATE resources SET description = 'Dental care' WHERE id = 5")
+                writer.execute("INSERT INTO resources (id, name, description) VALUES (9, 'Pantry', 'Free food')")
+                writer.commit()
+                cursor.execute("BEGIN IMMEDIATE")
+            return upper
+
+        setup_fts_index.copy_next_chunk = copy_then_write
+        try:
+            self.assertIsNotNone(rebuild_fts_index(self.db_path, chunk_size=2))
+        finally:
+            setup_fts_index.copy_next_chunk = original_copy
+            writer.close()
+
+        with closing(sqlite3.connect(self.db_path)) as conn:
+            self.assertEqual(match_ids(conn, 'food'), [1, 2, 4, 9])
+            self.assertEqual(match_ids(conn, 'dental'), [1, 5])
+            conn.execute("INSERT INTO resource_fts(resource_fts) VALUES ('integrity-check')")
+
+    def test_row_count_checked_for_every_profile(self):
+        for profile in setup_fts_index.FTS_PROFILES:
+            with self.subTest(profile=profile):
+                with closing(sqlite3.connect(self.db_path)) as conn:
+                    # A delete must lower the count as well
+                    conn.execute("INSERT INTO resources (id, name) VALUES (6, 'Pantry')")
+                    conn.execute("DELETE FROM resources WHERE id = 6")
+                    conn.commit()
+                    self.assertEqual(setup_fts_index.indexed_row_count(conn.cursor()), 5)
+
+                stats = rebuild_fts_index(self.db_path, profile=profile, chunk_size=2)
+                self.assertEqual(stats['rows'], 5)
+
+    def test_rows_copied_during_the_swap_are_counted(self):
+        # Without chunked copying every row goes in inside the swap
+        # transaction, before FTS5 has written out its row total
+        original_populate = setup_fts_index.populate_in_chunks
+        setup_fts_index.populate_in_chunks = lambda cursor, table, last_rowid=0, chunk_size=5000: 0
+        try:
+            stats = rebuild_fts_index(self.db_path, profile='minimal')
+        finally:
+            setup_fts_index.populate_in_chunks = original_populate
+
+        self.assertEqual(stats['rows'], 5)
+
+    def test_failed_rebuild_leaves_live_index(self):
+        with closing(sqlite3.connect(self.db_path)) as conn:
+            # A leftover from an interrupted rebuild is cleared out first
+            setup_fts_index.create_fts_table(conn.cursor(), 'resource_fts_new')
+            conn.commit()
+
+        original_count = setup_fts_index.indexed_row_count
+        setup_fts_index.indexed_row_count = lambda cursor, table='resource_fts': -1
+        try:
+            self.assertIsNone(rebuild_fts_index(self.db_path))
+        finally:
+            setup_fts_index.indexed_row_count = original_count
+
+        with closing(sqlite3.connect(self.db_path)) as conn:
+            self.assertEqual(match_ids(conn, 'food'), [1, 2, 4])
+            triggers = {row[0] for row in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type='trigger' AND name NOT IN ('resources_ci', 'resources_cu', 'resources_cd')")}
+            self.assertEqual(triggers, {'resources_ai', 'resources_au', 'resources_ad'})
+
+
+class TestChunkedSetup(unittest.TestCase):
+    """Test the chunked, resumable initial index build."""
+
+    def setUp(self):
+        self.db_path = tempfile.mktemp(suffix='.db')
+        create_resources_db(self.db_path)
+
+    def tearDown(self):
+        remove_db(self.db_path)
+
+    def interrupted_build(self, chunks):
+        """Run a build that dies after the given number of chunks."""
+        original_copy = setup_fts_index.copy_next_chunk
+        calls = []
+
+        def copy_then_fail(cursor, table, after_rowid, chunk_size):
+            if len(calls) == chunks:
+                raise sqlite3.OperationalError("disk I/O error")
+            calls.append(after_rowid)
+            return original_copy(cursor, table, after_rowid, chunk_size)
+
+        setup_fts_index.copy_next_chunk = copy_then_fail
+        try:
+            self.assertFalse(create_index(self.db_path, chunk_size=2))
+        finally:
+            setup_fts_index.copy_next_chunk = original_copy
+
+    def test_interrupted_build_resumes_from_checkpoint(self):
+        self.interrupted_build(chunks=1)
+
+        with closing(sqlite3.connect(self.db_path)) as conn:
+            self.assertEqual(setup_fts_index.get_build_checkpoint(conn.cursor(), 'resource_fts'), 2)
+            self.assertEqual(match_ids(conn, 'food'), [1, 2])
+
+            # Writes while the build is stopped: one indexed row, one not yet
+            conn.execute("UPDATE resources SET description = 'Dental care' WHERE id = 1")
+            conn.execute("UPDATE resources SET description = 'Dental care' WHERE id = 4")
+            conn.commit()
+
+        original_populate = setup_fts_index.populate_in_chunks
+        starts = []
+
+        def record_start(cursor, table, last_rowid=0, chunk_size=5000):
+            starts.append(last_rowid)
+            return original_populate(cursor, table, last_rowid, chunk_size)
+
+        setup_fts_index.populate_in_chunks = record_start
+        try:
+            self.assertTrue(create_index(self.db_path, chunk_size=2))
+        finally:
+            setup_fts_index.populate_in_chunks = original_populate
+
+        self.assertEqual(starts, [2])
+        with closing(sqlite3.connect(self.db_path)) as conn:
+            conn.execute("INSERT INTO resource_fts(resource_fts) VALUES ('integrity-check')")
+            self.assertEqual(match_ids(conn, 'food'), [1, 2])
+            self.assertEqual(match_ids(conn, 'dental'), [1, 4])
+            self.assertIsNone(setup_fts_index.get_build_checkpoint(conn.cursor(), 'resource_fts'))
+            triggers = {row[0] for row in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type='trigger' AND name NOT IN ('resources_ci', 'resources_cu', 'resources_cd')")}
+            self.assertEqual(triggers, {'resources_ai', 'resources_au', 'resources_ad'})
+
+    def test_restart_discards_partial_build(self):
+        self.interrupted_build(chunks=2)
+
+        self.assertTrue(create_index(self.db_path, chunk_size=2, resume=False))
+
+        with closing(sqlite3.connect(self.db_path)) as conn:
+            self.assertEqual(match_ids(conn, 'food'), [1, 2, 4])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+"""
+Tests for offline geocoding and proximity search.
+"""
+
+import os
+import sys
+import json
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import setup_fts_index
+import fts_search_api
+from geocode_resources import Gazetteer, geocode_resources
+from geo_search import bounding_box, haversine_km, parse_point
+from fts_test_utils import create_resources_db, remove_db
+
+BAKERSFIELD = (35.3733, -119.0187)
+
+RESOURCES = [
+    (1, "Downtown Food Pantry", "Emergency food pantry", "1 Main St, Bakersfield, CA 93301", "Low income", "9-5"),
+    (2, "Delano Food Pantry", "Food pantry and groceries", "2 High St, Delano, CA", "Low income", "9-5"),
+    (3, "Oildale Food Bank", "Food bank for families", "3 North Chester Ave 93308", "Low income", "9-5"),
+    (4, "Bakersfield Clinic", "Medical care", "4 Truxtun Ave, Bakersfield", "Low income", "9-5"),
+    (5, "Mobile Food Pantry", "Food pantry on wheels", "Various locations", "Low income", "9-5")
+]
+
+
+class TestGeoHelpers(unittest.TestCase):
+    """Test the distance and bounding box math."""
+
+    def test_haversine(self):
+        # Bakersfield to Delano is roughly 48 km
+        distance = haversine_km(35.3733, -119.0187, 35.7688, -119.2471)
+        self.assertAlmostEqual(distance, 48.5, delta=2)
+
+    def test_bounding_box_contains_radius(self):
+        min_lat, max_lat, min_lon, max_lon = bounding_box(*BAKERSFIELD, 10)
+        self.assertAlmostEqual(haversine_km(*BAKERSFIELD, max_lat, BAKERSFIELD[1]), 10, delta=0.01)
+        self.assertAlmostEqual(haversine_km(*BAKERSFIELD, BAKERSFIELD[0], max_lon), 10, delta=0.01)
+
+    def test_parse_point(self):
+        self.assertEqual(parse_point("35.1,-119.2"), (35.1, -119.2))
+        with self.assertRaises(ValueError):
+            parse_point("somewhere")
+
+    def test_gazetteer_prefers_zip(self):
+        gazetteer = Gazetteer.load()
+        self.assertEqual(gazetteer.locate("1 Delano Ave 93308")[0], "Oildale 93308")
+        self.assertEqual(gazetteer.locate("5 Main St, California City")[0], "California City")
+        self.assertIsNone(gazetteer.locate("Various locations"))
+
+
+class TestProximitySearch(unittest.TestCase):
+    """Test geocoding a database and searching with near=."""
+
+    def setUp(self):
+        self.db_path = 'test_geo.db'
+        create_resources_db(self.db_path, RESOURCES)
+        setup_fts_index.setup_fts_index(self.db_path)
+        self.report = geocode_resources(self.db_path)
+
+        fts_search_api.app.config['TESTING'] = True
+        fts_search_api.app.config['DATABASE_PATH'] = self.db_path
+        self.client = fts_search_api.app.test_client()
+
+    def tearDown(self):
+        fts_search_api.app.config.pop('DATABASE_PATH')
+        fts_search_api.app.config.pop('ADMIN_TOKEN', None)
+        if fts_search_api._writer is not None:
+            fts_search_api._writer.close()
+            fts_search_api._writer = None
+        remove_db(self.db_path)
+
+    def near_ids(self):
+        response = self.client.get('/api/search?q=food&near=35.3733,-119.0187&radius_km=15')
+        data = json.loads(response.data)
+        self.assertTrue(data['success'])
+        return {r['id'] for r in data['resources']}
+
+    def put_address(self, resource_id, address):
+        fts_search_api.app.config['ADMIN_TOKEN'] = 'secret'
+        response = self.client.put(f'/api/admin/resource/{resource_id}', json={'address': address},
+                                   headers={'Authorization': 'Bearer secret'})
+        data = json.loads(response.data)
+        self.assertTrue(data['success'])
+        return data
+
+    def test_unmatched_addresses_are_reported(self):
+        self.assertEqual(self.report['geocoded'], 4)
+        self.assertEqual(self.report['unmatched'], [(5, "Various locations")])
+
+    def test_near_filters_by_radius(self):
+        data = json.loads(self.client.get('/api/search?q=food&near=35.3733,-119.0187&radius_km=15').data)
+
+        self.assertTrue(data['success'])
+        self.assertEqual({r['id'] for r in data['resources']}, {1, 3})
+        self.assertEqual(data['resources'][0]['id'], 1)
+        self.assertAlmostEqual(data['resources'][0]['distance_km'], 0.0, delta=0.01)
+        self.assertEqual(data['near']['radius_km'], 15.0)
+
+    def test_wider_radius_includes_more(self):
+        data = json.loads(self.client.get('/api/search?q=food&near=35.3733,-119.0187&radius_km=60').data)
+        self.assertEqual(data['total'], 3)
+
+    def test_admin_update_geocodes_address(self):
+        self.assertNotIn('warning', self.put_address(5, "5 Chester Ave, Bakersfield"))
+        self.assertEqual(self.near_ids(), {1, 3, 5})
+
+        # An address that matches no place drops the old coordinates and says so
+        self.assertIn('near=', self.put_address(1, "Call for location")['warning'])
+        self.assertEqual(self.near_ids(), {3, 5})
+
+    def test_invalid_point(self):
+        data = json.loads(self.client.get('/api/search?q=food&near=here').data)
+        self.assertFalse(data['success'])
+
+    def test_near_rejected_in_merged_modes(self):
+        for mode in ('hybrid', 'federated'):
+            data = json.loads(self.client.get(f'/api/search?q=food&near=35.3733,-119.0187&mode={mode}').data)
+            self.assertFalse(data['success'])
+            self.assertIn(f'mode={mode}', data['error'])
+
+
+if __name__ == '__main__':
+    unittest.main()
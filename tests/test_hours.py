@@ -0,0 +1,158 @@
+"""
+Tests for hours_of_operation parsing and open_at filtering.
+"""
+
+import os
+import sys
+import json
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import setup_fts_index
+import fts_search_api
+from hours_parser import parse_hours, parse_open_at, HoursParseError
+from index_hours import index_hours
+from precompute_embeddings import precompute_embeddings
+from kern_resources.core.embeddings import HashingEmbeddingsHandler
+from fts_test_utils import create_resources_db, remove_db
+
+RESOURCES = [
+    (1, "Morning Food Pantry", "Food pantry", "1 Main St", "Low income", "Mon–Fri 8:30am–3:30pm (closed 12–1pm)"),
+    (2, "Weekend Food Bank", "Food bank", "2 Main St", "Low income", "Sat-Sun 10am-2pm"),
+    (3, "Night Food Shelter", "Food and shelter", "3 Main St", "Homeless", "24/7"),
+    (4, "Late Food Van", "Food van", "4 Main St", "Low income", "Fri 9pm-2am"),
+    (5, "Appointment Food Help", "Food help", "5 Main St", "Low income", "By appointment only")
+]
+
+ENCODER = 'kern_resources.core.embeddings:HashingEmbeddingsHandler'
+
+
+class TestParseHours(unittest.TestCase):
+    """Test turning hours strings into intervals."""
+
+    def test_weekdays_with_lunch_closure(self):
+        intervals = parse_hours("Mon–Fri 8:30am–3:30pm (closed 12–1pm)")
+        self.assertEqual(len(intervals), 10)
+        self.assertIn((0, 510, 720), intervals)
+        self.assertIn((4, 780, 930), intervals)
+
+    def test_bare_range_means_weekday_business_hours(self):
+        self.assertEqual(parse_hours("9-5")[0], (0, 540, 1020))
+        self.assertEqual(len(parse_hours("9-5")), 5)
+
+    def test_always_open(self):
+        self.assertEqual(parse_hours("Open 24 hours"), [(day, 0, 1440) for day in range(7)])
+
+    def test_overnight_spills_into_next_day(self):
+        self.assertEqual(parse_hours("Fri 9pm-2am"), [(4, 1260, 1440), (5, 0, 120)])
+
+    def test_day_lists_and_segments(self):
+        intervals = parse_hours("Mon, Wed 9am-12pm; Sat 10-2")
+        self.assertEqual(intervals, [(0, 540, 720), (2, 540, 720), (5, 600, 840)])
+
+    def test_unparseable(self):
+        with self.assertRaises(HoursParseError):
+            parse_hours("By appointment only")
+
+    def test_parse_open_at(self):
+        self.assertEqual(parse_open_at("2025-03-10T14:30"), (0, 870))
+        self.assertEqual(parse_open_at("sat 11am"), (5, 660))
+        with self.assertRaises(HoursParseError):
+            parse_open_at("sometime")
+
+
+class TestOpenAtSearch(unittest.TestCase):
+    """Test indexing hours and filtering searches with open_at."""
+
+    def setUp(self):
+        self.db_path = 'test_hours.db'
+        create_resources_db(self.db_path, RESOURCES)
+        setup_fts_index.setup_fts_index(self.db_path)
+        self.report = index_hours(self.db_path)
+
+        fts_search_api.app.config['TESTING'] = True
+        fts_search_api.app.config['DATABASE_PATH'] = self.db_path
+        self.client = fts_search_api.app.test_client()
+
+    def tearDown(self):
+        fts_search_api.app.config.pop('DATABASE_PATH')
+        fts_search_api.app.config.pop('ADMIN_TOKEN', None)
+        if fts_search_api._writer is not None:
+            fts_search_api._writer.close()
+            fts_search_api._writer = None
+        remove_db(self.db_path)
+
+    def search_ids(self, open_at, mode=None):
+        url = f'/api/search?q=food&open_at={open_at}'
+        if mode:
+            url += f'&mode={mode}'
+        data = json.loads(self.client.get(url).data)
+        self.assertTrue(data['success'])
+        return {resource['id'] for resource in data['resources']}
+
+    def test_failures_are_reported(self):
+        self.assertEqual(self.report['parsed'], 4)
+        self.assertEqual([failure[0] for failure in self.report['failures']], [5])
+
+    def test_open_at_filters(self):
+        self.assertEqual(self.search_ids('mon 9:00'), {1, 3})
+        self.assertEqual(self.search_ids('mon 12:30'), {3})
+        self.assertEqual(self.search_ids('sat 11:00'), {2, 3})
+        self.assertEqual(self.search_ids('sat 1:00am'), {3, 4})
+
+    def test_open_at_filters_hybrid(self):
+        precompute_embeddings(self.db_path, ENCODER, {'dimension': 64}, processes=1)
+        fts_search_api.app.config['EMBEDDINGS_HANDLER'] = HashingEmbeddingsHandler(dimension=64)
+        fts_search_api._vector_indexes.clear()
+        try:
+            # The semantic ranking would match every resource without the filter
+            self.assertEqual(self.search_ids('mon 12:30', 'hybrid'), {3})
+            self.assertEqual(self.search_ids('sat 1:00am', 'hybrid'), {3, 4})
+        finally:
+            fts_search_api.app.config.pop('EMBEDDINGS_HANDLER')
+            fts_search_api._vector_indexes.clear()
+
+    def test_open_at_filters_federated(self):
+        fts_search_api.app.config['FEDERATED_SHARDS'] = {'kern': self.db_path}
+        fts_search_api._federated_search = None
+        try:
+            self.assertEqual(self.search_ids('mon 12:30', 'federated'), {3})
+            self.assertEqual(self.search_ids('sat 11:00', 'federated'), {2, 3})
+        finally:
+            fts_search_api.app.config.pop('FEDERATED_SHARDS')
+            fts_search_api._federated_search = None
+
+    def test_bad_open_at_in_merged_modes(self):
+        for mode in ('hybrid', 'federated'):
+            response = self.client.get(f'/api/search?q=food&open_at=sometime&mode={mode}')
+            data = json.loads(response.data)
+            self.assertFalse(data['success'])
+
+    def put_hours(self, resource_id, hours):
+        fts_search_api.app.config['ADMIN_TOKEN'] = 'secret'
+        response = self.client.put(f'/api/admin/resource/{resource_id}',
+                                   json={'hours_of_operation': hours},
+                                   headers={'Authorization': 'Bearer secret'})
+        data = json.loads(response.data)
+        self.assertTrue(data['success'])
+        return data
+
+    def test_admin_update_reindexes_hours(self):
+        self.assertNotIn('warning', self.put_hours(2, 'Mon 12pm-1pm'))
+        self.assertEqual(self.search_ids('mon 12:30'), {2, 3})
+        self.assertEqual(self.search_ids('sat 11:00'), {3})
+
+        # Unparseable hours drop the old intervals and say so
+        self.assertIn('warning', self.put_hours(3, 'Call for hours'))
+        self.assertEqual(self.search_ids('mon 12:30'), {2})
+
+    def test_open_now(self):
+        data = json.loads(self.client.get('/api/search?q=food&open_now=1').data)
+        self.assertTrue(data['success'])
+        self.assertIn(3, {resource['id'] for resource in data['resources']})
+        self.assertIn('open_at', data)
+
+
+if __name__ == '__main__':
+    unittest.main()
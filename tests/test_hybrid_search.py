@@ -0,0 +1,123 @@
+"""
+Tests for hybrid lexical + semantic search.
+"""
+
+import os
+import sys
+import json
+import unittest
+import sqlite3
+from contextlib import closing
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import setup_fts_index
+import fts_search_api
+from hybrid_search import ResourceVectorIndex, reciprocal_rank_fusion
+from precompute_embeddings import precompute_embeddings
+from kern_resources.core.embeddings import HashingEmbeddingsHandler
+from fts_test_utils import create_resources_db, remove_db
+
+ENCODER = 'kern_resources.core.embeddings:HashingEmbeddingsHandler'
+
+
+class TestReciprocalRankFusion(unittest.TestCase):
+    """Test the rank fusion itself."""
+
+    def test_items_in_both_rankings_win(self):
+        fused = reciprocal_rank_fusion([[1, 2, 3], [3, 1, 4]])
+        ids = [resource_id for resource_id, _ in fused]
+        self.assertEqual(ids[:2], [1, 3])
+        self.assertEqual(set(ids), {1, 2, 3, 4})
+
+    def test_empty_rankings(self):
+        self.assertEqual(reciprocal_rank_fusion([[], []]), [])
+
+
+class TestHybridSearch(unittest.TestCase):
+    """Test the vector index and the hybrid search mode."""
+
+    def setUp(self):
+        self.db_path = 'test_hybrid.db'
+        create_resources_db(self.db_path)
+        setup_fts_index.setup_fts_index(self.db_path)
+        self.handler = HashingEmbeddingsHandler(dimension=256)
+        precompute_embeddings(self.db_path, ENCODER, {'dimension': 256}, processes=1)
+
+        fts_search_api.app.config['TESTING'] = True
+        fts_search_api.app.config['DATABASE_PATH'] = self.db_path
+        fts_search_api.app.config['EMBEDDINGS_HANDLER'] = self.handler
+        fts_search_api._vector_indexes.clear()
+        self.client = fts_search_api.app.test_client()
+
+    def tearDown(self):
+        fts_search_api.app.config.pop('DATABASE_PATH')
+        fts_search_api.app.config.pop('EMBEDDINGS_HANDLER')
+        fts_search_api._vector_indexes.clear()
+        remove_db(self.db_path)
+
+    def test_index_is_contiguous_float32(self):
+        with closing(sqlite3.connect(self.db_path)) as conn:
+            index = ResourceVectorIndex.load(conn, self.handler)
+
+        self.assertEqual(len(index), 5)
+        self.assertEqual(index.matrix.dtype, np.float32)
+        self.assertTrue(index.matrix.flags['C_CONTIGUOUS'])
+        self.assertEqual(index.matrix.shape, (5, 256))
+
+    def test_index_search_ranks_by_similarity(self):
+        with closing(sqlite3.connect(self.db_path)) as conn:
+            index = ResourceVectorIndex.load(conn, self.handler)
+
+        results = index.search(self.handler.encode_text("medical services clinic"), k=2)
+        self.assertEqual(results[0][0], 5)
+        self.assertEqual(len(results), 2)
+
+    def test_hybrid_finds_resources_without_lexical_match(self):
+        """Queries that are not valid FTS5 syntax still get semantic hits."""
+        response = self.client.get("/api/search?q=I can't find meals&mode=hybrid")
+        data = json.loads(response.data)
+
+        self.assertTrue(data['success'])
+        self.assertEqual(data['mode'], 'hybrid')
+        self.assertEqual(data['resources'][0]['id'], 3)
+        self.assertIn('rrf_score', data['resources'][0])
+
+    def test_hybrid_combines_rankings(self):
+        data = json.loads(self.client.get('/api/search?q=food&mode=hybrid&limit=3').data)
+
+        self.assertTrue(data['success'])
+        self.assertEqual(len(data['resources']), 3)
+        scores = [resource['rrf_score'] for resource in data['resources']]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+
+    def test_encoded_index_matches_precomputed(self):
+        with closing(sqlite3.connect(self.db_path)) as conn:
+            loaded = ResourceVectorIndex.load(conn, self.handler)
+            encoded = ResourceVectorIndex.encode(conn, self.handler)
+
+        self.assertEqual(list(encoded.ids), list(loaded.ids))
+        np.testing.assert_allclose(encoded.matrix, loaded.matrix, atol=1e-6)
+
+    def test_falls_back_to_fts_without_vectors(self):
+        """Nothing is encoded in the request when no vectors are stored."""
+        with closing(sqlite3.connect(self.db_path)) as conn:
+            conn.execute("DELETE FROM resource_embeddings")
+            conn.commit()
+
+        data = json.loads(self.client.get('/api/search?q=food&mode=hybrid').data)
+        self.assertTrue(data['success'])
+        self.assertIn('precompute_embeddings.py', data['warning'])
+        self.assertEqual(sorted(resource['id'] for resource in data['resources']), [1, 2, 4])
+
+        # The cached empty index is replaced once vectors are stored
+        precompute_embeddings(self.db_path, ENCODER, {'dimension': 256}, processes=1)
+        data = json.loads(self.client.get('/api/search?q=food&mode=hybrid').data)
+        self.assertNotIn('warning', data)
+        self.assertEqual(len(data['resources']), 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+"""
+Tests for the intent matcher.
+"""
+
+import os
+import sys
+import unittest
+
+# Add the parent directory to the path so we can import the modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from intent_matcher import IntentHit, IntentMatcher
+
+TAXONOMY = {
+    'food': {'search': 'food', 'phrases': ['food', 'food bank', 'hungry']},
+    'housing': {'search': 'housing', 'phrases': ['rent', 'rent help', 'place to stay']},
+    'medical': {'search': 'medical', 'phrases': ['doctor']},
+    'transportation': {'search': 'transportation', 'phrases': ['ride to the doctor', 'bus']}
+}
+
+
+class TestIntentMatcher(unittest.TestCase):
+    """Test phrase matching over a small taxonomy."""
+
+    def setUp(self):
+        self.matcher = IntentMatcher(TAXONOMY)
+
+    def test_positions(self):
+        text = 'Where is the Food Bank?'
+        hits = self.matcher.match(text)
+
+        self.assertEqual(hits, [IntentHit('food', 'food', 13, 17), IntentHit('food', 'food bank', 13, 22)])
+        self.assertEqual(text[13:22], 'Food Bank')
+
+    def test_overlapping_phrases(self):
+        # "doctor" inside the longer transportation phrase is reported too
+        self.assertEqual(self.matcher.categories_in('I need a ride to the doctor'),
+                         ['transportation', 'medical'])
+
+    def test_whole_words_only(self):
+        self.assertEqual(self.matcher.match('parental foodie rented a busy place'), [])
+
+    def test_partial_phrase(self):
+        # A prefix that fails part way must not hide a phrase starting inside it
+        self.assertEqual(self.matcher.categories_in('a place to rent'), ['housing'])
+
+    def test_order_of_first_mention(self):
+        self.assertEqual(self.matcher.search_terms('need rent help, and I am hungry. Also rent.'),
+                         ['housing', 'food'])
+
+    def test_counts(self):
+        self.assertEqual(self.matcher.phrase_count, 9)
+        self.assertEqual(self.matcher.max_phrase_tokens, 4)
+
+
+class TestDefaultTaxonomy(unittest.TestCase):
+    """Test the shipped intents.json."""
+
+    def test_demo_queries(self):
+        matcher = IntentMatcher.from_file()
+
+        self.assertEqual(matcher.search_terms("I'm hungry and need rent help"), ['food', 'housing'])
+        self.assertEqual(matcher.search_terms('Where can I see a doctor for free?'), ['medical'])
+        self.assertEqual(matcher.search_terms('nothing relevant here'), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+"""
+Tests for the incremental resource embedding precompute job.
+"""
+
+import os
+import sys
+import unittest
+import sqlite3
+from contextlib import closing, redirect_stdout
+from io import StringIO
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from precompute_embeddings import precompute_embeddings
+from hybrid_search import ResourceVectorIndex
+from kern_resources.core.embeddings import HashingEmbeddingsHandler
+from fts_test_utils import create_resources_db, remove_db
+
+ENCODER = 'kern_resources.core.embeddings:HashingEmbeddingsHandler'
+
+
+class TestPrecomputeEmbeddings(unittest.TestCase):
+    """Test encoding, storage and incremental re-encoding."""
+
+    def setUp(self):
+        self.db_path = 'test_embeddings.db'
+        create_resources_db(self.db_path)
+
+    def tearDown(self):
+        remove_db(self.db_path)
+
+    def run_job(self, processes=1):
+        return precompute_embeddings(self.db_path, ENCODER, {'dimension': 32},
+                                     batch_size=2, processes=processes)
+
+    def test_encodes_all_resources(self):
+        stats = self.run_job()
+        self.assertEqual(stats['encoded'], 5)
+        self.assertEqual(stats['model_version'], 'hashing-v1')
+
+        with closing(sqlite3.connect(self.db_path)) as conn:
+            rows = conn.execute("SELECT dimension, vector FROM resource_embeddings").fetchall()
+        self.assertEqual(len(rows), 5)
+        for dimension, blob in rows:
+            self.assertEqual(dimension, 32)
+            self.assertEqual(np.frombuffer(blob, dtype=np.float32).shape, (32,))
+
+    def test_only_changed_rows_are_reencoded(self):
+        self.run_job()
+        self.assertEqual(self.run_job()['encoded'], 0)
+
+        with closing(sqlite3.connect(self.db_path)) as conn:
+            conn.execute("UPDATE resources SET description = 'Hot meals daily' WHERE id = 3")
+            conn.execute("DELETE FROM resources WHERE id = 5")
+            conn.commit()
+
+        stats = self.run_job()
+        self.assertEqual(stats['encoded'], 1)
+        self.assertEqual(stats['removed'], 1)
+
+    def test_dimension_change_reencodes(self):
+        self.run_job()
+        stats = precompute_embeddings(self.db_path, ENCODER, {'dimension': 64}, processes=1)
+        self.assertEqual(stats['encoded'], 5)
+
+        with closing(sqlite3.connect(self.db_path)) as conn:
+            index = ResourceVectorIndex.load(conn, HashingEmbeddingsHandler(dimension=64))
+        self.assertEqual(index.matrix.shape, (5, 64))
+
+    def test_mismatched_vectors_are_skipped(self):
+        self.run_job()
+        with closing(sqlite3.connect(self.db_path)) as conn:
+            # A row whose blob doesn't match its recorded dimension
+            conn.execute("UPDATE resource_embeddings SET vector = ? WHERE resource_id = 2",
+                         (np.zeros(16, dtype=np.float32).tobytes(),))
+            conn.commit()
+            with redirect_stdout(StringIO()):
+                index = ResourceVectorIndex.load(conn, HashingEmbeddingsHandler(dimension=32))
+
+        self.assertEqual(list(index.ids), [1, 3, 4, 5])
+
+    def test_parallel_run_matches_serial_run(self):
+        self.run_job(processes=2)
+        with closing(sqlite3.connect(self.db_path)) as conn:
+            index = ResourceVectorIndex.load(conn, HashingEmbeddingsHandler(dimension=32))
+
+        expected = HashingEmbeddingsHandler(dimension=32)
+        self.assertEqual(list(index.ids), [1, 2, 3, 4, 5])
+        self.assertEqual(index.search(expected.encode_text("medical services"), k=1)[0][0], 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
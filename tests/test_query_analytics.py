@@ -0,0 +1,151 @@
+"""
+Tests for query analytics and cache warming.
+"""
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+# Add the parent directory to the path so we can import the modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import fts_search_api
+from query_analytics import (QueryLog, collapse_whitespace, normalize_query, read_history,
+                             summarize, top_queries)
+from setup_fts_index import setup_fts_index
+from fts_test_utils import create_resources_db, remove_db
+
+
+class TestQueryLog(unittest.TestCase):
+    """Test recording, flushing and summarizing queries."""
+
+    def setUp(self):
+        self.path = tempfile.mktemp(suffix='.jsonl')
+
+    def tearDown(self):
+        for path in (self.path, self.path + '.1', self.path + '.lock'):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def test_ring_buffer_is_bounded(self):
+        log = QueryLog(capacity=3)
+        for n in range(5):
+            log.record(f"Query  {n}", 1.0, n)
+
+        self.assertEqual([entry['query'] for entry in log.entries()], ['query 2', 'query 3', 'query 4'])
+        self.assertEqual(log.stats()['recorded'], 5)
+
+    def test_sampling(self):
+        log = QueryLog(sample_rate=0.0)
+        log.record('food', 1.0, 3)
+
+        self.assertEqual(log.entries(), [])
+        self.assertEqual(log.stats()['skipped'], 1)
+
+    def test_flush_and_rotate(self):
+        log = QueryLog(self.path, flush_interval=0, max_file_bytes=200)
+        for n in range(3):
+            log.record('food bank', 2.0, 2)
+        log.record('shelter', 4.0, 0)
+
+        # The file passed 200 bytes, so the next flush rotates it first
+        self.assertTrue(os.path.exists(self.path + '.1'))
+        self.assertEqual([entry['query'] for entry in read_history(self.path)],
+                         ['food bank'] * 3 + ['shelter'])
+        self.assertEqual(log.flush(), 0)
+
+    def test_summarize(self):
+        entries = [{'query': 'food', 'ms': ms, 'hits': 3, 'mode': 'fts'} for ms in (1.0, 2.0, 9.0)]
+        entries += [{'query': 'shelter', 'ms': 5.0, 'hits': 0, 'mode': 'fts'},
+                    {'query': 'rent help', 'ms': 5.0, 'hits': 1, 'mode': 'hybrid'}]
+
+        summary = summarize(entries, limit=2)
+        self.assertEqual([item['query'] for item in summary], ['food', 'rent help'])
+        self.assertEqual((summary[0]['count'], summary[0]['avg_ms'], summary[0]['p95_ms']), (3, 4.0, 2.0))
+        self.assertEqual(summarize(entries)[2]['zero_hits'], 1)
+        self.assertEqual(top_queries(entries), ['food', 'shelter'])
+        self.assertEqual(normalize_query('  Food   BANK '), 'food bank')
+        self.assertEqual(collapse_whitespace('  Food   BANK '), 'Food BANK')
+
+    def test_top_queries_keep_the_searched_spelling(self):
+        log = QueryLog()
+        for query in ('Food Bank', 'food  bank', 'Food Bank', 'food OR shelter'):
+            log.record(query, 1.0, 1)
+
+        self.assertEqual(top_queries(log.entries()), ['Food Bank', 'food OR shelter'])
+
+
+class TestSearchAnalytics(unittest.TestCase):
+    """Test recording searches in the API and warming from the history."""
+
+    def setUp(self):
+        self.db_path = tempfile.mktemp(suffix='.db')
+        self.log_path = tempfile.mktemp(suffix='.jsonl')
+        self.cache_path = tempfile.mktemp(suffix='.db')
+        create_resources_db(self.db_path)
+        with redirect_stdout(StringIO()):
+            setup_fts_index(self.db_path)
+        fts_search_api.app.config['TESTING'] = True
+        fts_search_api.app.config['DATABASE_PATH'] = self.db_path
+        fts_search_api.app.config['QUERY_LOG_PATH'] = self.log_path
+        fts_search_api.app.config['ADMIN_TOKEN'] = 'secret'
+        fts_search_api._query_log = None
+        self.client = fts_search_api.app.test_client()
+
+    def tearDown(self):
+        for key in ('DATABASE_PATH', 'QUERY_LOG_PATH', 'SHARED_CACHE_PATH', 'ADMIN_TOKEN'):
+            fts_search_api.app.config.pop(key, None)
+        fts_search_api._query_log = None
+        fts_search_api._shared_cache = None
+        remove_db(self.db_path)
+        remove_db(self.cache_path)
+        for path in (self.log_path, self.log_path + '.lock'):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def test_top_queries_view(self):
+        for query in ('food', 'Food', 'shelter', 'zzz'):
+            self.client.get(f'/api/search?q={query}&expand=0')
+
+        # Raw search text is only shown with the admin token
+        self.assertEqual(self.client.get('/api/admin/top-queries').status_code, 401)
+        response = self.client.get('/api/admin/top-queries', headers={'Authorization': 'Bearer secret'})
+        data = json.loads(response.data)
+        self.assertEqual(data['source'], 'history')
+        self.assertEqual(data['entries'], 4)
+        food = data['queries'][0]
+        self.assertEqual((food['query'], food['count'], food['avg_hits']), ('food', 2, 3))
+        self.assertEqual([item['zero_hits'] for item in data['queries'] if item['query'] == 'zzz'], [1])
+
+    def test_warm_caches(self):
+        with open(self.log_path, 'w', encoding='utf-8') as f:
+            for query in ('food', 'food', 'shelter'):
+                f.write(json.dumps({'query': query, 'mode': 'fts', 'ms': 1.0, 'hits': 1}) + '\n')
+        fts_search_api.app.config['SHARED_CACHE_PATH'] = self.cache_path
+
+        with redirect_stdout(StringIO()):
+            self.assertEqual(fts_search_api.warm_caches(), 2)
+
+        # The first real search for a warmed query is a cache hit
+        self.client.get('/api/search?q=food')
+        self.assertEqual(fts_search_api.get_shared_cache().stats()['hits'], 1)
+
+    def test_warm_caches_replays_the_searched_query(self):
+        for _ in range(2):
+            self.client.get('/api/search?q=Food  Bank')
+        fts_search_api.get_query_log().flush()
+        fts_search_api.app.config['SHARED_CACHE_PATH'] = self.cache_path
+
+        with redirect_stdout(StringIO()):
+            self.assertEqual(fts_search_api.warm_caches(), 1)
+
+        self.client.get('/api/search?q=Food Bank')
+        self.assertEqual(fts_search_api.get_shared_cache().stats()['hits'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
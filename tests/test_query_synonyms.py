@@ -0,0 +1,135 @@
+"""
+Tests for synonym expansion of search queries.
+"""
+
+import os
+import sys
+import json
+import sqlite3
+import time
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import setup_fts_index
+import fts_search_api
+from query_synonyms import SynonymExpander
+from fts_test_utils import create_resources_db, remove_db
+
+
+class TestSynonymExpander(unittest.TestCase):
+    """Test compiling queries with a synonym table."""
+
+    def setUp(self):
+        self.path = 'test_synonyms.json'
+        self.write_table([
+            ["calfresh", "food stamps", "ebt", "snap"],
+            ["calworks", "welfare", "cash aid"]
+        ])
+        self.expander = SynonymExpander(self.path, reload_interval=0)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def write_table(self, groups):
+        with open(self.path, 'w') as f:
+            json.dump(groups, f)
+
+    def test_expands_multiword_phrases(self):
+        self.assertEqual(
+            self.expander.compile("Food Stamps"),
+            '("food stamps" OR "calfresh" OR "ebt" OR "snap")'
+        )
+
+    def test_unknown_terms_are_quoted(self):
+        self.assertEqual(self.expander.compile("can't pay welfare"),
+                         '"can" AND "t" AND "pay" AND ("welfare" OR "calworks" OR "cash aid")')
+
+    def test_fts_syntax_is_left_alone(self):
+        for query in ('name:food', '"food bank"', 'food OR housing', 'foo*'):
+            self.assertEqual(self.expander.compile(query), query)
+
+    def test_expansion_is_capped(self):
+        expander = SynonymExpander(self.path, max_alternatives=2, max_expansions=1)
+        self.assertEqual(expander.compile("ebt welfare"), '("ebt" OR "calfresh") AND "welfare"')
+
+    def test_hot_reload(self):
+        self.assertEqual(self.expander.compile("snap"), '("snap" OR "calfresh" OR "food stamps" OR "ebt")')
+
+        self.write_table([["snap", "wic"]])
+        # Make sure the modification time moves even on coarse filesystems
+        stamp = time.time() + 10
+        os.utime(self.path, (stamp, stamp))
+
+        self.assertEqual(self.expander.compile("snap"), '("snap" OR "wic")')
+
+    def test_terms_without_phrases(self):
+        self.assertEqual(self.expander.compile("food stamps help", phrases=False),
+                         '(("food" AND "stamps") OR "calfresh" OR "ebt" OR "snap") AND "help"')
+
+    def test_multiword_queries_run_in_fts5(self):
+        db_path = 'test_synonym_compile.db'
+        create_resources_db(db_path)
+        try:
+            with redirect_stdout(StringIO()):
+                setup_fts_index.setup_fts_index(db_path)
+            conn = sqlite3.connect(db_path)
+            try:
+                for query, expected in [("welfare food", [4]), ("food stamps help", []),
+                                        ("food assistance", [1, 4]), ("can't pay welfare", [])]:
+                    rows = conn.execute("SELECT rowid FROM resource_fts WHERE resource_fts MATCH ? ORDER BY rowid",
+                                        (self.expander.compile(query),)).fetchall()
+                    self.assertEqual([row[0] for row in rows], expected, query)
+            finally:
+                conn.close()
+        finally:
+            remove_db(db_path)
+
+
+class TestSearchWithSynonyms(unittest.TestCase):
+    """Test synonym expansion through the search endpoint."""
+
+    def setUp(self):
+        self.db_path = 'test_synonym_search.db'
+        create_resources_db(self.db_path)
+        setup_fts_index.setup_fts_index(self.db_path)
+        fts_search_api.app.config['TESTING'] = True
+        fts_search_api.app.config['DATABASE_PATH'] = self.db_path
+        self.client = fts_search_api.app.test_client()
+
+    def tearDown(self):
+        fts_search_api.app.config.pop('DATABASE_PATH')
+        remove_db(self.db_path)
+
+    def test_synonyms_find_resources(self):
+        data = json.loads(self.client.get('/api/search?q=welfare').data)
+        self.assertTrue(data['success'])
+        self.assertEqual([r['id'] for r in data['resources']], [4])
+
+    def test_multiword_queries(self):
+        for query in ('dental care', 'food stamps help', 'welfare food'):
+            data = json.loads(self.client.get('/api/search', query_string={'q': query}).data)
+            self.assertTrue(data['success'], data.get('error'))
+        data = json.loads(self.client.get('/api/search', query_string={'q': 'welfare food'}).data)
+        self.assertEqual([r['id'] for r in data['resources']], [4])
+
+    def test_index_without_positions(self):
+        """Multi-word synonyms must not become phrases on detail=column indexes."""
+        with redirect_stdout(StringIO()):
+            setup_fts_index.rebuild_fts_index(self.db_path, profile='compact')
+
+        data = json.loads(self.client.get('/api/search', query_string={'q': 'snap'}).data)
+        self.assertTrue(data['success'], data.get('error'))
+        self.assertNotIn('"food stamps"', data['match_query'])
+        self.assertEqual([r['id'] for r in data['resources']], [4])
+
+    def test_expansion_can_be_disabled(self):
+        data = json.loads(self.client.get('/api/search?q=welfare&expand=0').data)
+        self.assertTrue(data['success'])
+        self.assertEqual(data['resources'], [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+"""
+Tests for single-flight coalescing of identical concurrent searches.
+"""
+
+import os
+import sys
+import json
+import threading
+import unittest
+
+from werkzeug.datastructures import MultiDict
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import setup_fts_index
+import fts_search_api
+from request_coalescing import SingleFlight
+from fts_test_utils import create_resources_db, remove_db
+
+
+class TestSingleFlight(unittest.TestCase):
+    """Test sharing one execution between concurrent callers."""
+
+    def run_concurrently(self, flight, key, fn, callers=5):
+        results = []
+        errors = []
+
+        def call():
+            try:
+                results.append(flight.do(key, fn))
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=call) for _ in range(callers)]
+        for thread in threads:
+            thread.start()
+        return threads, results, errors
+
+    def test_concurrent_callers_share_one_execution(self):
+        flight = SingleFlight()
+        release = threading.Event()
+        executions = []
+
+        def slow_search():
+            executions.append(1)
+            release.wait(5)
+            return {'total': 3}
+
+        threads, results, _ = self.run_concurrently(flight, 'housing', slow_search)
+        # Wait until every follower is queued behind the leader
+        while flight.stats()['requests'] < 5:
+            pass
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(executions), 1)
+        self.assertEqual(results, [{'total': 3}] * 5)
+        stats = flight.stats()
+        self.assertEqual(stats['coalesced'], 4)
+        self.assertAlmostEqual(stats['coalescing_ratio'], 0.8)
+        self.assertEqual(stats['in_flight'], 0)
+
+    def test_errors_are_shared(self):
+        flight = SingleFlight()
+        release = threading.Event()
+
+        def failing_search():
+            release.wait(5)
+            raise ValueError('boom')
+
+        threads, results, errors = self.run_concurrently(flight, 'housing', failing_search, callers=3)
+        while flight.stats()['requests'] < 3:
+            pass
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results, [])
+        self.assertEqual(len(errors), 3)
+
+    def test_sequential_calls_execute_again(self):
+        flight = SingleFlight()
+        flight.do('food', lambda: 1)
+        flight.do('food', lambda: 2)
+        self.assertEqual(flight.stats()['executions'], 2)
+
+
+class TestSearchCoalescing(unittest.TestCase):
+    """Test coalescing through the search endpoint."""
+
+    def setUp(self):
+        self.db_path = 'test_coalescing.db'
+        create_resources_db(self.db_path)
+        setup_fts_index.setup_fts_index(self.db_path)
+        fts_search_api.app.config['TESTING'] = True
+        fts_search_api.app.config['DATABASE_PATH'] = self.db_path
+        self.client = fts_search_api.app.test_client()
+
+    def tearDown(self):
+        fts_search_api.app.config.pop('DATABASE_PATH')
+        fts_search_api.app.config.pop('ADMIN_TOKEN', None)
+        remove_db(self.db_path)
+
+    def test_keys_normalize_whitespace(self):
+        first = fts_search_api.search_params(MultiDict({'q': 'food  bank '}))
+        second = fts_search_api.search_params(MultiDict({'q': 'food bank'}))
+        with fts_search_api.app.app_context():
+            self.assertEqual(fts_search_api.search_key(first), fts_search_api.search_key(second))
+
+    def test_metrics_endpoint(self):
+        self.client.get('/api/search?q=food')
+        self.assertEqual(self.client.get('/api/admin/metrics').status_code, 403)
+
+        fts_search_api.app.config['ADMIN_TOKEN'] = 'secret'
+        self.assertEqual(self.client.get('/api/admin/metrics').status_code, 401)
+        response = self.client.get('/api/admin/metrics', headers={'Authorization': 'Bearer secret'})
+        data = json.loads(response.data)
+        self.assertTrue(data['success'])
+        self.assertIn('coalescing_ratio', data['coalescing'])
+        self.assertGreaterEqual(data['coalescing']['executions'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+"""
+Tests for the resource API client.
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+from werkzeug.serving import make_server
+
+# Add the parent directory to the path so we can import the modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import fts_search_api
+from resource_client import ResourceClient
+from setup_fts_index import setup_fts_index
+from fts_test_utils import create_resources_db, remove_db
+
+
+class ServerThread:
+    """Serve a WSGI app on a free local port for the duration of a test."""
+
+    def __init__(self, app):
+        self.server = make_server('127.0.0.1', 0, app, threaded=True)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.base_url = f"http://127.0.0.1:{self.server.server_port}/api"
+
+    def stop(self):
+        self.server.shutdown()
+        self.thread.join()
+
+
+class TestResourceClient(unittest.TestCase):
+    """Test the client against the search API."""
+
+    def setUp(self):
+        self.db_path = tempfile.mktemp(suffix='.db')
+        create_resources_db(self.db_path)
+        with redirect_stdout(StringIO()):
+            setup_fts_index(self.db_path)
+        fts_search_api.app.config['DATABASE_PATH'] = self.db_path
+        self.server = ServerThread(fts_search_api.app)
+        self.client = ResourceClient(self.server.base_url, cache_ttl=60)
+
+    def tearDown(self):
+        self.client.close()
+        self.server.stop()
+        fts_search_api.app.config.pop('DATABASE_PATH')
+        remove_db(self.db_path)
+
+    def test_search(self):
+        result = self.client.search('food', expand=0)
+
+        self.assertEqual(sorted(resource['id'] for resource in result['resources']), [1, 2, 4])
+        stats = self.client.stats()['search']
+        self.assertEqual((stats['calls'], stats['errors']), (1, 0))
+        self.assertIsNotNone(stats['p95_ms'])
+
+    def test_resource_cache_and_revalidation(self):
+        first = self.client.get_resource(1)
+        self.assertIs(self.client.get_resource(1), first)
+        self.assertEqual((self.client.stats()['resource']['calls'],
+                          self.client.stats()['resource']['cache_hits']), (1, 1))
+
+        # Once expired, the cached copy is revalidated instead of refetched
+        with ResourceClient(self.server.base_url, cache_ttl=0) as client:
+            first = client.get_resource(1)
+            self.assertIs(client.get_resource(1), first)
+            self.assertEqual(client.stats()['resource']['not_modified'], 1)
+
+    def test_failures_not_cached(self):
+        with redirect_stdout(StringIO()):
+            self.assertFalse(self.client.get_resource(99)['success'])
+            self.client.get_resource(99)
+        self.assertEqual(self.client.stats()['resource']['calls'], 2)
+
+
+class TestRetries(unittest.TestCase):
+    """Test retries and timeouts against misbehaving servers."""
+
+    def test_retries_unavailable_server(self):
+        calls = []
+
+        def flaky_app(environ, start_response):
+            calls.append(1)
+            if len(calls) < 3:
+                start_response('503 Service Unavailable', [('Content-Type', 'text/plain')])
+                return [b'busy']
+            start_response('200 OK', [('Content-Type', 'application/json')])
+            return [b'{"success": true, "resources": []}']
+
+        server = ServerThread(flaky_app)
+        try:
+            with ResourceClient(server.base_url, backoff=0.01) as client:
+                self.assertTrue(client.search('food')['success'])
+            self.assertEqual(len(calls), 3)
+        finally:
+            server.stop()
+
+    def test_timeout(self):
+        release = threading.Event()
+
+        def hung_app(environ, start_response):
+            release.wait(5)
+            start_response('200 OK', [('Content-Type', 'application/json')])
+            return [b'{}']
+
+        server = ServerThread(hung_app)
+        try:
+            with ResourceClient(server.base_url, retries=0) as client:
+                started = time.perf_counter()
+                with redirect_stdout(StringIO()):
+                    self.assertIsNone(client.search('food', timeout=0.2))
+                self.assertLess(time.perf_counter() - started, 2)
+                self.assertEqual(client.stats()['search']['errors'], 1)
+        finally:
+            release.set()
+            server.stop()
+
+
+if __name__ == '__main__':
+    unittest.main()
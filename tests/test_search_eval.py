@@ -0,0 +1,126 @@
+"""
+Tests for the search relevance evaluation.
+"""
+
+import json
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import unittest
+from contextlib import closing, redirect_stdout
+from io import StringIO
+
+# Add the parent directory to the path so we can import the modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import fts_search_api
+from search_eval import evaluate, load_judgments, ndcg_at_k, parse_config, print_report, recall_at_k
+from setup_fts_index import setup_fts_index
+from fts_test_utils import create_resources_db, remove_db
+
+JUDGMENTS = [
+    {'query': 'food', 'params': {'expand': '0'}, 'relevant': {'1': 3, '2': 3, '4': 1}},
+    {'query': 'meal', 'params': {'expand': '0'}, 'relevant': {'3': 2}},
+    {'query': 'dental', 'relevant': {}}
+]
+
+
+class TestMetrics(unittest.TestCase):
+    """Test nDCG and recall."""
+
+    def test_ndcg(self):
+        relevant = {1: 3, 2: 1}
+        self.assertAlmostEqual(ndcg_at_k([1, 2, 3], relevant), 1.0)
+        self.assertLess(ndcg_at_k([2, 1, 3], relevant), 1.0)
+        self.assertEqual(ndcg_at_k([3], relevant), 0.0)
+        self.assertIsNone(ndcg_at_k([1], {}))
+        # Only the top k count
+        self.assertEqual(ndcg_at_k([3, 1], relevant, k=1), 0.0)
+
+    def test_recall(self):
+        relevant = {1: 3, 2: 1, 3: 0}
+        self.assertEqual(recall_at_k([1, 3], relevant), 0.5)
+        self.assertEqual(recall_at_k([2, 1], relevant, k=1), 0.5)
+        self.assertIsNone(recall_at_k([1], {3: 0}))
+
+
+class TestEvaluate(unittest.TestCase):
+    """Test evaluating index configurations against a database."""
+
+    def setUp(self):
+        self.db_path = tempfile.mktemp(suffix='.db')
+        self.work_dir = tempfile.mkdtemp()
+        create_resources_db(self.db_path)
+        with redirect_stdout(StringIO()):
+            setup_fts_index(self.db_path)
+        self.judgments_path = os.path.join(self.work_dir, 'judgments.json')
+        with open(self.judgments_path, 'w') as f:
+            json.dump(JUDGMENTS, f)
+
+    def tearDown(self):
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+        remove_db(self.db_path)
+
+    def test_load_judgments(self):
+        judgments = load_judgments(self.judgments_path)
+
+        self.assertEqual(judgments[0]['relevant'], {1: 3, 2: 3, 4: 1})
+        self.assertEqual(judgments[2]['params'], {})
+
+    def test_compare_profiles(self):
+        judgments = load_judgments(self.judgments_path)
+        with redirect_stdout(StringIO()):
+            default = evaluate(judgments, parse_config('default', self.db_path, self.work_dir), repeat=2)
+            porter = evaluate(judgments, parse_config('porter', self.db_path, self.work_dir), repeat=2)
+
+        self.assertAlmostEqual(default['recall'], 0.5)
+        self.assertAlmostEqual(default['zero_result_rate'], 2 / 3)
+        # Stemming finds "meals" for "meal"
+        self.assertAlmostEqual(porter['recall'], 1.0)
+        self.assertAlmostEqual(porter['zero_result_rate'], 1 / 3)
+        self.assertEqual([query['results'] for query in porter['queries']], [3, 1, 0])
+        self.assertEqual(porter['errors'], 0)
+        self.assertIsNotNone(porter['p95_ms'])
+        # The database the API was configured with is left alone
+        self.assertNotIn('DATABASE_PATH', fts_search_api.app.config)
+
+        output = StringIO()
+        with redirect_stdout(output):
+            print_report([default, porter])
+        self.assertIn('recall@10', output.getvalue())
+        self.assertIn('+1.000  meal', output.getvalue())
+
+    def test_database_config_with_params(self):
+        config = parse_config(f"{self.db_path}?limit=1", self.db_path, self.work_dir)
+        with redirect_stdout(StringIO()):
+            report = evaluate(load_judgments(self.judgments_path)[:1], config)
+
+        self.assertEqual(config['db_path'], self.db_path)
+        self.assertEqual(report['queries'][0]['results'], 1)
+
+    def test_profile_copy_includes_wal(self):
+        writer = sqlite3.connect(self.db_path)
+        try:
+            writer.execute("PRAGMA journal_mode = WAL")
+            writer.execute("PRAGMA wal_autocheckpoint = 0")
+            writer.execute("INSERT INTO resources (id, name, description) VALUES (6, 'Meal Van', 'Meals')")
+            writer.commit()
+
+            # The row is only in the WAL while the writer stays open
+            config = parse_config('porter', self.db_path, self.work_dir)
+        finally:
+            writer.close()
+
+        with closing(sqlite3.connect(config['db_path'])) as conn:
+            self.assertEqual(conn.execute("SELECT name FROM resources WHERE id = 6").fetchone(),
+                             ('Meal Van',))
+
+    def test_unknown_config(self):
+        with self.assertRaises(ValueError):
+            parse_config('no-such-profile', self.db_path, self.work_dir)
+
+
+if __name__ == '__main__':
+    unittest.main()
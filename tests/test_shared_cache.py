@@ -0,0 +1,120 @@
+"""
+Tests for the cross-worker shared result cache.
+"""
+
+import os
+import sys
+import json
+import time
+import sqlite3
+import unittest
+from contextlib import closing
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import setup_fts_index
+import fts_search_api
+from shared_cache import SharedResultCache, data_version
+from fts_test_utils import create_resources_db, remove_db
+
+
+class TestSharedResultCache(unittest.TestCase):
+    """Test the SQLite-backed cache directly."""
+
+    def setUp(self):
+        self.path = 'test_shared_cache.db'
+        remove_db(self.path)
+        self.cache = SharedResultCache(self.path, max_bytes=200)
+
+    def tearDown(self):
+        remove_db(self.path)
+
+    def test_round_trip(self):
+        self.cache.set('k', 'v1', {'total': 2, 'resources': []})
+        self.assertEqual(self.cache.get('k', 'v1'), {'total': 2, 'resources': []})
+        self.assertEqual(self.cache.stats()['hits'], 1)
+
+    def test_other_processes_see_entries(self):
+        """A second cache object on the same file acts like another worker."""
+        self.cache.set('k', 'v1', [1, 2, 3])
+        other = SharedResultCache(self.path, max_bytes=200)
+        self.assertEqual(other.get('k', 'v1'), [1, 2, 3])
+
+    def test_stale_versions_miss(self):
+        self.cache.set('k', 'v1', [1])
+        self.assertIsNone(self.cache.get('k', 'v2'))
+        self.assertEqual(self.cache.stats()['stale'], 1)
+        self.assertIsNone(self.cache.get('k', 'v1'))
+
+    def test_size_bound_evicts_least_recently_used(self):
+        for i in range(6):
+            self.cache.set(f'k{i}', 'v1', 'x' * 50)
+            time.sleep(0.001)
+
+        stats = self.cache.stats()
+        self.assertLessEqual(stats['bytes'], 200)
+        self.assertIsNone(self.cache.get('k0', 'v1'))
+        self.assertIsNotNone(self.cache.get('k5', 'v1'))
+
+    def test_running_total_tracks_every_change(self):
+        self.cache.set('a', 'v1', 'x' * 10)
+        self.cache.set('b', 'v1', 'x' * 20)
+        self.cache.set('a', 'v1', 'x' * 30)
+        self.cache.get('b', 'v2')
+
+        with closing(sqlite3.connect(self.path)) as conn:
+            total = conn.execute("SELECT total_size FROM cache_meta").fetchone()[0]
+            actual = conn.execute("SELECT SUM(size) FROM cache_entries").fetchone()[0]
+        self.assertEqual(total, actual)
+        self.assertEqual(self.cache.stats()['bytes'], 32)
+
+
+class TestSearchWithSharedCache(unittest.TestCase):
+    """Test the search endpoint with the shared cache enabled."""
+
+    def setUp(self):
+        self.db_path = 'test_cached_search.db'
+        self.cache_path = 'test_search_cache.db'
+        remove_db(self.cache_path)
+        create_resources_db(self.db_path)
+        setup_fts_index.setup_fts_index(self.db_path)
+        fts_search_api.app.config['TESTING'] = True
+        fts_search_api.app.config['DATABASE_PATH'] = self.db_path
+        fts_search_api.app.config['SHARED_CACHE_PATH'] = self.cache_path
+        fts_search_api.app.config['ADMIN_TOKEN'] = 'secret'
+        self.client = fts_search_api.app.test_client()
+
+    def tearDown(self):
+        fts_search_api.app.config.pop('DATABASE_PATH')
+        fts_search_api.app.config.pop('SHARED_CACHE_PATH')
+        fts_search_api.app.config.pop('ADMIN_TOKEN')
+        fts_search_api._shared_cache = None
+        remove_db(self.db_path)
+        remove_db(self.cache_path)
+
+    def test_repeated_search_hits_cache(self):
+        first = json.loads(self.client.get('/api/search?q=food').data)
+        second = json.loads(self.client.get('/api/search?q=food').data)
+        self.assertEqual(first, second)
+
+        response = self.client.get('/api/admin/metrics', headers={'Authorization': 'Bearer secret'})
+        stats = json.loads(response.data)['shared_cache']
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['misses'], 1)
+
+    def test_data_change_invalidates(self):
+        version = data_version(self.db_path)
+        self.client.get('/api/search?q=clinic')
+
+        time.sleep(0.01)
+        with closing(sqlite3.connect(self.db_path)) as conn:
+            conn.execute("INSERT INTO resources (id, name, description) VALUES (6, 'Dental Clinic', 'Teeth cleaning')")
+            conn.commit()
+        self.assertNotEqual(data_version(self.db_path), version)
+
+        data = json.loads(self.client.get('/api/search?q=clinic').data)
+        self.assertEqual(data['total'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+"""
+Tests for "more like this" search.
+"""
+
+import json
+import os
+import sys
+import sqlite3
+import tempfile
+import unittest
+from contextlib import closing, redirect_stdout
+from io import StringIO
+
+# Add the parent directory to the path so we can import the modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import fts_search_api
+from similar_resources import TermVectorCache, term_vector, search_similar
+from setup_fts_index import setup_fts_index
+from fts_test_utils import create_resources_db, remove_db
+
+
+class TestTermVectors(unittest.TestCase):
+    """Test term extraction and the weighted OR query."""
+
+    def setUp(self):
+        self.db_path = tempfile.mktemp(suffix='.db')
+        create_resources_db(self.db_path)
+        with redirect_stdout(StringIO()):
+            setup_fts_index(self.db_path)
+        self.conn = sqlite3.connect(self.db_path)
+        self.conn.row_factory = sqlite3.Row
+
+    def tearDown(self):
+        self.conn.close()
+        remove_db(self.db_path)
+
+    def test_distinctive_terms_first(self):
+        terms = dict(term_vector(self.conn, 1))
+
+        # "food" occurs twice in resource 1 and in only two other resources
+        self.assertEqual(term_vector(self.conn, 1)[0][0], 'food')
+        # Terms no other resource has can't find anything
+        self.assertNotIn('shelter', dict(term_vector(self.conn, 3)))
+        self.assertGreater(terms['bank'], terms['low'])
+        self.assertIsNone(term_vector(self.conn, 99))
+
+    def test_search_excludes_source(self):
+        resources, total = search_similar(self.conn, term_vector(self.conn, 1), 1)
+
+        ids = [resource['id'] for resource in resources]
+        self.assertNotIn(1, ids)
+        self.assertEqual(ids[:2], [2, 4])
+        self.assertEqual(total, len(ids))
+        self.assertEqual(search_similar(self.conn, [], 1), ([], 0))
+
+    def test_cache_invalidated_by_edits(self):
+        cache = TermVectorCache()
+        first = cache.get(self.conn, self.db_path, 1)
+        self.assertIs(cache.get(self.conn, self.db_path, 1), first)
+        self.assertEqual((cache.stats()['hits'], cache.stats()['misses']), (1, 1))
+
+        with closing(sqlite3.connect(self.db_path)) as conn:
+            conn.execute("UPDATE resources SET name = 'Medical Food Bank' WHERE id = 5")
+            conn.commit()
+        cache.get(self.conn, self.db_path, 1)
+        self.assertEqual(cache.stats()['misses'], 2)
+
+
+class TestSimilarEndpoint(unittest.TestCase):
+    """Test GET /api/resource/<id>/similar."""
+
+    def setUp(self):
+        self.db_path = tempfile.mktemp(suffix='.db')
+        create_resources_db(self.db_path)
+        with redirect_stdout(StringIO()):
+            setup_fts_index(self.db_path)
+        fts_search_api.app.config['TESTING'] = True
+        fts_search_api.app.config['DATABASE_PATH'] = self.db_path
+        self.client = fts_search_api.app.test_client()
+
+    def tearDown(self):
+        fts_search_api.app.config.pop('DATABASE_PATH')
+        fts_search_api._term_vectors.clear()
+        remove_db(self.db_path)
+
+    def test_similar(self):
+        data = json.loads(self.client.get('/api/resource/2/similar?limit=2').data)
+
+        self.assertTrue(data['success'])
+        self.assertEqual([resource['id'] for resource in data['resources']], [1, 4])
+        self.assertIn('food', data['terms'])
+        self.assertGreater(data['total'], 2)
+
+    def test_unknown_resource(self):
+        data = json.loads(self.client.get('/api/resource/99/similar').data)
+
+        self.assertFalse(data['success'])
+        self.assertIn('not found', data['error'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,177 @@
+"""
+Tests for WAL connections and the serialized write queue.
+"""
+
+import json
+import os
+import sys
+import sqlite3
+import tempfile
+import threading
+import unittest
+from contextlib import closing
+
+# Add the parent directory to the path so we can import the modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import fts_search_api
+from db_connection import connect, checkpoint
+from setup_fts_index import setup_fts_index
+from write_queue import SerializedWriter
+from fts_test_utils import create_resources_db, remove_db
+
+
+class TestWALConnections(unittest.TestCase):
+    """Test the shared connection settings."""
+
+    def setUp(self):
+        self.db_path = tempfile.mktemp(suffix='.db')
+        create_resources_db(self.db_path)
+
+    def tearDown(self):
+        remove_db(self.db_path)
+
+    def test_readers_not_blocked_by_writer(self):
+        writer = connect(self.db_path, isolation_level=None)
+        reader = connect(self.db_path, busy_timeout_ms=0)
+        try:
+            self.assertEqual(writer.execute("PRAGMA journal_mode").fetchone()[0], 'wal')
+            writer.execute("BEGIN IMMEDIATE")
+            writer.execute("UPDATE resources SET name = 'Renamed' WHERE id = 1")
+
+            # The reader sees the last committed state instead of waiting
+            self.assertEqual(reader.execute("SELECT name FROM resources WHERE id = 1").fetchone()[0],
+                             'Food Bank of Kern County')
+
+            writer.execute("COMMIT")
+            self.assertEqual(checkpoint(writer, 'TRUNCATE')[0], 0)
+        finally:
+            writer.close()
+            reader.close()
+
+
+class TestSerializedWriter(unittest.TestCase):
+    """Test batching and error isolation in the writer thread."""
+
+    def setUp(self):
+        self.db_path = tempfile.mktemp(suffix='.db')
+        create_resources_db(self.db_path)
+        self.writer = SerializedWriter(self.db_path, max_delay=0.05)
+
+    def tearDown(self):
+        self.writer.close()
+        remove_db(self.db_path)
+
+    def test_concurrent_writes_share_transactions(self):
+        def write(n):
+            self.writer.execute("INSERT INTO resources (id, name) VALUES (?, ?)", (100 + n, f"Resource {n}"))
+
+        threads = [threading.Thread(target=write, args=(n,)) for n in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        stats = self.writer.stats()
+        self.assertEqual(stats['writes'], 20)
+        self.assertLess(stats['batches'], 20)
+        with closing(sqlite3.connect(self.db_path)) as conn:
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM resources WHERE id >= 100").fetchone()[0], 20)
+
+    def test_failed_write_does_not_affect_batch(self):
+        good = self.writer.submit("UPDATE resources SET name = 'Renamed' WHERE id = 1")
+        bad = self.writer.submit("INSERT INTO resources (id, name) VALUES (2, 'Duplicate id')")
+        other = self.writer.submit("DELETE FROM resources WHERE id = 5")
+
+        self.assertEqual(good.result(5).rowcount, 1)
+        with self.assertRaises(sqlite3.IntegrityError):
+            bad.result(5)
+        self.assertEqual(other.result(5).rowcount, 1)
+        self.assertEqual(self.writer.stats()['failed'], 1)
+
+        with closing(sqlite3.connect(self.db_path)) as conn:
+            self.assertEqual(conn.execute("SELECT name FROM resources WHERE id = 1").fetchone()[0], 'Renamed')
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM resources").fetchone()[0], 4)
+
+
+class TestUpdateEndpoint(unittest.TestCase):
+    """Test admin edits through the search API."""
+
+    def setUp(self):
+        self.db_path = tempfile.mktemp(suffix='.db')
+        create_resources_db(self.db_path)
+        setup_fts_index(self.db_path)
+        fts_search_api.app.config['TESTING'] = True
+        fts_search_api.app.config['DATABASE_PATH'] = self.db_path
+        fts_search_api.app.config['ADMIN_TOKEN'] = 'secret'
+        self.client = fts_search_api.app.test_client()
+
+    def tearDown(self):
+        fts_search_api.app.config.pop('DATABASE_PATH')
+        fts_search_api.app.config.pop('ADMIN_TOKEN')
+        if fts_search_api._writer is not None:
+            fts_search_api._writer.close()
+            fts_search_api._writer = None
+        remove_db(self.db_path)
+
+    def put(self, resource_id, body, token='secret'):
+        headers = {'Authorization': f'Bearer {token}'} if token else {}
+        return self.client.put(f'/api/admin/resource/{resource_id}', json=body, headers=headers)
+
+    def test_update_is_searchable(self):
+        response = self.put(5, {'description': 'Dental and vision care'})
+        data = json.loads(response.data)
+
+        self.assertTrue(data['success'])
+        self.assertEqual(data['resource']['description'], 'Dental and vision care')
+        results = json.loads(self.client.get('/api/search?q=dental').data)
+        self.assertEqual([resource['id'] for resource in results['resources']], [5])
+
+    def test_concurrent_requests_share_one_writer(self):
+        writers = []
+        start = threading.Barrier(8)
+
+        def get_writer():
+            with fts_search_api.app.app_context():
+                start.wait()
+                writers.append(fts_search_api.get_writer())
+
+        threads = [threading.Thread(target=get_writer) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len({id(writer) for writer in writers}), 1)
+
+    def test_rejects_bad_updates(self):
+        for body in ({}, {'password': 'x'}, {'is_active': 'maybe'}, {'email': 'not-an-email'},
+                     {'name': ''}, {'is_verified': None}, {'description': ['a', 'b']}):
+            data = json.loads(self.put(1, body).data)
+            self.assertFalse(data['success'], body)
+
+        data = json.loads(self.put(99, {'name': 'Nobody'}).data)
+        self.assertFalse(data['success'])
+        self.assertIn('not found', data['error'])
+
+    def test_values_are_normalized(self):
+        data = json.loads(self.put(1, {'phone': '661.555.1234', 'is_verified': 'yes'}).data)
+
+        self.assertTrue(data['success'])
+        self.assertEqual(data['resource']['phone'], '(661) 555-1234')
+        self.assertEqual(data['resource']['is_verified'], 1)
+
+    def test_requires_admin_token(self):
+        for token, status in (('wrong', 401), (None, 401)):
+            response = self.put(1, {'name': 'Renamed'}, token=token)
+            self.assertEqual(response.status_code, status)
+
+        fts_search_api.app.config['ADMIN_TOKEN'] = None
+        self.assertEqual(self.put(1, {'name': 'Renamed'}).status_code, 403)
+        with closing(sqlite3.connect(self.db_path)) as conn:
+            self.assertEqual(conn.execute("SELECT name FROM resources WHERE id = 1").fetchone()[0],
+                             'Food Bank of Kern County')
+
+
+if __name__ == '__main__':
+    unittest.main()
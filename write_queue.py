@@ -0,0 +1,169 @@
+"""
+Serialized writes to the resources database.
+
+SQLite allows one writer at a time. When every request opens its own write
+transaction, concurrent edits queue up on the database lock and each pays
+for its own commit. SerializedWriter funnels writes through a single
+thread instead: it takes whatever writes are waiting, runs them in one
+transaction and commits once for the whole batch.
+
+Each write runs in its own savepoint, so a failing write is rolled back
+and reported to its caller without affecting the rest of the batch.
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from db_connection import connect
+
+_STOP = object()
+
+
+class WriteResult:
+    """Outcome of one write statement."""
+
+    def __init__(self, rowcount, lastrowid):
+        self.rowcount = rowcount
+        self.lastrowid = lastrowid
+
+
+class SerializedWriter:
+    """A single writer thread that batches queued writes into transactions."""
+
+    def __init__(self, db_path, max_batch=100, max_delay=0.005):
+        self.db_path = db_path
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self.writes = 0
+        self.failed = 0
+        self.batches = 0
+        self._batched = 0
+        self._commit_seconds = 0.0
+        self._thread = threading.Thread(target=self._run, name='serialized-writer', daemon=True)
+        self._thread.start()
+
+    def submit(self, sql, params=()):
+        """Queue a write statement; the Future resolves to a WriteResult."""
+        return self.call(lambda conn: self._execute(conn, sql, params))
+
+    def call(self, fn):
+        """Queue fn(conn) to run inside the writer's transaction; returns a Future."""
+        future = Future()
+        self._queue.put((fn, future))
+        return future
+
+    def execute(self, sql, params=(), timeout=None):
+        """Run a write statement and wait for it to commit."""
+        return self.submit(sql, params).result(timeout)
+
+    @staticmethod
+    def _execute(conn, sql, params):
+        cursor = conn.execute(sql, params)
+        return WriteResult(cursor.rowcount, cursor.lastrowid)
+
+    def _next_batch(self):
+        item = self._queue.get()
+        if item is _STOP:
+            return None
+        batch = [item]
+
+        # Give writes arriving right behind this one a moment to join it
+        deadline = time.monotonic() + self.max_delay
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                # Finish this batch, then stop
+                self._queue.put(_STOP)
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        try:
+            conn = connect(self.db_path, isolation_level=None, check_same_thread=False)
+        except Exception as e:
+            # Fail every write rather than leaving callers waiting forever
+            self._fail_queued(e)
+            return
+        try:
+            while True:
+                batch = self._next_batch()
+                if batch is None:
+                    return
+                self._write_batch(conn, batch)
+        finally:
+            conn.close()
+
+    def _write_batch(self, conn, batch):
+        outcomes = []
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for fn, future in batch:
+                conn.execute("SAVEPOINT write")
+                try:
+                    outcomes.append((future, fn(conn), None))
+                    conn.execute("RELEASE write")
+                except Exception as e:
+                    conn.execute("ROLLBACK TO write")
+                    conn.execute("RELEASE write")
+                    outcomes.append((future, None, e))
+
+            started = time.perf_counter()
+            conn.execute("COMMIT")
+            commit_seconds = time.perf_counter() - started
+        except Exception as e:
+            # Nothing in the batch was committed
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            for fn, future in batch:
+                future.set_exception(e)
+            with self._lock:
+                self.failed += len(batch)
+            return
+
+        failed = 0
+        for future, result, error in outcomes:
+            if error is not None:
+                failed += 1
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+        with self._lock:
+            self.batches += 1
+            self._batched += len(batch)
+            self.writes += len(batch) - failed
+            self.failed += failed
+            self._commit_seconds += commit_seconds
+
+    def _fail_queued(self, error):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            item[1].set_exception(error)
+
+    def close(self, timeout=None):
+        """Finish the queued writes and stop the writer thread."""
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    def stats(self):
+        """Write counters and the average number of writes per transaction."""
+        with self._lock:
+            return {
+                'writes': self.writes,
+                'failed': self.failed,
+                'batches': self.batches,
+                'avg_batch_size': self._batched / self.batches if self.batches else 0.0,
+                'avg_commit_ms': self._commit_seconds / self.batches * 1000 if self.batches else 0.0,
+                'queued': self._queue.qsize()
+            }